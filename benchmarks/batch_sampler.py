@@ -0,0 +1,65 @@
+"""
+Benchmark of picking the calls of a random batch request with the weights of the ethereum.general profile.
+
+Compares the previous approach, which generated a call from every RPC call method, expanded them by weight
+and picked calls_per_batch of them with random.choices, with sampling method names from a WeightedSampler.
+The previous approach generated a single call per method, so a batch repeated the same params for a method,
+while now a call is generated for every sampled method. Sampling is timed on its own and together with
+generating the sampled calls. Also checks that sampled frequencies match the weights.
+
+Usage: python -m benchmarks.batch_sampler [iterations], from the root of the repository
+"""
+
+import random
+import sys
+import timeit
+from collections import Counter
+
+from chainbench.profile.ethereum.general import EthereumProfile
+from chainbench.util.jsonrpc import RpcCall, expand_to_list
+from chainbench.util.rng import WeightedSampler
+
+
+def make_factory(method: str):
+    # stands in for an RPC call method generating params from test data
+    return lambda: RpcCall(method, [hex(random.randint(0, 2**32)), "latest"])
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    weights = {method.__name__: weight for method, weight in EthereumProfile.rpc_calls.items()}
+    factories = {name: make_factory(name) for name in weights}
+    weighted_factories = {factories[name]: weight for name, weight in weights.items()}
+    sampler = WeightedSampler(weights)
+    rng = random.Random(42)
+
+    print(f"{'batch size':<12}{'expand (us)':>14}{'sample (us)':>14}{'sample + calls (us)':>22}")
+    for batch_size in (1, 10, 50, 100):
+
+        def expand() -> list[RpcCall]:
+            return random.choices(
+                expand_to_list({factory(): weight for factory, weight in weighted_factories.items()}), k=batch_size
+            )
+
+        def sample() -> list[str]:
+            return sampler.sample_k(batch_size, rng)
+
+        def sample_calls() -> list[RpcCall]:
+            return [factories[name]() for name in sampler.sample_k(batch_size, rng)]
+
+        expand_time, sample_time, calls_time = (
+            min(timeit.repeat(function, number=iterations, repeat=3)) / iterations
+            for function in (expand, sample, sample_calls)
+        )
+        print(f"{batch_size:<12}{expand_time * 1e6:>14.1f}{sample_time * 1e6:>14.1f}{calls_time * 1e6:>22.1f}")
+
+    draws = 200_000
+    counts = Counter(sampler.sample_k(draws, rng))
+    total = sum(weights.values())
+    print(f"\n{'method':<30}{'expected':>10}{'sampled':>10}")
+    for name, weight in weights.items():
+        print(f"{name:<30}{weight / total:>10.4f}{counts[name] / draws:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Micro-benchmark of BlockchainData.push_block and block number lookups across test data sizes.
+
+Fills test data of each size, then measures pushing new blocks into the full data, which evicts the oldest
+block on every push, and membership checks against block_numbers. Costs should stay flat from XS to XL.
+
+Usage: python -m benchmarks.blockchain_data [iterations], from the root of the repository
+"""
+
+import sys
+import timeit
+
+from chainbench.test_data.blockchain import Block, BlockchainData, Sizes
+
+
+def bench_size(size, iterations: int) -> tuple[float, float]:
+    data: BlockchainData[Block] = BlockchainData(size)
+    for block_number in range(size.blocks_len):
+        data.push_block(Block(block_number))
+    next_block_number = size.blocks_len
+
+    def push() -> None:
+        nonlocal next_block_number
+        data.push_block(Block(next_block_number))
+        next_block_number += 1
+
+    def lookup() -> None:
+        _ = (next_block_number - size.blocks_len // 2) in data.block_numbers
+        _ = -1 in data.block_numbers
+
+    push_time = min(timeit.repeat(push, number=iterations, repeat=5)) / iterations
+    lookup_time = min(timeit.repeat(lookup, number=iterations, repeat=5)) / iterations
+    return push_time, lookup_time
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    print(f"{'size':<6}{'blocks':>10}{'push (us)':>12}{'lookup (us)':>14}")
+    for size in (Sizes.XS, Sizes.S, Sizes.M, Sizes.L, Sizes.XL):
+        push_time, lookup_time = bench_size(size, iterations)
+        print(f"{size.label:<6}{size.blocks_len:>10}{push_time * 1e6:>12.2f}{lookup_time * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
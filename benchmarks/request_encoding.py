@@ -0,0 +1,93 @@
+"""
+Benchmark of JSON-RPC requests per second per core sent through locust FastHttpSession.
+
+Compares the previous request path, where a request body dict with a random id is passed as json= and encoded
+on every request, with the encoded body path used by JrpcHttpUser.make_rpc_call. Requests are sent to a minimal
+HTTP server running in a separate process, and throughput is measured against the CPU time of the sending process.
+
+Usage: python -m benchmarks.request_encoding [requests], from the root of the repository
+"""
+
+import multiprocessing
+import random
+import sys
+import time
+
+RESPONSE = b'{"jsonrpc":"2.0","id":1,"result":"0x1"}'
+HTTP_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: "
+    + str(len(RESPONSE)).encode()
+    + b"\r\n\r\n"
+    + RESPONSE
+)
+
+
+def serve(port: int) -> None:
+    from gevent.server import StreamServer
+
+    def handle(socket, _address) -> None:
+        buffer = b""
+        while True:
+            data = socket.recv(65536)
+            if not data:
+                return
+            buffer += data
+            # requests are small and never pipelined, a request ends with its body
+            while b"\r\n\r\n" in buffer:
+                head, _, rest = buffer.partition(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                if len(rest) < length:
+                    break
+                buffer = rest[length:]
+                socket.sendall(HTTP_RESPONSE)
+
+    StreamServer(("127.0.0.1", port), handle).serve_forever()
+
+
+def bench(method: str, encoded: bool, requests: int, port: int) -> float:
+    from locust.contrib.fasthttp import FastHttpSession
+    from locust.env import Environment
+
+    from chainbench.user.jsonrpc import JSON_HEADERS
+    from chainbench.util.jsonrpc import RpcCall
+
+    session = FastHttpSession(f"http://127.0.0.1:{port}", Environment().events.request, user=None)
+    start = time.process_time()
+    for _ in range(requests):
+        if encoded:
+            # locust annotates data as str, but bytes are passed to geventhttpclient as they are
+            session.request(
+                "POST",
+                "",
+                data=RpcCall(method).encoded_body(),  # type: ignore[arg-type]
+                name=method,
+                headers=JSON_HEADERS,
+            )
+        else:
+            # request body as RpcCall.request_body used to build it, with an id from a new Random instance
+            body = {"jsonrpc": "2.0", "method": method, "params": [], "id": random.Random().randint(1, 100000000)}
+            session.request("POST", "", json=body, name=method)
+    return requests / (time.process_time() - start)
+
+
+def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    port = 18546
+    server = multiprocessing.Process(target=serve, args=(port,), daemon=True)
+    server.start()
+    time.sleep(1)
+    try:
+        print(f"{'method':<18}{'json= (req/s/core)':>20}{'data= (req/s/core)':>20}")
+        for method in ("eth_blockNumber", "eth_chainId"):
+            before = bench(method, False, requests, port)
+            after = bench(method, True, requests, port)
+            print(f"{method:<18}{before:>20.0f}{after:>20.0f}")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,17 +10,21 @@ import gevent.pool
 from click import Context, Parameter
 from locust.argument_parser import parse_locustfile_paths
 from locust.util.load_locustfile import load_locustfile
+from locust.util.timespan import parse_timespan
 
-from chainbench.user import EvmUser, SolanaUser, get_subclass_tasks
+from chainbench.user import EvmUser, ReplayUser, SolanaUser, get_subclass_tasks
 from chainbench.user.common import all_method_classes, all_methods
 from chainbench.util.cli import (
     ContextData,
     LocustOptions,
     ensure_results_dir,
+    generate_unique_dir_name,
     get_base_path,
     get_profile_path,
     get_profiles,
 )
+from chainbench.util.depth import parse_depth_buckets
+from chainbench.util.log import RequestLogSampler
 from chainbench.util.monitor import monitors
 from chainbench.util.notify import NoopNotifier, Notifier
 
@@ -31,6 +35,26 @@ WORKER_COUNT = 8
 TEST_TIME = "5m"
 USERS = 100
 SPAWN_RATE = 10
+BOOTSTRAP_CONCURRENCY = 10
+BOOTSTRAP_BATCH_SIZE = 10
+TEST_DATA_CACHE_TTL = 24.0
+TEST_DATA_CACHE_MAX_SIZE = 1024
+SEED = 42
+MAX_IN_FLIGHT = 1000
+SLO_ERROR_RATE = 1.0
+SATURATION_STEP_TIME = 60
+REPLAY_SPEED = 1.0
+REQUEST_LOG_SAMPLE_RATE = "0.01"
+MAX_WORKER_CPU = 90.0
+MAX_LOOP_LAG = 50.0
+HOT_SET_SIZE = 10
+MOCK_NODE_PORT = 8545
+MOCK_NODE_TXS_PER_BLOCK = 50
+MOCK_NODE_RESULT_SIZE = 32
+CALIBRATION_PROFILE = "evm.light"
+CALIBRATION_USERS = 200
+CALIBRATION_TEST_TIME = "30s"
+CALIBRATION_METHOD_TEST_TIME = "10s"
 LOG_LEVEL = "INFO"
 DEFAULT_PROFILE = "ethereum.general"
 NOTIFY_URL_TEMPLATE = "https://ntfy.sh/{topic}"
@@ -217,6 +241,185 @@ def validate_profile_path(ctx: Context, param: Parameter, value: str) -> str:
 )
 @click.option("--start-block", default=None, help="Start block for test data", type=int)
 @click.option("--end-block", default=None, help="End block for test data", type=int)
+@click.option(
+    "--bootstrap-concurrency",
+    default=BOOTSTRAP_CONCURRENCY,
+    help="Number of concurrent requests used for fetching test data from the reference node",
+    show_default=True,
+)
+@click.option(
+    "--bootstrap-rate-limit",
+    default=0.0,
+    help="Maximum requests per second sent to the reference node while fetching test data, 0 means unlimited",
+    show_default=True,
+)
+@click.option(
+    "--shared-test-data",
+    is_flag=True,
+    help="Share a single memory mapped copy of test data between workers, ignored with --use-latest-blocks",
+)
+@click.option(
+    "--test-data-file",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Load test data from a snapshot created with 'chainbench data export' instead of the reference node",
+)
+@click.option(
+    "--test-data-cache",
+    is_flag=True,
+    help="Reuse test data cached on disk by previous runs, ignored with --use-latest-blocks",
+)
+@click.option(
+    "--test-data-cache-dir",
+    default=None,
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory where test data is cached, defaults to ~/.cache/chainbench",
+)
+@click.option(
+    "--test-data-cache-ttl",
+    default=TEST_DATA_CACHE_TTL,
+    help="Hours after which cached test data expires, 0 means never",
+    show_default=True,
+)
+@click.option(
+    "--test-data-cache-max-size",
+    default=TEST_DATA_CACHE_MAX_SIZE,
+    help="Maximum size of the test data cache in megabytes",
+    show_default=True,
+)
+@click.option(
+    "--bootstrap-batch-size",
+    default=BOOTSTRAP_BATCH_SIZE,
+    help="Number of blocks fetched per JSON-RPC batch request while fetching test data, 1 disables batching",
+    show_default=True,
+)
+@click.option(
+    "--seed",
+    default=SEED,
+    help="Seed of the run that random params of every worker and user are derived from",
+    show_default=True,
+)
+@click.option(
+    "--target-rps",
+    default=0.0,
+    help="Run in open loop mode, starting tasks at this rate per second regardless of response times, "
+    "0 runs users in a closed loop",
+    show_default=True,
+)
+@click.option(
+    "--arrival-distribution",
+    default="poisson",
+    type=click.Choice(["poisson", "uniform"], case_sensitive=False),
+    help="Distribution of the times between task starts in open loop mode",
+    show_default=True,
+)
+@click.option(
+    "--max-in-flight",
+    default=MAX_IN_FLIGHT,
+    help="Maximum number of scheduled tasks waiting for a user or running in open loop mode, "
+    "tasks scheduled beyond it are dropped",
+    show_default=True,
+)
+@click.option(
+    "--slo-p95",
+    default=0.0,
+    help="Highest p95 response time in milliseconds a load has to meet in the saturation shape, 0 is not checked",
+    show_default=True,
+)
+@click.option(
+    "--slo-p99",
+    default=0.0,
+    help="Highest p99 response time in milliseconds a load has to meet in the saturation shape, 0 is not checked",
+    show_default=True,
+)
+@click.option(
+    "--slo-error-rate",
+    default=SLO_ERROR_RATE,
+    help="Highest percentage of failed requests a load has to meet in the saturation shape",
+    show_default=True,
+)
+@click.option(
+    "--saturation-step-time",
+    default=SATURATION_STEP_TIME,
+    help="Seconds every load is run for in the saturation shape once its users are spawned",
+    show_default=True,
+)
+@click.option(
+    "--replay-file",
+    default=None,
+    type=click.Path(exists=True, path_type=Path),
+    help="Capture file of JSON-RPC requests with timestamps replayed by the replay profile, optionally compressed, "
+    "or a directory of requests recorded with --record",
+)
+@click.option(
+    "--replay-speed",
+    default=REPLAY_SPEED,
+    help="Speed the capture file is replayed at relative to the original timing",
+    show_default=True,
+)
+@click.option(
+    "--record",
+    is_flag=True,
+    help="Record the JSON-RPC requests sent by every worker, so they can be replayed against another target",
+)
+@click.option(
+    "--request-log-sample-rate",
+    default=REQUEST_LOG_SAMPLE_RATE,
+    help="Share of requests of every method logged, optionally followed by shares of single methods, "
+    "e.g. 0.01,eth_call=0.1",
+    show_default=True,
+)
+@click.option(
+    "--rpc-response-check",
+    default="full",
+    type=click.Choice(["full", "envelope"], case_sensitive=False),
+    help="How JSON-RPC responses are checked, 'envelope' checks raw response bytes and only parses errors",
+    show_default=True,
+)
+@click.option(
+    "--param-pool-size",
+    default=0,
+    help="Number of calls pre-generated per RPC method and reused during the test to save CPU on workers, "
+    "0 disables pools",
+    show_default=True,
+)
+@click.option(
+    "--warmup",
+    default=None,
+    help="Warm-up time from the start of the test, e.g. 1m, whose requests are reported apart from the steady state",
+)
+@click.option(
+    "--cache-mode",
+    default="random",
+    type=click.Choice(["random", "cold", "warm", "paired"], case_sensitive=False),
+    help="Params drawn at random, never repeated (cold), reused from a small hot set (warm), or alternating "
+    "cold and warm calls to report how much faster cached calls are (paired)",
+    show_default=True,
+)
+@click.option(
+    "--hot-set-size",
+    default=HOT_SET_SIZE,
+    help="Number of calls per RPC method in the hot set of the warm and paired cache modes",
+    show_default=True,
+)
+@click.option(
+    "--depth-buckets",
+    default=None,
+    help="Comma separated upper bounds of buckets of block depth below the chain head, e.g. 128,10000,1000000, "
+    "to report calls referencing a block per method and depth bucket",
+)
+@click.option(
+    "--max-worker-cpu",
+    default=MAX_WORKER_CPU,
+    help="CPU usage of a worker in percent of a core above which the run is flagged as compromised",
+    show_default=True,
+)
+@click.option(
+    "--max-loop-lag",
+    default=MAX_LOOP_LAG,
+    help="Event loop lag of a worker in milliseconds above which the run is flagged as compromised",
+    show_default=True,
+)
 @click.pass_context
 def start(
     ctx: Context,
@@ -253,7 +456,63 @@ def start(
     ref_url: str | None = None,
     start_block: int | None = None,
     end_block: int | None = None,
+    bootstrap_concurrency: int = BOOTSTRAP_CONCURRENCY,
+    bootstrap_rate_limit: float = 0.0,
+    bootstrap_batch_size: int = BOOTSTRAP_BATCH_SIZE,
+    shared_test_data: bool = False,
+    test_data_file: Path | None = None,
+    test_data_cache: bool = False,
+    test_data_cache_dir: Path | None = None,
+    test_data_cache_ttl: float = TEST_DATA_CACHE_TTL,
+    test_data_cache_max_size: int = TEST_DATA_CACHE_MAX_SIZE,
+    seed: int = SEED,
+    target_rps: float = 0.0,
+    arrival_distribution: str = "poisson",
+    max_in_flight: int = MAX_IN_FLIGHT,
+    slo_p95: float = 0.0,
+    slo_p99: float = 0.0,
+    slo_error_rate: float = SLO_ERROR_RATE,
+    saturation_step_time: int = SATURATION_STEP_TIME,
+    replay_file: Path | None = None,
+    replay_speed: float = REPLAY_SPEED,
+    record: bool = False,
+    request_log_sample_rate: str = REQUEST_LOG_SAMPLE_RATE,
+    rpc_response_check: str = "full",
+    param_pool_size: int = 0,
+    max_worker_cpu: float = MAX_WORKER_CPU,
+    max_loop_lag: float = MAX_LOOP_LAG,
+    warmup: str | None = None,
+    cache_mode: str = "random",
+    hot_set_size: int = HOT_SET_SIZE,
+    depth_buckets: str | None = None,
 ) -> None:
+    if test_data_file is not None and use_latest_blocks:
+        raise ValueError("--test-data-file can't be used together with --use-latest-blocks.")
+
+    if replay_file is not None and target_rps > 0:
+        raise ValueError("--replay-file can't be used together with --target-rps.")
+
+    if replay_speed <= 0:
+        raise ValueError("--replay-speed must be greater than 0.")
+
+    if cache_mode.lower() != "random" and param_pool_size > 0:
+        raise ValueError("--cache-mode can't be used together with --param-pool-size.")
+
+    if hot_set_size < 1:
+        raise ValueError("--hot-set-size must be at least 1.")
+
+    warmup_seconds = parse_timespan(warmup) if warmup else 0
+    if warmup_seconds and warmup_seconds >= parse_timespan(test_time):
+        raise ValueError("--warmup must be shorter than --test-time.")
+
+    try:
+        RequestLogSampler().configure(request_log_sample_rate)
+    except ValueError as e:
+        raise ValueError(f"Invalid --request-log-sample-rate {request_log_sample_rate}: {e}")
+
+    if depth_buckets:
+        parse_depth_buckets(depth_buckets)
+
     if start_block is not None or end_block is not None:
         if start_block is None or end_block is None:
             raise ValueError("Both start-block and end-block are required for specifying custom block range.")
@@ -304,6 +563,14 @@ def start(
     for user_class in user_classes.values():
         test_data_types.add(type(getattr(user_class, "test_data")).__name__)
 
+    replays = any(issubclass(user_class, ReplayUser) for user_class in user_classes.values())
+    if replays and replay_file is None:
+        click.echo("--replay-file is required for replaying captured traffic.")
+        sys.exit(1)
+    if replay_file is not None and not replays:
+        click.echo("--replay-file is only used by the replay profile, e.g. --profile replay.")
+        sys.exit(1)
+
     if test_by_directory:
         if len(test_data_types) > 1:
             click.echo(
@@ -399,6 +666,35 @@ def start(
         ref_url=ref_url,
         start_block=start_block,
         end_block=end_block,
+        bootstrap_concurrency=bootstrap_concurrency,
+        bootstrap_rate_limit=bootstrap_rate_limit,
+        bootstrap_batch_size=bootstrap_batch_size,
+        shared_test_data=shared_test_data,
+        test_data_file=test_data_file.resolve() if test_data_file is not None else None,
+        test_data_cache=test_data_cache,
+        test_data_cache_dir=test_data_cache_dir,
+        test_data_cache_ttl=test_data_cache_ttl,
+        test_data_cache_max_size=test_data_cache_max_size,
+        seed=seed,
+        target_rps=target_rps,
+        arrival_distribution=arrival_distribution.lower(),
+        max_in_flight=max_in_flight,
+        slo_p95=slo_p95,
+        slo_p99=slo_p99,
+        slo_error_rate=slo_error_rate,
+        saturation_step_time=saturation_step_time,
+        replay_file=replay_file.resolve() if replay_file is not None else None,
+        replay_speed=replay_speed,
+        record=record,
+        request_log_sample_rate=request_log_sample_rate,
+        rpc_response_check=rpc_response_check.lower(),
+        param_pool_size=param_pool_size,
+        max_worker_cpu=max_worker_cpu,
+        max_loop_lag=max_loop_lag,
+        warmup=warmup_seconds,
+        cache_mode=cache_mode.lower(),
+        hot_set_size=hot_set_size,
+        depth_buckets=depth_buckets,
     )
     # Start the Locust master
     master_command = locust_options.get_master_command()
@@ -510,6 +806,373 @@ def discover(endpoint: str | None, clients: list[str]) -> None:
     rpc_discovery.http.close()
 
 
+@cli.command(
+    name="mock-node",
+    help="Run a mock node answering EVM, Solana and StarkNet JSON-RPC and Ethereum beacon API requests "
+    "with synthetic responses, to calibrate the load generator offline or to bootstrap test data with --ref-url.\n"
+    "Example usage:\n"
+    "chainbench mock-node --port 8545 --latency 20 --latency-distribution lognormal --error-rate 0.01",
+)
+@click.option("--host", default=MASTER_HOST, help="Host to listen on", show_default=True)
+@click.option("--port", default=MOCK_NODE_PORT, help="Port to listen on", show_default=True)
+@click.option("--latency", default=0.0, help="Mean latency of responses in milliseconds", show_default=True)
+@click.option(
+    "--latency-distribution",
+    default="constant",
+    type=click.Choice(["constant", "uniform", "exponential", "lognormal"]),
+    help="Distribution of the latency of responses",
+    show_default=True,
+)
+@click.option(
+    "--latency-sigma",
+    default=0.5,
+    help="Sigma of the lognormal latency distribution, higher values give a longer tail",
+    show_default=True,
+)
+@click.option(
+    "--error-rate",
+    default=0.0,
+    help="Fraction of JSON-RPC requests answered with an internal error",
+    show_default=True,
+)
+@click.option(
+    "--http-error-rate",
+    default=0.0,
+    help="Fraction of HTTP requests answered with HTTP 503",
+    show_default=True,
+)
+@click.option("--chain-id", default=1, help="Chain ID of the EVM chain", show_default=True)
+@click.option(
+    "--txs-per-block",
+    default=MOCK_NODE_TXS_PER_BLOCK,
+    help="Number of transactions in every block",
+    show_default=True,
+)
+@click.option(
+    "--result-size",
+    default=MOCK_NODE_RESULT_SIZE,
+    help="Size in bytes of the data returned by eth_call, eth_getCode and account data",
+    show_default=True,
+)
+@click.option("--processes", default=1, help="Number of processes serving requests", show_default=True)
+@click.option("--seed", default=None, type=int, help="Seed of the random latency and error draws")
+def mock_node(
+    host: str,
+    port: int,
+    latency: float,
+    latency_distribution: str,
+    latency_sigma: float,
+    error_rate: float,
+    http_error_rate: float,
+    chain_id: int,
+    txs_per_block: int,
+    result_size: int,
+    processes: int,
+    seed: int | None,
+) -> None:
+    from chainbench.tools.mock.server import LatencyModel, MockNode, serve
+
+    if processes < 1:
+        raise click.BadParameter("Number of processes must be at least 1.", param_hint="--processes")
+    if processes > 1 and not hasattr(os, "fork"):
+        raise click.BadParameter("Multiple processes are not supported on this platform.", param_hint="--processes")
+    if txs_per_block < 1:
+        raise click.BadParameter("Number of transactions must be at least 1.", param_hint="--txs-per-block")
+    try:
+        node = MockNode(
+            latency=LatencyModel(latency, latency_distribution, latency_sigma),
+            error_rate=error_rate,
+            http_error_rate=http_error_rate,
+            chain_id=chain_id,
+            txs_per_block=txs_per_block,
+            result_size=result_size,
+            seed=seed,
+        )
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    click.echo(f"Mock node listening on http://{host}:{port} with {processes} process(es)")
+    serve(node, host, port, processes)
+
+
+@cli.command(
+    help="Measure how many requests per second a worker can send with the given profiles, "
+    "and recommend the number of workers and users for a target load. Profiles are run with a single worker "
+    "against a local mock node unless --target is given, and the calibration is saved for later comparison.\n"
+    "Example usage:\n"
+    "chainbench calibrate -p evm.light -p solana.general --target-rps 2000",
+)
+@click.option(
+    "-p",
+    "--profile",
+    "profiles",
+    default=[CALIBRATION_PROFILE],
+    multiple=True,
+    help="Profile to calibrate, can be given several times",
+    show_default=True,
+)
+@click.option(
+    "--target",
+    default=None,
+    help="Stand-in endpoint to run the profiles against instead of a local mock node",
+)
+@click.option("--target-rps", default=0.0, help="Target load to recommend workers and users for", type=float)
+@click.option("-u", "--users", default=CALIBRATION_USERS, help="Number of users of every run", show_default=True)
+@click.option("-t", "--test-time", default=CALIBRATION_TEST_TIME, help="Test time of profile runs", show_default=True)
+@click.option(
+    "--method-test-time",
+    default=CALIBRATION_METHOD_TEST_TIME,
+    help="Test time of the run of every method of a profile",
+    show_default=True,
+)
+@click.option("--skip-methods", is_flag=True, help="Only run the profiles, not every method of them")
+@click.option(
+    "--batch-size",
+    default=10,
+    help="Batch size of the batch run of every profile",
+    show_default=True,
+)
+@click.option(
+    "--mock-processes",
+    default=None,
+    type=int,
+    help="Number of processes of the mock node, defaults to half the CPU cores",
+)
+@click.option(
+    "--results-dir",
+    default=Path("results") / "calibration",
+    help="Directory the runs and the calibration are saved to",
+    type=click.Path(dir_okay=True, file_okay=False, writable=True, path_type=Path),
+    show_default=True,
+)
+@click.option(
+    "--compare",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Previous calibration file to compare the results with",
+)
+def calibrate(
+    profiles: tuple[str, ...],
+    target: str | None,
+    target_rps: float,
+    users: int,
+    test_time: str,
+    method_test_time: str,
+    skip_methods: bool,
+    batch_size: int,
+    mock_processes: int | None,
+    results_dir: Path,
+    compare: Path | None,
+) -> None:
+    from chainbench.tools.calibration.calibrate import (
+        Calibrator,
+        ProfileCalibration,
+        compare_calibrations,
+        default_mock_processes,
+        load_calibration,
+        recommend,
+        save_calibration,
+        start_mock_node,
+    )
+
+    profile_dir = get_base_path(__file__) / "profile"
+    for profile in profiles:
+        profile_exists(profile, profile_dir)
+
+    results_path = (results_dir / generate_unique_dir_name()).resolve()
+    mock_node = None
+    if target is None:
+        mock_node, target = start_mock_node(mock_processes or default_mock_processes())
+        click.echo(f"Started mock node at {target}")
+    calibrator = Calibrator(target, results_path, users, test_time, method_test_time, batch_size)
+    calibrations: list[ProfileCalibration] = []
+    try:
+        for profile in profiles:
+            click.echo(f"Calibrating profile {profile}...")
+            calibration = calibrator.calibrate_profile(profile, methods=not skip_methods)
+            if target_rps > 0:
+                calibration.recommendation = recommend(calibration.mix, target_rps)
+            calibrations.append(calibration)
+    except RuntimeError as e:
+        click.echo(f"Calibration failed: {e}")
+        sys.exit(1)
+    finally:
+        if mock_node is not None:
+            mock_node.terminate()
+            mock_node.wait()
+
+    for calibration in calibrations:
+        click.echo(f"\nProfile {calibration.profile}")
+        click.echo(f"{'Run':<50} {'req/s':>10} {'CPU ms/req':>12} {'req/s/core':>12} {'CPU':>6}")
+        for run in [calibration.mix, calibration.batch, *calibration.methods]:
+            if run is not None:
+                click.echo(
+                    f"{run.name:<50} {run.rps:>10.1f} {run.cpu_ms_per_request:>12.3f} "
+                    f"{run.rps_per_core:>12.1f} {run.utilization:>6.0%}"
+                )
+        if calibration.recommendation is not None:
+            recommendation = calibration.recommendation
+            click.echo(
+                f"Recommended for {recommendation.target_rps:g} req/s: "
+                f"--workers {recommendation.workers} --users {recommendation.users}"
+            )
+            for warning in recommendation.warnings:
+                click.echo(f"Warning: {warning}")
+
+    settings = {
+        "target": "mock-node" if mock_node is not None else target,
+        "users": users,
+        "test_time": test_time,
+        "method_test_time": None if skip_methods else method_test_time,
+        "batch_size": batch_size,
+        "target_rps": target_rps,
+    }
+    calibration_path = save_calibration(results_path / "calibration.json", calibrations, settings)
+    click.echo(f"\nCalibration saved to {calibration_path}")
+
+    if compare is not None:
+        click.echo(f"\nCompared with {compare}:")
+        for line in compare_calibrations(load_calibration(compare), load_calibration(calibration_path)):
+            click.echo(line)
+
+
+@cli.group(help="Exports and imports test data snapshots.")
+def data() -> None:
+    pass
+
+
+@data.command(
+    name="export",
+    help="Fetch test data from the target endpoint and save it to a snapshot file, "
+    "which can be used later with 'chainbench start --test-data-file'.\n"
+    "Example usage:\n"
+    "chainbench data export --target https://node-url --profile evm.light --size M -o evm-m.jsonl.gz",
+)
+@click.option("--target", required=True, help="Endpoint to fetch test data from")
+@click.option(
+    "-d",
+    "--profile-dir",
+    default=get_base_path(__file__) / "profile",
+    callback=validate_profile_dir,
+    type=click.Path(exists=True, dir_okay=True, file_okay=False, path_type=Path),
+    help="Profile directory",
+)
+@click.option(
+    "-p",
+    "--profile",
+    default=DEFAULT_PROFILE,
+    callback=validate_profile,
+    help="Profile whose test data is exported",
+    show_default=True,
+)
+@click.option("--size", default=None, help="Set the size of the test data. e.g. --size S")
+@click.option("--use-latest-blocks", is_flag=True, help="Uses latest blocks for test data")
+@click.option("--start-block", default=None, help="Start block for test data", type=int)
+@click.option("--end-block", default=None, help="End block for test data", type=int)
+@click.option(
+    "--bootstrap-concurrency",
+    default=BOOTSTRAP_CONCURRENCY,
+    help="Number of concurrent requests used for fetching test data",
+    show_default=True,
+)
+@click.option(
+    "--bootstrap-rate-limit",
+    default=0.0,
+    help="Maximum requests per second sent while fetching test data, 0 means unlimited",
+    show_default=True,
+)
+@click.option(
+    "--bootstrap-batch-size",
+    default=BOOTSTRAP_BATCH_SIZE,
+    help="Number of blocks fetched per JSON-RPC batch request, 1 disables batching",
+    show_default=True,
+)
+@click.option(
+    "-o",
+    "--output",
+    required=True,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Snapshot file to write",
+)
+def export_data(
+    target: str,
+    profile_dir: Path,
+    profile: str,
+    size: str | None,
+    use_latest_blocks: bool,
+    start_block: int | None,
+    end_block: int | None,
+    bootstrap_concurrency: int,
+    bootstrap_rate_limit: float,
+    bootstrap_batch_size: int,
+    output: Path,
+) -> None:
+    from argparse import Namespace
+
+    from chainbench.test_data import EvmTestData, TestData
+    from chainbench.test_data.bootstrap import TestDataBootstrap
+    from chainbench.test_data.snapshot import write_snapshot
+
+    user_classes, _ = load_locustfile(get_profile_path(profile_dir, profile).__str__())
+    test_data_types = {type(getattr(user_class, "test_data")) for user_class in user_classes.values()}
+    if len(test_data_types) != 1:
+        click.echo(f"Profile {profile} must use exactly one test data type to be exported.")
+        sys.exit(1)
+
+    test_data: TestData = test_data_types.pop()()
+    test_data.init_http_client(target, concurrency=bootstrap_concurrency)
+    if isinstance(test_data, EvmTestData):
+        test_data.init_network(test_data.fetch_chain_id())
+        click.echo(f"Target endpoint network is {test_data.network.name}")
+    test_data.init_data(
+        Namespace(
+            size=str(size),
+            use_latest_blocks=use_latest_blocks,
+            start_block=start_block,
+            end_block=end_block,
+            run_time=0,
+        )
+    )
+    bootstrap = TestDataBootstrap(
+        test_data,
+        concurrency=bootstrap_concurrency,
+        rate_limit=bootstrap_rate_limit,
+        batch_size=bootstrap_batch_size,
+    )
+    if use_latest_blocks:
+        bootstrap.fetch_latest_blocks()
+    else:
+        bootstrap.fetch_random_blocks()
+    header = write_snapshot(test_data, output, test_data.fetch_chain_key())
+    test_data.close()
+    click.echo(f"Exported {header.blocks} blocks of {header.test_data} test data to {output}")
+
+
+@data.command(
+    name="import",
+    help="Import a test data snapshot into the test data cache, "
+    "so it is used by 'chainbench start --test-data-cache' runs against the same chain.",
+)
+@click.argument("snapshot", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--start-block", default=None, help="Start block of the runs the snapshot is cached for", type=int)
+@click.option("--end-block", default=None, help="End block of the runs the snapshot is cached for", type=int)
+@click.option(
+    "--test-data-cache-dir",
+    default=None,
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory where test data is cached, defaults to ~/.cache/chainbench",
+)
+def import_data(
+    snapshot: Path, start_block: int | None, end_block: int | None, test_data_cache_dir: Path | None
+) -> None:
+    from chainbench.test_data.cache import CacheKey, TestDataCache
+    from chainbench.test_data.snapshot import snapshot_to_json
+
+    header, data_json = snapshot_to_json(snapshot)
+    cache_key = CacheKey.from_options(header.chain, header.size.label, start_block, end_block)
+    cache_path = TestDataCache(test_data_cache_dir).store(cache_key, data_json)
+    click.echo(f"Imported {header.blocks} blocks of {header.test_data} test data to {cache_path}")
+
+
 @cli.group(name="list", help="Lists values of the given type.")
 def _list() -> None:
     pass
@@ -0,0 +1,9 @@
+"""
+Replay of captured JSON-RPC traffic, set with --replay-file.
+"""
+
+from chainbench.user import ReplayUser
+
+
+class ReplayProfile(ReplayUser):
+    pass
@@ -0,0 +1,94 @@
+import logging
+from argparse import Namespace
+
+from locust import LoadTestShape, events
+from locust.env import Environment
+from locust.runners import WorkerRunner
+
+from chainbench.util.capacity import (
+    DEFAULT_STEP_TIME,
+    SETTLE_FRACTION,
+    SaturationSearch,
+    Slo,
+    StatsSnapshot,
+    StepResult,
+)
+from chainbench.util.report import get_results_dir
+
+logger = logging.getLogger(__name__)
+
+
+class SaturationLoadShape(LoadTestShape):
+    """
+    This load shape searches for the highest load that meets the SLO set with --slo-p95, --slo-p99 and
+    --slo-error-rate. Starting from the spawn rate, the number of users is doubled every step until a step misses
+    the SLO or the total number of users is reached, then bisected between the highest passing and the lowest failing
+    number of users. Each step lasts --saturation-step-time seconds once its users are spawned. The search ends when
+    it converges or the run time is over, and its results are written to capacity_report.json.
+    """
+
+    use_common_options = True
+
+    search: SaturationSearch | None = None
+    step_start: float = 0.0
+    snapshot: StatsSnapshot | None = None
+    reported: bool = False
+
+    def __init__(self):
+        super().__init__()
+        # locust quits at the run time before tick sees the end of the test, so the report is written on test stop
+        events.test_stop.add_listener(self.on_test_stop)
+
+    def tick(self):
+        options = self.runner.environment.parsed_options
+        run_time = self.get_run_time()
+        if self.search is None:
+            self.search = SaturationSearch(round(options.spawn_rate), options.num_users, Slo.from_options(options))
+            self.step_start = run_time
+
+        if self.search.done or run_time >= options.run_time:
+            self.write_report(options)
+            return None
+
+        step_time = getattr(options, "saturation_step_time", DEFAULT_STEP_TIME)
+        if self.snapshot is None:
+            # measurement starts once users of the step are spawned and the load had time to settle
+            if (
+                self.runner.user_count == self.search.users
+                and run_time - self.step_start >= step_time * SETTLE_FRACTION
+            ):
+                self.snapshot = StatsSnapshot.take(self.runner.stats.total)
+                self.step_start = run_time
+        elif run_time - self.step_start >= step_time * (1 - SETTLE_FRACTION):
+            step = StepResult.measure(
+                self.search.users, self.snapshot, StatsSnapshot.take(self.runner.stats.total), self.search.slo
+            )
+            self.search.record(step)
+            logger.info(
+                f"Step with {step.users} users: {step.rps} RPS, p95 {step.p95} ms, p99 {step.p99} ms, "
+                f"error rate {step.error_rate}% - {'passed' if step.passed else ', '.join(step.violations)}"
+            )
+            print(f"Step with {step.users} users {'passed' if step.passed else 'failed'} at {step.rps} RPS")
+            if self.search.done:
+                self.write_report(options)
+                return None
+            self.snapshot = None
+            self.step_start = run_time
+
+        return self.search.users, options.spawn_rate
+
+    def write_report(self, parsed_options: Namespace) -> None:
+        if self.reported or self.search is None:
+            return
+        self.reported = True
+        summary = self.search.summary()
+        print(summary)
+        logger.info(summary)
+        results_dir = get_results_dir(parsed_options)
+        if results_dir is not None:
+            path = self.search.write_report(results_dir / "capacity_report.json")
+            logger.info(f"Capacity report saved to {path}")
+
+    def on_test_stop(self, environment: Environment, **_kwargs) -> None:
+        if environment.parsed_options is not None and not isinstance(environment.runner, WorkerRunner):
+            self.write_report(environment.parsed_options)
@@ -1,4 +1,8 @@
-from locust import LoadTestShape
+from locust import LoadTestShape, events
+from locust.env import Environment
+from locust.runners import WorkerRunner
+
+from chainbench.util.capacity import CapacityCurve
 
 
 class SpikeLoadShape(LoadTestShape):
@@ -6,10 +10,17 @@ class SpikeLoadShape(LoadTestShape):
     A step load shape class that has the following shape:
     10% of users start at the beginning for 40% of the test duration, then 100% of users for 20% of the test duration,
     then 10% of users until the end of the test duration.
+    Throughput, latencies and errors of every phase are written to capacity_curve.csv and capacity_curve.html.
     """
 
     use_common_options = True
 
+    def __init__(self):
+        super().__init__()
+        self.capacity_curve = CapacityCurve()
+        # locust quits at the run time before tick sees the end of the test, so the curve is written on test stop
+        events.test_stop.add_listener(self.on_test_stop)
+
     def tick(self):
         run_time = self.get_run_time()
         total_run_time = self.runner.environment.parsed_options.run_time
@@ -19,10 +30,18 @@ class SpikeLoadShape(LoadTestShape):
 
         if run_time < spike_run_time_start:
             user_count = round(self.runner.environment.parsed_options.num_users / 10)
+            self.capacity_curve.track(self.runner, 1, user_count)
             return user_count, self.runner.environment.parsed_options.spawn_rate
         elif run_time < spike_run_time_end:
+            self.capacity_curve.track(self.runner, 2, self.runner.environment.parsed_options.num_users)
             return self.runner.environment.parsed_options.num_users, self.runner.environment.parsed_options.spawn_rate
         elif run_time < total_run_time:
             user_count = round(self.runner.environment.parsed_options.num_users / 10)
+            self.capacity_curve.track(self.runner, 3, user_count)
             return user_count, self.runner.environment.parsed_options.spawn_rate
+        self.capacity_curve.finish(self.runner)
         return None
+
+    def on_test_stop(self, environment: Environment, **_kwargs) -> None:
+        if not isinstance(environment.runner, WorkerRunner):
+            self.capacity_curve.finish(environment.runner)
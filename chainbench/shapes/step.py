@@ -1,16 +1,27 @@
 import math
 
-from locust import LoadTestShape
+from locust import LoadTestShape, events
+from locust.env import Environment
+from locust.runners import WorkerRunner
+
+from chainbench.util.capacity import CapacityCurve
 
 
 class StepLoadShape(LoadTestShape):
     """
     This load shape determines the number of steps by using the total number of users divided by the spawn rate.
     Duration of each step is calculated by dividing the total run time by the number of steps equally.
+    Throughput, latencies and errors of every step are written to capacity_curve.csv and capacity_curve.html.
     """
 
     use_common_options = True
 
+    def __init__(self):
+        super().__init__()
+        self.capacity_curve = CapacityCurve()
+        # locust quits at the run time before tick sees the end of the test, so the curve is written on test stop
+        events.test_stop.add_listener(self.on_test_stop)
+
     def tick(self):
         run_time = self.get_run_time()
         total_run_time = self.runner.environment.parsed_options.run_time
@@ -21,5 +32,11 @@ class StepLoadShape(LoadTestShape):
             no_of_steps = round(users / step)
             step_time = total_run_time / no_of_steps
             user_count = min(step * math.ceil(run_time / step_time), users)
+            self.capacity_curve.track(self.runner, math.ceil(run_time / step_time), user_count)
             return user_count, step
+        self.capacity_curve.finish(self.runner)
         return None
+
+    def on_test_stop(self, environment: Environment, **_kwargs) -> None:
+        if not isinstance(environment.runner, WorkerRunner):
+            self.capacity_curve.finish(environment.runner)
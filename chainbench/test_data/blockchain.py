@@ -1,16 +1,20 @@
 import logging
+import sys
 import typing as t
 from argparse import Namespace
 from dataclasses import dataclass
+from pathlib import Path
 
 import orjson as json
 from gevent.lock import Semaphore as GeventSemaphore
 from orjson.orjson import OPT_SORT_KEYS
 from tenacity import retry, stop_after_attempt
 
-from chainbench.util.http import HttpClient
+from chainbench.util.http import BatchNotSupportedError, HttpClient, JsonRpcError
 from chainbench.util.rng import RNG, get_rng
 
+from .shared import MappedBlocks
+
 logger = logging.getLogger(__name__)
 
 Account = str
@@ -32,6 +36,11 @@ def append_if_not_none(data: list | set, val: t.Any) -> None:
             data.add(val)
 
 
+def intern_if_str(value: t.Any) -> t.Any:
+    # values repeated across blocks, such as accounts, are stored once per process
+    return sys.intern(value) if isinstance(value, str) else value
+
+
 class BlockNotFoundError(Exception):
     # Raised when a block is not found for chains where slots can be empty
     pass
@@ -84,25 +93,118 @@ class Sizes:
 B = t.TypeVar("B", bound=Block)
 
 
+class BlockNumbers(t.Sequence[BlockNumber]):
+    """Read-only view of the block numbers in a BlockBuffer, membership checks use the buffer index."""
+
+    def __init__(self, buffer: "BlockBuffer"):
+        self._buffer = buffer
+
+    def __contains__(self, block_number: object) -> bool:
+        return block_number in self._buffer.positions
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @t.overload
+    def __getitem__(self, index: int) -> BlockNumber: ...
+
+    @t.overload
+    def __getitem__(self, index: slice) -> list[BlockNumber]: ...
+
+    def __getitem__(self, index: int | slice) -> BlockNumber | list[BlockNumber]:
+        if isinstance(index, slice):
+            return [block.block_number for block in self._buffer[index]]
+        return self._buffer[index].block_number
+
+
+class BlockBuffer(t.Sequence[B]):
+    """
+    Ring buffer of blocks with a fixed capacity, ordered from the oldest to the most recently pushed block.
+
+    Blocks are indexed by block number, so pushing a block, evicting the oldest one once the buffer is full
+    and checking whether a block number is in the buffer all take constant time.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(capacity, 1)
+        self._slots: list[B | None] = [None] * self.capacity
+        # blocks are addressed by the number of pushes before them, the oldest block is at position _head
+        self._head = 0
+        self._len = 0
+        self.positions: dict[BlockNumber, int] = {}
+        self.block_numbers = BlockNumbers(self)
+
+    def __len__(self) -> int:
+        return self._len
+
+    @t.overload
+    def __getitem__(self, index: int) -> B: ...
+
+    @t.overload
+    def __getitem__(self, index: slice) -> list[B]: ...
+
+    def __getitem__(self, index: int | slice) -> B | list[B]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("block index out of range")
+        return t.cast(B, self._slots[(self._head + index) % self.capacity])
+
+    def get(self, block_number: BlockNumber) -> B | None:
+        position = self.positions.get(block_number)
+        return None if position is None else self._slots[position % self.capacity]
+
+    def push(self, block: B) -> B | None:
+        """Append a block and return the evicted oldest block if the buffer was full."""
+        evicted: B | None = None
+        if self._len == self.capacity:
+            evicted = self._slots[self._head % self.capacity]
+            # a duplicate pushed later owns the index entry of its block number
+            if evicted is not None and self.positions.get(evicted.block_number) == self._head:
+                del self.positions[evicted.block_number]
+            self._head += 1
+            self._len -= 1
+        position = self._head + self._len
+        self._slots[position % self.capacity] = block
+        self.positions[block.block_number] = position
+        self._len += 1
+        return evicted
+
+
 class BlockchainData(t.Generic[B]):
     def __init__(self, size: Size, start: BlockNumber = 0, end: BlockNumber = 0):
         self.size = size
         self.block_range = BlockRange(start, end)
-        self.blocks: list[B] = []
-        self.block_numbers: list[BlockNumber] = []
+        self.blocks: BlockBuffer[B] | MappedBlocks[B] = BlockBuffer(size.blocks_len)
+        # latest block number of the chain seen so far, which depths of blocks referenced by calls are relative to
+        self.chain_head: BlockNumber = end
 
-    def to_json(self) -> str:
-        return json.dumps(self, default=lambda o: o.__dict__, option=OPT_SORT_KEYS).decode("utf-8")
+    @property
+    def block_numbers(self) -> t.Sequence[BlockNumber]:
+        return self.blocks.block_numbers
+
+    def to_json(self, include_blocks: bool = True) -> str:
+        data = {
+            "size": self.size,
+            "block_range": self.block_range,
+            "blocks": list(self.blocks) if include_blocks else [],
+            "block_numbers": list(self.block_numbers) if include_blocks else [],
+            "chain_head": self.chain_head,
+        }
+        return json.dumps(data, default=lambda o: o.__dict__, option=OPT_SORT_KEYS).decode("utf-8")
 
     def push_block(self, block: B) -> None:
-        if block.block_number in self.block_numbers:
+        if isinstance(self.blocks, MappedBlocks):
+            raise RuntimeError("Shared test data is read-only")
+        if block.block_number in self.blocks.block_numbers:
             logger.warning(f"Block {block.block_number} already exists in the data")
-        self.blocks.append(block)
-        self.block_numbers.append(block.block_number)
-        if len(self.blocks) > self.size.blocks_len:
-            self.blocks.pop(0)
-            self.block_numbers.pop(0)
-            self.block_range = BlockRange(self.block_numbers[0], self.block_numbers[-1])
+        if self.blocks.push(block) is not None:
+            # blocks are pushed in ascending order, so the oldest block left is the lowest, while the highest is
+            # tracked against every pushed block in case a block older than the end of the range is pushed
+            self.block_range = BlockRange(self.blocks[0].block_number, max(self.block_range.end, block.block_number))
+        self.chain_head = max(self.chain_head, block.block_number)
 
     def stats(self) -> str:
         return (
@@ -119,14 +221,15 @@ class TestData(t.Generic[B]):
 
         self._data: BlockchainData | None = None
         self._client: HttpClient | None = None
+        self._batch_supported = True
 
         self._lock = GeventSemaphore()
         self._logger.debug("Locking")
         self._lock.acquire()
         self._logger.debug("Locked")
 
-    def init_http_client(self, host_url: str) -> None:
-        self._client = HttpClient(host_url, timeout=60)
+    def init_http_client(self, host_url: str, concurrency: int = 1) -> None:
+        self._client = HttpClient(host_url, timeout=60, concurrency=concurrency)
         self._logger.debug("Host: %s", host_url)
 
     @property
@@ -157,15 +260,72 @@ class TestData(t.Generic[B]):
     def wait(self) -> None:
         self._lock.wait()
 
-    def fetch_block(self, block_number: BlockNumber) -> B:
+    def _block_rpc_call(self, block_number: BlockNumber | str) -> tuple[str, list[t.Any]]:
+        """Return the JSON-RPC method and params used to fetch a block."""
         raise NotImplementedError
 
+    def _block_from_result(self, block_number: BlockNumber | str, result: t.Any) -> B:
+        """Parse the JSON-RPC result of a block request."""
+        raise NotImplementedError
+
+    def _block_error(self, block_number: BlockNumber | str, error: JsonRpcError) -> Exception:
+        """Map the JSON-RPC error of a block request to the exception raised for that block."""
+        return error
+
+    def fetch_block(self, block_number: BlockNumber | str) -> B:
+        method, params = self._block_rpc_call(block_number)
+        try:
+            result = self.client.make_rpc_call(method, params)
+        except JsonRpcError as e:
+            raise self._block_error(block_number, e)
+        return self._block_from_result(block_number, result)
+
+    def fetch_blocks(
+        self, block_numbers: list[BlockNumber]
+    ) -> dict[BlockNumber, B | BlockNotFoundError | InvalidBlockError]:
+        """
+        Fetch several blocks, in a single JSON-RPC batch request when the endpoint supports it.
+
+        BlockNotFoundError and InvalidBlockError are returned in place of the blocks they were raised for.
+        Items failing with any other JSON-RPC error are fetched again with single calls, and endpoints that
+        reject batches are switched to single calls for the rest of the run.
+        """
+        results: dict[BlockNumber, B | BlockNotFoundError | InvalidBlockError] = {}
+        retry_single = list(block_numbers)
+        if self._batch_supported and len(block_numbers) > 1:
+            try:
+                responses = self.client.make_batch_rpc_call([self._block_rpc_call(n) for n in block_numbers])
+            except (NotImplementedError, BatchNotSupportedError) as e:
+                self._logger.info(f"Batch requests not supported, falling back to single calls: {e}")
+                self._batch_supported = False
+            else:
+                retry_single = []
+                for block_number, response in zip(block_numbers, responses):
+                    try:
+                        if isinstance(response, JsonRpcError):
+                            raise self._block_error(block_number, response)
+                        results[block_number] = self._block_from_result(block_number, response)
+                    except (BlockNotFoundError, InvalidBlockError) as e:
+                        results[block_number] = e
+                    except JsonRpcError:
+                        retry_single.append(block_number)
+        for block_number in retry_single:
+            try:
+                results[block_number] = self.fetch_block(block_number)
+            except (BlockNotFoundError, InvalidBlockError) as e:
+                results[block_number] = e
+        return results
+
     @retry(reraise=True, stop=stop_after_attempt(5))
     def fetch_latest_block(self) -> B:
         raise NotImplementedError
 
+    def fetch_chain_key(self) -> str:
+        """Return an identifier of the chain the client is connected to, used to key cached test data."""
+        raise NotImplementedError
+
     @retry(reraise=True, stop=stop_after_attempt(5))
-    def fetch_random_block(self, block_numbers: list[BlockNumber]) -> B:
+    def fetch_random_block(self, block_numbers: t.Container[BlockNumber]) -> B:
         rng = get_rng()
         while True:
             block_number = self.data.block_range.get_random_block_number(rng)
@@ -192,11 +352,27 @@ class TestData(t.Generic[B]):
         self._data = BlockchainData(size)
         self.data.block_range = self._get_start_and_end_blocks(parsed_options)
 
+    def init_data_from_blocks(self, size: Size, block_range: BlockRange, blocks: t.Iterable[B]) -> None:
+        self._data = BlockchainData(size)
+        for block in blocks:
+            self.data.push_block(block)
+        self.data.block_range = block_range
+
+    def attach_shared_data(self, path: Path) -> None:
+        """Replace the blocks in test data with the blocks from a shared test data file."""
+        blocks: MappedBlocks[B] = MappedBlocks(path, self.get_block_from_data)
+        self.data.blocks = blocks
+
     def init_data_from_json(self, json_data: str) -> None:
         data: dict[str, t.Any] = json.loads(json_data)
-        size = Size(**data["size"])
-        self._data = BlockchainData(size)
-        self.data.block_range = BlockRange(**data["block_range"])
+        # the head fetched before loading cached test data is more recent than the head of the cached data
+        chain_head = max(data.get("chain_head", 0), self._data.chain_head if self._data is not None else 0)
+        self.init_data_from_blocks(
+            Size(**data["size"]),
+            BlockRange(**data["block_range"]),
+            (self.get_block_from_data(block) for block in data.get("blocks", [])),
+        )
+        self.data.chain_head = max(self.data.chain_head, chain_head)
 
     @staticmethod
     def get_random_bool(rng: RNG | None = None) -> bool:
@@ -0,0 +1,217 @@
+import logging
+import time
+import typing as t
+from dataclasses import dataclass, field
+from itertools import islice
+
+import gevent
+from gevent.lock import Semaphore as GeventSemaphore
+from gevent.pool import Pool
+from tenacity import retry, stop_after_attempt
+
+from chainbench.util.rng import get_rng
+
+from .blockchain import (
+    Block,
+    BlockNotFoundError,
+    BlockNumber,
+    InvalidBlockError,
+    TestData,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 10
+DEFAULT_BATCH_SIZE = 10
+
+
+class RateLimiter:
+    """Token bucket rate limiter shared by all greenlets fetching from the same endpoint."""
+
+    _limiters: dict[str, "RateLimiter"] = {}
+
+    def __init__(self, rate: float | None = None):
+        self.rate = rate if rate else None
+        self._lock = GeventSemaphore()
+        self._next_slot = time.monotonic()
+
+    @classmethod
+    def for_endpoint(cls, endpoint: str, rate: float | None = None) -> "RateLimiter":
+        if endpoint not in cls._limiters:
+            cls._limiters[endpoint] = cls(rate)
+        limiter = cls._limiters[endpoint]
+        limiter.rate = rate if rate else None
+        return limiter
+
+    def wait(self, cost: int = 1) -> None:
+        if self.rate is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(self._next_slot, now) + cost / self.rate
+        if delay > 0:
+            gevent.sleep(delay)
+
+
+@dataclass
+class BootstrapProgress:
+    target: int
+    fetched: int = 0
+    failed: int = 0
+    requested: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        elapsed = self.elapsed
+        return self.fetched / elapsed if elapsed > 0 else 0.0
+
+    def stats(self) -> str:
+        return (
+            f"fetched = {self.fetched}/{self.target}, failed = {self.failed}, "
+            f"elapsed = {self.elapsed:.1f}s, throughput = {self.throughput:.1f} blocks/s"
+        )
+
+
+class TestDataBootstrap:
+    """
+    Fills test data with blocks fetched concurrently from the reference node.
+
+    Candidate block numbers are generated up front, deduplicated against blocks already in the data and
+    fetches in flight, and fetched in JSON-RPC batches of up to batch_size blocks by a pool of greenlets.
+    Random blocks are pushed to the test data as soon as they land, and on_block is called so they can be
+    forwarded to the workers straight away. Latest blocks are pushed in ascending order once all of them landed.
+    """
+
+    def __init__(
+        self,
+        test_data: TestData,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate_limit: float | None = None,
+        on_block: t.Callable[[Block], None] | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.test_data = test_data
+        self.concurrency = max(concurrency, 1)
+        self.batch_size = max(batch_size, 1)
+        self.limiter = RateLimiter.for_endpoint(test_data.client.host, rate_limit)
+        self.on_block = on_block
+        self.progress = BootstrapProgress(target=0)
+        self._pending: set[BlockNumber] = set()
+        self._error: BaseException | None = None
+        # blocks held back to be pushed in ascending order once all of them are fetched, when not None
+        self._collected: dict[BlockNumber, Block] | None = None
+
+    @retry(reraise=True, stop=stop_after_attempt(5))
+    def _fetch_blocks(
+        self, block_numbers: list[BlockNumber]
+    ) -> dict[BlockNumber, Block | BlockNotFoundError | InvalidBlockError]:
+        # the rate limit applies to blocks rather than HTTP requests, a batch costs as much as its items
+        self.limiter.wait(len(block_numbers))
+        self.progress.requested += len(block_numbers)
+        return self.test_data.fetch_blocks(block_numbers)
+
+    def _fetch_and_push(self, block_numbers: list[BlockNumber]) -> None:
+        try:
+            results = self._fetch_blocks(block_numbers)
+        except Exception as e:
+            if self._error is None:
+                self._error = e
+            return
+        finally:
+            self._pending.difference_update(block_numbers)
+        for result in results.values():
+            if isinstance(result, (BlockNotFoundError, InvalidBlockError)):
+                self.progress.failed += 1
+            else:
+                self._push_block(result)
+
+    def _push_block(self, block: Block) -> None:
+        data = self.test_data.data
+        if block.block_number in data.block_numbers or len(data.blocks) >= data.size.blocks_len:
+            return
+        if self._collected is not None:
+            if block.block_number not in self._collected and len(self._collected) < self.progress.target:
+                self._collected[block.block_number] = block
+                self.progress.fetched += 1
+                print(self.progress.stats(), end="\r")
+            return
+        data.push_block(block)
+        self.progress.fetched += 1
+        if self.on_block is not None:
+            self.on_block(block)
+        print(f"{data.stats()}, {self.progress.stats()}", end="\r")
+
+    def _run(self, block_numbers: t.Iterator[BlockNumber], needed: t.Callable[[], int]) -> None:
+        pool = Pool(self.concurrency)
+        while self._error is None:
+            pool.wait_available()
+            while self._error is None and 0 < needed() <= len(self._pending):
+                # every missing block is being fetched, more are only requested once a fetch completes
+                gevent.wait(list(pool), count=1)
+            if self._error is not None or needed() <= 0:
+                break
+            batch = list(islice(block_numbers, min(self.batch_size, needed() - len(self._pending))))
+            if not batch:
+                break
+            self._pending.update(batch)
+            pool.spawn(self._fetch_and_push, batch)
+        pool.join()
+        if self._collected is None:
+            print(f"{self.test_data.data.stats()}, {self.progress.stats()}")
+        if self._error is not None:
+            raise self._error
+
+    def _random_candidates(self) -> t.Iterator[BlockNumber]:
+        data = self.test_data.data
+        rng = get_rng("bootstrap")
+        attempted: set[BlockNumber] = set(data.block_numbers)
+        range_size = data.block_range.end - data.block_range.start + 1
+        while len(attempted) < range_size:
+            block_number = data.block_range.get_random_block_number(rng)
+            if block_number in attempted:
+                continue
+            attempted.add(block_number)
+            yield block_number
+        logger.warning("All blocks in range %s->%s were attempted", data.block_range.start, data.block_range.end)
+
+    def fetch_random_blocks(self) -> BootstrapProgress:
+        """Fetch random blocks from the block range until test data is full."""
+        data = self.test_data.data
+        self.progress = BootstrapProgress(target=data.size.blocks_len - len(data.blocks))
+        self._run(self._random_candidates(), lambda: data.size.blocks_len - len(data.blocks))
+        logger.info("Test data bootstrap finished: %s", self.progress.stats())
+        return self.progress
+
+    def fetch_latest_blocks(self) -> BootstrapProgress:
+        """
+        Fetch every block in the block range. Missing or invalid blocks are replaced by walking down from the
+        start of the range, so the data always holds the most recent valid blocks.
+        """
+        data = self.test_data.data
+        start, end = data.block_range.start, data.block_range.end
+        self.progress = BootstrapProgress(target=min(end - start + 1, data.size.blocks_len))
+        # blocks are fetched newest first and land out of order, but the data evicts blocks in the order they are
+        # pushed, so they are pushed oldest first and the head blocks received during the test evict the oldest
+        collected: dict[BlockNumber, Block] = {}
+        self._collected = collected
+        try:
+            self._run(iter(range(end, start - 1, -1)), lambda: self.progress.target - len(collected))
+            if len(collected) < self.progress.target:
+                self._run(iter(range(start - 1, -1, -1)), lambda: self.progress.target - len(collected))
+        finally:
+            self._collected = None
+        for block_number in sorted(collected):
+            data.push_block(collected[block_number])
+            if self.on_block is not None:
+                self.on_block(collected[block_number])
+        if collected:
+            data.block_range.start = min(collected)
+        print(f"{data.stats()}, {self.progress.stats()}")
+        logger.info("Test data bootstrap finished: %s", self.progress.stats())
+        return self.progress
@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+import shutil
+import time
+import typing as t
+from dataclasses import dataclass
+from pathlib import Path
+
+import orjson as json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "chainbench"
+DEFAULT_TTL = 24.0  # hours
+DEFAULT_MAX_SIZE = 1024  # megabytes
+
+CACHE_FORMAT_VERSION = 1
+DATA_FILE = "data.json"
+META_FILE = "meta.json"
+
+
+@dataclass(frozen=True)
+class CacheKey:
+    chain: str
+    size: str
+    block_range: str
+
+    @classmethod
+    def from_options(cls, chain: str, size: str, start_block: int | None, end_block: int | None) -> "CacheKey":
+        # without an explicit block range the range depends on the chain head at the time of the run,
+        # so any cached data for the chain and size is good enough
+        if start_block is None and end_block is None:
+            block_range = "auto"
+        else:
+            block_range = (
+                f"{start_block if start_block is not None else ''}-{end_block if end_block is not None else ''}"
+            )
+        return cls(chain, size.upper(), block_range)
+
+    @property
+    def path(self) -> Path:
+        return Path(self.chain) / self.size / self.block_range
+
+
+class TestDataCache:
+    """
+    On-disk cache of BlockchainData serialized with BlockchainData.to_json.
+
+    Every entry lives in <cache_dir>/<chain>/<size>/<block_range>/ and holds the data file and a metadata file
+    with its sha256 checksum. Entries older than ttl hours, or failing the integrity check, are discarded on
+    load, and the least recently used entries are evicted once the cache grows over max_size megabytes.
+    """
+
+    def __init__(self, cache_dir: Path | str | None = None, ttl: float = DEFAULT_TTL, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else DEFAULT_CACHE_DIR
+        self.ttl = ttl
+        self.max_size = max_size
+
+    def _entry_dir(self, key: CacheKey) -> Path:
+        return self.cache_dir / key.path
+
+    def _entries(self) -> list[Path]:
+        return [meta_file.parent for meta_file in self.cache_dir.glob(f"*/*/*/{META_FILE}")]
+
+    @staticmethod
+    def _read_meta(entry_dir: Path) -> dict[str, t.Any] | None:
+        try:
+            return json.loads((entry_dir / META_FILE).read_bytes())
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _entry_size(entry_dir: Path) -> int:
+        return sum(file.stat().st_size for file in entry_dir.iterdir() if file.is_file())
+
+    def _is_expired(self, meta: dict[str, t.Any]) -> bool:
+        return self.ttl > 0 and time.time() - meta["created_at"] > self.ttl * 3600
+
+    def remove(self, key: CacheKey) -> None:
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def load(self, key: CacheKey) -> str | None:
+        """Return cached test data for the key, or None if there is no valid entry."""
+        entry_dir = self._entry_dir(key)
+        meta = self._read_meta(entry_dir)
+        if meta is None:
+            return None
+        if meta.get("version") != CACHE_FORMAT_VERSION:
+            logger.info("Discarding test data cache entry %s with unsupported version", entry_dir)
+            self.remove(key)
+            return None
+        if self._is_expired(meta):
+            logger.info("Discarding expired test data cache entry %s", entry_dir)
+            self.remove(key)
+            return None
+        try:
+            data = (entry_dir / DATA_FILE).read_bytes()
+        except OSError:
+            self.remove(key)
+            return None
+        if hashlib.sha256(data).hexdigest() != meta["sha256"]:
+            logger.warning("Test data cache entry %s failed integrity check, discarding it", entry_dir)
+            self.remove(key)
+            return None
+        # mark the entry as recently used for eviction
+        os.utime(entry_dir / META_FILE)
+        return data.decode("utf-8")
+
+    def store(self, key: CacheKey, data: str) -> Path:
+        """Store test data for the key and evict old entries if the cache is over its size limit."""
+        entry_dir = self._entry_dir(key)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+        data_bytes = data.encode("utf-8")
+        meta = {
+            "version": CACHE_FORMAT_VERSION,
+            "created_at": time.time(),
+            "sha256": hashlib.sha256(data_bytes).hexdigest(),
+            "chain": key.chain,
+            "size": key.size,
+            "block_range": key.block_range,
+        }
+        # write to temporary files first so an interrupted run never leaves a partial entry behind
+        for name, content in ((DATA_FILE, data_bytes), (META_FILE, json.dumps(meta))):
+            tmp_file = entry_dir / f"{name}.tmp"
+            tmp_file.write_bytes(content)
+            os.replace(tmp_file, entry_dir / name)
+        self.evict()
+        return entry_dir / DATA_FILE
+
+    def evict(self) -> None:
+        """Remove expired entries, then the least recently used ones until the cache fits in max_size."""
+        entries: list[tuple[float, int, Path]] = []
+        for entry_dir in self._entries():
+            meta = self._read_meta(entry_dir)
+            if meta is None or self._is_expired(meta):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                continue
+            entries.append(((entry_dir / META_FILE).stat().st_mtime, self._entry_size(entry_dir), entry_dir))
+        if self.max_size <= 0:
+            return
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries):
+            if total_size <= self.max_size * 1024 * 1024:
+                break
+            logger.info("Evicting test data cache entry %s", entry_dir)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_size -= size
@@ -98,8 +98,8 @@ class EthBeaconBlock(Block):
 
 
 class EthBeaconTestData(TestData[EthBeaconBlock]):
-    def init_http_client(self, host_url: str):
-        self._client = HttpClient(host_url, error_level=HttpErrorLevel.ServerError)
+    def init_http_client(self, host_url: str, concurrency: int = 1):
+        self._client = HttpClient(host_url, error_level=HttpErrorLevel.ServerError, concurrency=concurrency)
         self._logger.debug("Host: %s", host_url)
 
     def fetch_block_header(self, block_id: int | str) -> dict[str, t.Any]:
@@ -125,6 +125,9 @@ class EthBeaconTestData(TestData[EthBeaconBlock]):
         committees_response = self.client.get(f"/eth/v1/beacon/states/{block_id}/committees", params={"slot": slot})
         return EthBeaconBlock.from_response(slot, committees_response.json)
 
+    def fetch_chain_key(self) -> str:
+        return self.client.get("/eth/v1/beacon/genesis").json["data"]["genesis_validators_root"]
+
     @retry(reraise=True, stop=stop_after_attempt(20), wait=wait_fixed(1))
     def fetch_latest_block(self) -> EthBeaconBlock:
         return self.fetch_block("head")
@@ -11,6 +11,7 @@ from .blockchain import (
     Account,
     Block,
     BlockHash,
+    BlockNotFoundError,
     BlockNumber,
     BlockRange,
     InvalidBlockError,
@@ -20,6 +21,7 @@ from .blockchain import (
     Tx,
     TxHash,
     append_if_not_none,
+    intern_if_str,
     parse_hex_to_int,
 )
 
@@ -426,6 +428,24 @@ class EvmBlock(Block):
     tx_hashes: list[TxHash]
     accounts: list[Account]
 
+    # limit it to 100 txs per block
+    MAX_TXS: t.ClassVar[int] = 100
+    # tx fields read by param factories, the rest of the tx is dropped to keep test data small in every worker
+    TX_FIELDS: t.ClassVar[tuple[str, ...]] = ("from", "to", "input", "value", "blockNumber", "accessList")
+
+    def __post_init__(self) -> None:
+        # runs for blocks fetched from the node as well as blocks received from master or loaded from disk,
+        # blocks read from shared test data are already compact and their list fields are decoded on access
+        if not isinstance(self.txs, list):
+            return
+        object.__setattr__(self, "txs", [self.compact_tx(tx) for tx in self.txs[: self.MAX_TXS]])
+        object.__setattr__(self, "tx_hashes", [intern_if_str(tx_hash) for tx_hash in self.tx_hashes])
+        object.__setattr__(self, "accounts", [intern_if_str(account) for account in self.accounts])
+
+    @classmethod
+    def compact_tx(cls, tx: Tx) -> Tx:
+        return {key: intern_if_str(tx[key]) if key != "input" else tx[key] for key in cls.TX_FIELDS if key in tx}
+
     @classmethod
     def from_response(cls, block_number: BlockNumber, data: dict[str, t.Any]):
         block_hash: BlockHash = data["hash"]
@@ -433,8 +453,7 @@ class EvmBlock(Block):
         tx_hashes: list[TxHash] = []
         accounts: set[Account] = set()
         for index, tx in enumerate(txs):
-            if index == 100:
-                # limit it to 100 per block
+            if index == cls.MAX_TXS:
                 break
             append_if_not_none(accounts, tx["from"])
             append_if_not_none(accounts, tx["to"])
@@ -478,10 +497,13 @@ class EvmTestData(TestData[EvmBlock]):
     def fetch_chain_id(self) -> ChainId:
         return parse_hex_to_int(self.client.make_rpc_call("eth_chainId"))
 
+    def fetch_chain_key(self) -> str:
+        return str(self.fetch_chain_id())
+
     def fetch_latest_block_number(self) -> BlockNumber:
         return parse_hex_to_int(self.client.make_rpc_call("eth_blockNumber"))
 
-    def fetch_block(self, block_number: BlockNumber | str) -> EvmBlock:
+    def _block_rpc_call(self, block_number: BlockNumber | str) -> tuple[str, list[t.Any]]:
         if isinstance(block_number, int):
             block_number = hex(block_number)
         elif (block_number := block_number.lower()) not in [
@@ -491,7 +513,11 @@ class EvmTestData(TestData[EvmBlock]):
             "finalized",
         ]:
             raise ValueError("Invalid block number")
-        result: dict[str, t.Any] = self.client.make_rpc_call("eth_getBlockByNumber", [block_number, True])
+        return "eth_getBlockByNumber", [block_number, True]
+
+    def _block_from_result(self, block_number: BlockNumber | str, result: t.Any) -> EvmBlock:
+        if result is None:
+            raise BlockNotFoundError
         block = EvmBlock.from_response(parse_hex_to_int(result["number"]), result)
         if len(block.txs) == 0:
             raise InvalidBlockError
@@ -502,6 +528,7 @@ class EvmTestData(TestData[EvmBlock]):
 
     def _get_start_and_end_blocks(self, parsed_options: Namespace) -> BlockRange:
         latest_block_number = self.fetch_latest_block_number()
+        self.data.chain_head = latest_block_number
         if parsed_options.start_block is not None:
             self.start_block_number = parsed_options.start_block
         else:
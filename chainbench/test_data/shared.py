@@ -0,0 +1,185 @@
+import dataclasses
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import typing as t
+from array import array
+from collections.abc import Sequence
+from functools import lru_cache
+from pathlib import Path
+
+import orjson as json
+
+logger = logging.getLogger(__name__)
+
+SHARED_FORMAT_MAGIC = b"CBTD"
+SHARED_FORMAT_VERSION = 1
+# magic, version, number of blocks, length of the list fields record
+HEADER = struct.Struct("=4sIQQ")
+DEFAULT_CACHE_SIZE = 1024
+
+T = t.TypeVar("T")
+
+
+def get_shared_data_dir() -> Path:
+    # prefer tmpfs so pages are never written back to disk
+    shm = Path("/dev/shm")
+    return shm if shm.is_dir() and os.access(shm, os.W_OK) else Path(tempfile.gettempdir())
+
+
+def _dumps(value: t.Any) -> bytes:
+    return json.dumps(value, default=lambda o: o.__dict__)
+
+
+def _read_array(buffer: mmap.mmap, typecode: str, start: int, length: int) -> tuple[array, int]:
+    values = array(typecode)
+    end = start + length * values.itemsize
+    values.frombytes(buffer[start:end])
+    return values, end
+
+
+def write_shared_blocks(blocks: t.Sequence[t.Any], path: Path) -> Path:
+    """
+    Write blocks to a file that worker processes map into memory with MappedBlocks.
+
+    Scalar fields of each block are stored in one JSON record per block, and every item of list fields,
+    such as txs, tx_hashes and accounts, in a record of its own, so workers can decode single items instead
+    of whole blocks. Offsets tables are stored in native byte order, the file is only read on the same machine.
+    """
+    list_fields = (
+        [field.name for field in dataclasses.fields(blocks[0]) if isinstance(getattr(blocks[0], field.name), list)]
+        if blocks
+        else []
+    )
+    block_numbers = array("q")
+    meta_offsets = array("Q", [0])
+    item_bounds = array("Q", [0])
+    item_offsets = array("Q", [0])
+    meta_records: list[bytes] = []
+    item_records: list[bytes] = []
+    for block in blocks:
+        block_numbers.append(block.block_number)
+        meta = {
+            field.name: getattr(block, field.name)
+            for field in dataclasses.fields(block)
+            if field.name not in list_fields
+        }
+        meta_records.append(_dumps(meta))
+        meta_offsets.append(meta_offsets[-1] + len(meta_records[-1]))
+        for name in list_fields:
+            for item in getattr(block, name):
+                item_records.append(_dumps(item))
+                item_offsets.append(item_offsets[-1] + len(item_records[-1]))
+            item_bounds.append(len(item_records))
+
+    fields_record = _dumps(list_fields)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as file:
+        file.write(HEADER.pack(SHARED_FORMAT_MAGIC, SHARED_FORMAT_VERSION, len(blocks), len(fields_record)))
+        file.write(fields_record)
+        for table in (block_numbers, meta_offsets, item_bounds, array("Q", [len(item_records)]), item_offsets):
+            file.write(table.tobytes())
+        file.writelines(meta_records)
+        file.writelines(item_records)
+    os.replace(tmp_path, path)
+    logger.info("Shared test data with %s blocks and %s items written to %s", len(blocks), len(item_records), path)
+    return path
+
+
+class MappedItems(Sequence[t.Any]):
+    """Read-only list field of a mapped block, items are decoded on access."""
+
+    def __init__(self, buffer: mmap.mmap, offsets: array, records_start: int, start: int, end: int):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._records_start = records_start
+        self._start = start
+        self._len = end - start
+
+    def __len__(self) -> int:
+        return self._len
+
+    @t.overload
+    def __getitem__(self, index: int) -> t.Any: ...
+
+    @t.overload
+    def __getitem__(self, index: slice) -> list[t.Any]: ...
+
+    def __getitem__(self, index: int | slice) -> t.Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("item index out of range")
+        item = self._start + index
+        return json.loads(
+            self._buffer[self._records_start + self._offsets[item] : self._records_start + self._offsets[item + 1]]
+        )
+
+
+class MappedBlocks(Sequence[T]):
+    """
+    Read-only sequence of blocks backed by a file written with write_shared_blocks.
+
+    The file is memory mapped, so all workers on a machine share a single copy of the data in the page cache.
+    Blocks are built on access from their scalar fields, with list fields left as MappedItems, and the most
+    recently used ones are kept in a small per-process cache.
+    """
+
+    def __init__(self, path: Path, decode: t.Callable[[dict[str, t.Any]], T], cache_size: int = DEFAULT_CACHE_SIZE):
+        self.path = path
+        self._decode = decode
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, fields_length = HEADER.unpack_from(self._mmap)
+        if magic != SHARED_FORMAT_MAGIC or version != SHARED_FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a shared test data file")
+        self._count: int = count
+        position = HEADER.size + fields_length
+        self._list_fields: list[str] = json.loads(self._mmap[HEADER.size : position])
+        block_numbers, position = _read_array(self._mmap, "q", position, count)
+        self.block_numbers: list[int] = block_numbers.tolist()
+        self._meta_offsets, position = _read_array(self._mmap, "Q", position, count + 1)
+        self._item_bounds, position = _read_array(self._mmap, "Q", position, count * len(self._list_fields) + 1)
+        items_count, position = _read_array(self._mmap, "Q", position, 1)
+        self._item_offsets, position = _read_array(self._mmap, "Q", position, items_count[0] + 1)
+        self._meta_start = position
+        self._items_start = position + self._meta_offsets[-1]
+        self._get_block = lru_cache(maxsize=cache_size)(self._load_block)
+
+    def _load_block(self, index: int) -> T:
+        data: dict[str, t.Any] = json.loads(
+            self._mmap[self._meta_start + self._meta_offsets[index] : self._meta_start + self._meta_offsets[index + 1]]
+        )
+        bound = index * len(self._list_fields)
+        for offset, name in enumerate(self._list_fields):
+            data[name] = MappedItems(
+                self._mmap,
+                self._item_offsets,
+                self._items_start,
+                self._item_bounds[bound + offset],
+                self._item_bounds[bound + offset + 1],
+            )
+        return self._decode(data)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @t.overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @t.overload
+    def __getitem__(self, index: slice) -> list[T]: ...
+
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("block index out of range")
+        return self._get_block(index)
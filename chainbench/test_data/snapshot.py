@@ -0,0 +1,133 @@
+import gzip
+import logging
+import time
+import typing as t
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import orjson as json
+from orjson import OPT_SORT_KEYS
+
+from .blockchain import Block, BlockRange, Size, TestData
+from .evm import ChainId, EvmTestData
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "chainbench-test-data"
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotError(Exception):
+    # Raised when a snapshot file is invalid or does not match the test data it is loaded into
+    pass
+
+
+@dataclass
+class SnapshotHeader:
+    test_data: str
+    chain: str
+    size: Size
+    block_range: BlockRange
+    blocks: int
+    chain_id: ChainId | None = None
+    created_at: float = field(default_factory=time.time)
+    format: str = SNAPSHOT_FORMAT
+    version: int = SNAPSHOT_VERSION
+
+    def to_json(self) -> bytes:
+        return json.dumps(self, default=lambda o: o.__dict__, option=OPT_SORT_KEYS)
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "SnapshotHeader":
+        try:
+            header: dict[str, t.Any] = json.loads(data)
+        except json.JSONDecodeError as e:
+            raise SnapshotError(f"Invalid snapshot header: {e}")
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise SnapshotError("File is not a chainbench test data snapshot")
+        if header.get("version") != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot version: {header.get('version')}")
+        header["size"] = Size(**header["size"])
+        header["block_range"] = BlockRange(**header["block_range"])
+        return cls(**header)
+
+
+def _dump_block(block: Block) -> bytes:
+    return json.dumps(block, default=lambda o: o.__dict__)
+
+
+def write_snapshot(test_data: TestData, path: Path, chain: str) -> SnapshotHeader:
+    """
+    Write test data to a snapshot file.
+
+    Snapshots are gzip compressed JSON lines, a header line followed by one line per block, so they can be
+    written and read back one block at a time.
+    """
+    header = SnapshotHeader(
+        test_data=type(test_data).__name__,
+        chain=chain,
+        size=test_data.data.size,
+        block_range=test_data.data.block_range,
+        blocks=len(test_data.data.blocks),
+        chain_id=test_data.network.chain_id if isinstance(test_data, EvmTestData) else None,
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wb") as file:
+        file.write(header.to_json() + b"\n")
+        for block in test_data.data.blocks:
+            file.write(_dump_block(block) + b"\n")
+    logger.info("Test data snapshot with %s blocks written to %s", header.blocks, path)
+    return header
+
+
+def read_snapshot(path: Path) -> tuple[SnapshotHeader, t.Iterator[dict[str, t.Any]]]:
+    """Read the header of a snapshot file and return it with an iterator over its blocks."""
+    file = gzip.open(path, "rb")
+    try:
+        header = SnapshotHeader.from_json(file.readline())
+    except (OSError, EOFError) as e:
+        file.close()
+        raise SnapshotError(f"Failed to read snapshot {path}: {e}")
+    except SnapshotError:
+        file.close()
+        raise
+
+    def blocks() -> t.Iterator[dict[str, t.Any]]:
+        with file:
+            count = 0
+            for line in file:
+                yield json.loads(line)
+                count += 1
+        if count != header.blocks:
+            raise SnapshotError(f"Snapshot {path} is truncated: expected {header.blocks} blocks, found {count}")
+
+    return header, blocks()
+
+
+def load_snapshot(test_data: TestData, path: Path) -> SnapshotHeader:
+    """Load test data from a snapshot file, without making any request to the reference node."""
+    header, blocks = read_snapshot(path)
+    if header.test_data != type(test_data).__name__:
+        raise SnapshotError(
+            f"Snapshot {path} contains {header.test_data} but the profile uses {type(test_data).__name__}"
+        )
+    test_data.init_data_from_blocks(
+        header.size, header.block_range, (test_data.get_block_from_data(block) for block in blocks)
+    )
+    if isinstance(test_data, EvmTestData) and header.chain_id is not None:
+        test_data.init_network(header.chain_id)
+    logger.info("Test data snapshot with %s blocks loaded from %s", header.blocks, path)
+    return header
+
+
+def snapshot_to_json(path: Path) -> tuple[SnapshotHeader, str]:
+    """Convert a snapshot file to the format produced by BlockchainData.to_json."""
+    header, blocks = read_snapshot(path)
+    block_list = list(blocks)
+    data = {
+        "size": header.size,
+        "block_range": header.block_range,
+        "blocks": block_list,
+        "block_numbers": [block["block_number"] for block in block_list],
+    }
+    return header, json.dumps(data, default=lambda o: o.__dict__, option=OPT_SORT_KEYS).decode("utf-8")
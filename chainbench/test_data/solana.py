@@ -32,6 +32,11 @@ Slot = BlockNumber
 class SolanaBlock(EvmBlock):
     block_height: BlockNumber
 
+    @classmethod
+    def compact_tx(cls, tx: Tx) -> Tx:
+        # accounts are already collected in the block, only the signatures of the tx are kept
+        return {"transaction": {"signatures": tx["transaction"]["signatures"]}}
+
     @classmethod
     def from_response(cls, slot: Slot, data: dict[str, t.Any]):
         block_height = data["blockHeight"]
@@ -40,10 +45,8 @@ class SolanaBlock(EvmBlock):
         tx_hashes: list[TxHash] = []
         accounts: set[Account] = set()
         for index, tx in enumerate(txs):
-            if index == 100:
-                # limit it to 100 per block
+            if index == cls.MAX_TXS:
                 break
-            append_if_not_none(txs, tx)
             append_if_not_none(tx_hashes, tx["transaction"]["signatures"][0])
             for account in tx["transaction"]["accountKeys"]:
                 if account["pubkey"] != "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA":
@@ -61,34 +64,38 @@ class SolanaTestData(TestData[SolanaBlock]):
             data_dict = data
         return SolanaBlock(**data_dict)
 
+    def fetch_chain_key(self) -> str:
+        return self.client.make_rpc_call("getGenesisHash")
+
     def fetch_latest_block_number(self) -> Slot:
         slot = self.client.make_rpc_call("getLatestBlockhash")["context"]["slot"]
         return slot
 
-    def fetch_block(self, slot: Slot) -> SolanaBlock:
+    def _block_rpc_call(self, slot: Slot | str) -> tuple[str, list[t.Any]]:
         config_object = {
             "encoding": "json",
             "transactionDetails": "accounts",
             "rewards": False,
             "maxSupportedTransactionVersion": 0,
         }
-        try:
-            result = self.client.make_rpc_call("getBlock", [slot, config_object])
-        except JsonRpcError as e:
-            self._logger.error(f"Failed to fetch block {slot}: {e.code} {e.message}")
-            print(f"Failed to fetch block {slot}: {e.code} {e.message}")
+        return "getBlock", [slot, config_object]
 
-            if e.code in [-32004, -32007, -32014]:
-                # block not found
-                raise BlockNotFoundError()
-            else:
-                raise e
-
-        block = SolanaBlock.from_response(slot, result)
+    def _block_from_result(self, slot: Slot | str, result: t.Any) -> SolanaBlock:
+        # getBlock only takes slot numbers
+        block = SolanaBlock.from_response(int(slot), result)
         if len(block.txs) == 0:
             raise InvalidBlockError
         return block
 
+    def _block_error(self, slot: Slot | str, error: JsonRpcError) -> Exception:
+        self._logger.error(f"Failed to fetch block {slot}: {error.code} {error.message}")
+        print(f"Failed to fetch block {slot}: {error.code} {error.message}")
+
+        if error.code in [-32004, -32007, -32014]:
+            # block not found
+            return BlockNotFoundError()
+        return error
+
     @retry(reraise=True, stop=stop_after_attempt(5))
     def fetch_latest_block(self) -> SolanaBlock:
         return self.fetch_block(self.fetch_latest_block_number())
@@ -101,6 +108,7 @@ class SolanaTestData(TestData[SolanaBlock]):
         super()._get_start_and_end_blocks(parsed_options)
         earliest_available_block_number = self._fetch_first_available_block()
         latest_block_number = self.fetch_latest_block_number()
+        self.data.chain_head = latest_block_number
         # factor in run_time and add 10% buffer to ensure blocks used in test data are
         # not removed from the ledger
         earliest_available_block_number += int((parsed_options.run_time / self.BLOCK_TIME) * 1.1)
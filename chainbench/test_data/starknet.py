@@ -3,9 +3,11 @@ import typing as t
 
 import orjson as json
 
+from ..util.http import JsonRpcError
 from .blockchain import (
     Account,
     BlockHash,
+    BlockNotFoundError,
     BlockNumber,
     InvalidBlockError,
     Tx,
@@ -19,6 +21,8 @@ logger = logging.getLogger(__name__)
 
 
 class StarkNetBlock(EvmBlock):
+    TX_FIELDS: t.ClassVar[tuple[str, ...]] = ("transaction_hash", "sender_address", "type")
+
     @classmethod
     def from_response(cls, block_number: BlockNumber, data: dict[str, t.Any]):
         block_hash: BlockHash = data["block_hash"]
@@ -26,11 +30,9 @@ class StarkNetBlock(EvmBlock):
         tx_hashes: list[TxHash] = []
         accounts: set[Account] = set()
         for index, tx in enumerate(txs):
-            if index == 100:
-                # limit it to 100 per block
+            if index == cls.MAX_TXS:
                 break
             append_if_not_none(tx_hashes, tx["transaction_hash"])
-            append_if_not_none(txs, tx)
             try:
                 append_if_not_none(accounts, tx["sender_address"])
             except KeyError:
@@ -52,16 +54,26 @@ class StarkNetTestData(EvmTestData):
     def fetch_latest_block_number(self) -> BlockNumber:
         return self.client.make_rpc_call("starknet_blockNumber")
 
-    def fetch_block(self, block_number: BlockNumber | str) -> StarkNetBlock:
+    def _block_rpc_call(self, block_number: BlockNumber | str) -> tuple[str, list[t.Any]]:
         if isinstance(block_number, str) and (block_number := block_number.lower()) not in (
             "latest",
             "pending",
         ):
             raise ValueError("Invalid block number")
         params: dict[str, int] | str = {"block_number": block_number} if isinstance(block_number, int) else block_number
+        return "starknet_getBlockWithTxs", [params]
 
-        result = self.client.make_rpc_call("starknet_getBlockWithTxs", [params])
+    def _block_from_result(self, block_number: BlockNumber | str, result: t.Any) -> StarkNetBlock:
         block = StarkNetBlock.from_response(result["block_number"], result)
         if len(block.txs) == 0:
             raise InvalidBlockError
         return block
+
+    def _block_error(self, block_number: BlockNumber | str, error: JsonRpcError) -> Exception:
+        if error.code == 24:
+            # BLOCK_NOT_FOUND
+            return BlockNotFoundError()
+        return error
+
+    def fetch_block(self, block_number: BlockNumber | str) -> StarkNetBlock:
+        return t.cast(StarkNetBlock, super().fetch_block(block_number))
@@ -0,0 +1,386 @@
+import csv
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import typing as t
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+import orjson as json
+import psutil
+
+from chainbench.user.common import all_methods
+
+CPU_SAMPLE_INTERVAL = 1.0
+# share of a core a worker is planned to use, which leaves room for bursts and for the master
+DEFAULT_HEADROOM = 0.7
+# workers above this share of a core during calibration were saturated, so requests per user are underestimated
+SATURATED_UTILIZATION = 0.9
+# seconds skipped after all users are spawned before measuring, so startup costs are not counted
+SETTLE_TIME = 2
+MOCK_NODE_STARTUP_TIMEOUT = 30.0
+
+
+@dataclass
+class RunResult:
+    """Request rate and CPU cost of a single calibration run with one worker, measured after all users spawned."""
+
+    name: str
+    requests: int
+    duration: float
+    cpu_seconds: float
+    users: int
+    batch_size: int = 1
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.duration if self.duration > 0 else 0.0
+
+    @property
+    def cpu_ms_per_request(self) -> float:
+        return self.cpu_seconds * 1000 / self.requests if self.requests > 0 else 0.0
+
+    @property
+    def rps_per_core(self) -> float:
+        """Requests per second a worker can send when it uses a whole core."""
+        return self.requests / self.cpu_seconds if self.cpu_seconds > 0 else 0.0
+
+    @property
+    def utilization(self) -> float:
+        return self.cpu_seconds / self.duration if self.duration > 0 else 0.0
+
+    @property
+    def rps_per_user(self) -> float:
+        return self.rps / self.users if self.users > 0 else 0.0
+
+    def to_dict(self) -> dict[str, t.Any]:
+        return {
+            **asdict(self),
+            "rps": round(self.rps, 2),
+            "cpu_ms_per_request": round(self.cpu_ms_per_request, 4),
+            "rps_per_core": round(self.rps_per_core, 2),
+            "utilization": round(self.utilization, 3),
+            "rps_per_user": round(self.rps_per_user, 4),
+        }
+
+
+@dataclass
+class Recommendation:
+    target_rps: float
+    workers: int
+    users: int
+    warnings: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ProfileCalibration:
+    profile: str
+    mix: RunResult
+    batch: RunResult | None = None
+    methods: list[RunResult] = field(default_factory=list)
+    recommendation: Recommendation | None = None
+
+    def to_dict(self) -> dict[str, t.Any]:
+        return {
+            "profile": self.profile,
+            "mix": self.mix.to_dict(),
+            "batch": self.batch.to_dict() if self.batch is not None else None,
+            "methods": [result.to_dict() for result in self.methods],
+            "recommendation": asdict(self.recommendation) if self.recommendation is not None else None,
+        }
+
+
+def machine_info() -> dict[str, t.Any]:
+    try:
+        chainbench_version = version("chainbench")
+    except PackageNotFoundError:
+        chainbench_version = "unknown"
+    return {
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "logical_cpus": psutil.cpu_count(logical=True),
+        "physical_cpus": psutil.cpu_count(logical=False),
+        "memory_bytes": psutil.virtual_memory().total,
+        "python": platform.python_version(),
+        "chainbench": chainbench_version,
+    }
+
+
+def recommend(
+    result: RunResult,
+    target_rps: float,
+    headroom: float = DEFAULT_HEADROOM,
+    cpu_count: int | None = None,
+) -> Recommendation:
+    """Recommend the number of workers and users sending target_rps requests per second with the profile."""
+    warnings: list[str] = []
+    if result.rps_per_core <= 0 or result.rps_per_user <= 0:
+        return Recommendation(target_rps, 1, 1, ["No requests were measured, the profile can't be calibrated."])
+    workers = max(1, math.ceil(target_rps / (result.rps_per_core * headroom)))
+    users = max(1, math.ceil(target_rps / result.rps_per_user))
+    if cpu_count is None:
+        cpu_count = psutil.cpu_count(logical=False) or psutil.cpu_count() or 1
+    if workers > max(1, cpu_count - 1):
+        warnings.append(
+            f"{workers} workers need more cores than the {cpu_count} physical cores of this machine can spare besides "
+            f"the master, the load generator will be the bottleneck. Split the load across several machines."
+        )
+    if result.utilization >= SATURATED_UTILIZATION:
+        warnings.append(
+            f"The worker was saturated during calibration ({result.utilization:.0%} of a core), users are "
+            f"overestimated. Calibrate again with fewer users."
+        )
+    return Recommendation(target_rps, workers, users, warnings)
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = MOCK_NODE_STARTUP_TIMEOUT) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Mock node exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Mock node did not start listening on port {port} within {timeout} seconds")
+
+
+def start_mock_node(processes: int = 1) -> tuple[subprocess.Popen, str]:
+    """Start a mock node in a subprocess, return it with its URL once it's listening."""
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "chainbench.main",
+            "mock-node",
+            "--port",
+            str(port),
+            "--processes",
+            str(processes),
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    wait_for_port(port, process)
+    return process, f"http://127.0.0.1:{port}"
+
+
+class WorkerCpuSampler:
+    """
+    Samples the CPU time used by the locust worker processes started by a chainbench process. CPU time of every
+    worker is kept after it exits, so the samples are cumulative.
+    """
+
+    def __init__(self, pid: int):
+        self.root = psutil.Process(pid)
+        self.cpu_times: dict[int, float] = {}
+        self.samples: list[tuple[float, float]] = []
+
+    def sample(self) -> None:
+        try:
+            children = self.root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return
+        for child in children:
+            try:
+                if "--worker" not in child.cmdline():
+                    continue
+                cpu_times = child.cpu_times()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            self.cpu_times[child.pid] = cpu_times.user + cpu_times.system
+        self.samples.append((time.time(), sum(self.cpu_times.values())))
+
+    def cpu_seconds_at(self, timestamp: float) -> float:
+        """Return the CPU time used by workers up to the last sample taken at or before the timestamp."""
+        cpu_seconds = 0.0
+        for sample_time, sample_cpu_seconds in self.samples:
+            if sample_time > timestamp:
+                break
+            cpu_seconds = sample_cpu_seconds
+        return cpu_seconds
+
+
+def read_history(path: Path) -> list[tuple[int, int, int]]:
+    """Return the timestamp, user count and total request count of every aggregated row of a stats history file."""
+    with path.open(newline="") as f:
+        return [
+            (int(row["Timestamp"]), int(row["User Count"]), int(row["Total Request Count"]))
+            for row in csv.DictReader(f)
+            if row["Name"] == "Aggregated"
+        ]
+
+
+def measure(name: str, results_path: Path, sampler: WorkerCpuSampler, users: int, batch_size: int = 1) -> RunResult:
+    """
+    Measure the request rate and CPU cost of a run from the stats history of locust and the CPU samples of the
+    worker, between SETTLE_TIME seconds after all users spawned and the last row before users stopped.
+    """
+    history = read_history(results_path / "report.csv_stats_history.csv")
+    running = [row for row in history if row[1] >= users]
+    if len(running) < 2:
+        raise RuntimeError(f"Run {name} ended before all {users} users spawned, increase the test time")
+    start = next((row for row in running if row[0] >= running[0][0] + SETTLE_TIME), running[0])
+    end = running[-1]
+    if end[0] <= start[0]:
+        start = running[0]
+    return RunResult(
+        name=name,
+        requests=end[2] - start[2],
+        duration=float(end[0] - start[0]),
+        cpu_seconds=sampler.cpu_seconds_at(end[0] + 1) - sampler.cpu_seconds_at(start[0] + 1),
+        users=users,
+        batch_size=batch_size,
+    )
+
+
+def read_request_names(results_path: Path) -> list[str]:
+    with (results_path / "report.csv_stats.csv").open(newline="") as f:
+        return [row["Name"] for row in csv.DictReader(f) if row["Name"] != "Aggregated"]
+
+
+class Calibrator:
+    """
+    Runs profiles with a single worker against a stand-in endpoint, usually a local mock node, and measures the
+    requests per second and the CPU time of the worker. Every profile is run with its mix of requests, in batch
+    mode and, unless disabled, once for every method of the profile, so the cost of single request types such as
+    heavy responses can be compared.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        results_dir: Path,
+        users: int,
+        test_time: str,
+        method_test_time: str,
+        batch_size: int,
+        extra_args: t.Sequence[str] = (),
+    ):
+        self.target = target
+        self.results_dir = results_dir
+        self.users = users
+        self.test_time = test_time
+        self.method_test_time = method_test_time
+        self.batch_size = batch_size
+        self.extra_args = list(extra_args)
+
+    def run(self, name: str, args: list[str], test_time: str, batch_size: int = 1) -> RunResult:
+        run_id = name.replace("/", "_")
+        command = [
+            sys.executable,
+            "-m",
+            "chainbench.main",
+            "start",
+            *args,
+            "--target",
+            self.target,
+            "--headless",
+            "--autoquit",
+            "--workers",
+            "1",
+            "--users",
+            str(self.users),
+            "--spawn-rate",
+            str(self.users),
+            "--test-time",
+            test_time,
+            "--size",
+            "XS",
+            "--use-latest-blocks",
+            "--results-dir",
+            str(self.results_dir),
+            "--run-id",
+            run_id,
+            *self.extra_args,
+        ]
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        log_path = self.results_dir / f"{run_id}.log"
+        with log_path.open("wb") as log_file:
+            process = subprocess.Popen(command, stdout=log_file, stderr=subprocess.STDOUT)
+            sampler = WorkerCpuSampler(process.pid)
+            while process.poll() is None:
+                sampler.sample()
+                time.sleep(CPU_SAMPLE_INTERVAL)
+            sampler.sample()
+        if process.returncode != 0:
+            raise RuntimeError(f"Run {name} failed with exit code {process.returncode}, see {log_path}")
+        return measure(name, self.results_dir / run_id, sampler, self.users, batch_size)
+
+    def calibrate_profile(self, profile: str, methods: bool = True) -> ProfileCalibration:
+        mix = self.run(profile, ["--profile", profile], self.test_time)
+        calibration = ProfileCalibration(profile, mix)
+        batch = self.run(
+            f"{profile}-batch",
+            ["--profile", profile, "--batch", "--batch-size", str(self.batch_size)],
+            self.test_time,
+            self.batch_size,
+        )
+        # profiles of REST APIs such as the beacon API send no batch requests
+        calibration.batch = batch if batch.requests > 0 else None
+        if methods:
+            for method in read_request_names(self.results_dir / profile.replace("/", "_")):
+                if method in all_methods:
+                    calibration.methods.append(self.run(method, [method], self.method_test_time))
+        return calibration
+
+
+def save_calibration(
+    path: Path,
+    profiles: list[ProfileCalibration],
+    settings: dict[str, t.Any],
+) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "settings": settings,
+        "profiles": [calibration.to_dict() for calibration in profiles],
+    }
+    path.write_bytes(json.dumps(data, option=json.OPT_INDENT_2))
+    return path
+
+
+def load_calibration(path: Path) -> dict[str, t.Any]:
+    return json.loads(path.read_bytes())
+
+
+def compare_calibrations(previous: dict[str, t.Any], current: dict[str, t.Any]) -> list[str]:
+    """Describe the change of requests per core of every run found in both calibrations."""
+
+    def runs(calibration: dict[str, t.Any]) -> dict[str, float]:
+        result: dict[str, float] = {}
+        for profile in calibration["profiles"]:
+            for run in [profile["mix"], profile["batch"], *profile["methods"]]:
+                if run is not None:
+                    result[run["name"]] = run["rps_per_core"]
+        return result
+
+    previous_runs, current_runs = runs(previous), runs(current)
+    lines = []
+    for name, rps_per_core in current_runs.items():
+        if name not in previous_runs:
+            continue
+        before = previous_runs[name]
+        change = (rps_per_core - before) / before * 100 if before > 0 else 0.0
+        lines.append(f"{name}: {before:.1f} -> {rps_per_core:.1f} requests per core-second ({change:+.1f}%)")
+    return lines
+
+
+def default_mock_processes() -> int:
+    # half the cores serve the mock node, which keeps it faster than the single worker being calibrated
+    return max(1, (os.cpu_count() or 2) // 2)
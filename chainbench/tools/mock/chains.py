@@ -0,0 +1,754 @@
+import base64
+import hashlib
+import time
+import typing as t
+from dataclasses import dataclass, field
+
+import base58
+
+DEFAULT_TXS_PER_BLOCK = 50
+DEFAULT_RESULT_SIZE = 32
+EVM_CHAIN_ID = 1
+STARKNET_CHAIN_ID = "0x534e5f4d41494e"
+# number of distinct accounts used in transactions, so params drawn from test data repeat as on a real chain
+ACCOUNTS = 1000
+BEACON_COMMITTEES = 8
+VALIDATORS_PER_COMMITTEE = 128
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+
+class MockRpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def digest(*parts: t.Any, size: int = 32) -> bytes:
+    """Return deterministic pseudo random bytes of any size for the given parts."""
+    if 0 < size <= 64:
+        return hashlib.blake2b(repr(parts).encode(), digest_size=size).digest()
+    chunks = [hashlib.blake2b(repr((parts, i)).encode()).digest() for i in range((size + 63) // 64)]
+    return b"".join(chunks)[:size]
+
+
+def hex_digest(*parts: t.Any, size: int = 32) -> str:
+    return "0x" + digest(*parts, size=size).hex()
+
+
+def parse_int(value: t.Any) -> int:
+    if isinstance(value, str):
+        return int(value, 16) if value.startswith("0x") else int(value)
+    return int(value)
+
+
+@dataclass
+class SyntheticChain:
+    """
+    Head and block time of a synthetic chain. The head advances with the block time from the time the chain is
+    created, so tests using latest blocks see new blocks, and blocks after the head don't exist yet.
+    """
+
+    initial_head: int
+    block_time: float
+    first_block: int = 0
+    start_time: float = field(default_factory=time.time)
+
+    @property
+    def head(self) -> int:
+        return self.initial_head + int((time.time() - self.start_time) / self.block_time)
+
+    def timestamp(self, number: int) -> int:
+        return int(self.start_time - (self.initial_head - number) * self.block_time)
+
+    def exists(self, number: int) -> bool:
+        return self.first_block <= number <= self.head
+
+
+class EvmChain:
+    """
+    Answers EVM JSON-RPC methods with synthetic but structurally valid results. Block and transaction hashes
+    encode the block number and transaction index, so any hash returned by the chain can be looked up again.
+    """
+
+    def __init__(
+        self,
+        chain_id: int = EVM_CHAIN_ID,
+        txs_per_block: int = DEFAULT_TXS_PER_BLOCK,
+        result_size: int = DEFAULT_RESULT_SIZE,
+    ):
+        self.chain_id = chain_id
+        self.txs_per_block = txs_per_block
+        self.result = "0x" + digest("result", size=result_size).hex()
+        self.chain = SyntheticChain(initial_head=20_000_000, block_time=12)
+        self.accounts = ["0x" + digest("account", i, size=20).hex() for i in range(ACCOUNTS)]
+        self.methods: dict[str, t.Callable[[list[t.Any]], t.Any]] = {
+            "eth_chainId": lambda _: hex(self.chain_id),
+            "net_version": lambda _: str(self.chain_id),
+            "net_listening": lambda _: True,
+            "net_peerCount": lambda _: "0x19",
+            "web3_clientVersion": lambda _: "chainbench-mock/v1.0.0",
+            "eth_syncing": lambda _: False,
+            "eth_accounts": lambda _: [],
+            "eth_blockNumber": lambda _: hex(self.chain.head),
+            "eth_gasPrice": lambda _: hex(20 * 10**9),
+            "eth_maxPriorityFeePerGas": lambda _: hex(10**9),
+            "eth_estimateGas": lambda _: "0x5208",
+            "eth_getBalance": lambda params: hex(int.from_bytes(digest("balance", params[0], size=8), "big")),
+            "eth_getTransactionCount": lambda params: hex(digest("nonce", params[0], size=2)[0]),
+            "eth_getCode": lambda _: self.result,
+            "eth_getStorageAt": lambda params: hex_digest("storage", *params[:2]),
+            "eth_call": lambda _: self.result,
+            "eth_feeHistory": self.fee_history,
+            "eth_getBlockByNumber": lambda params: self.block(
+                self.block_number(params[0]), bool(params[1:2] and params[1])
+            ),
+            "eth_getBlockByHash": lambda params: self.block(
+                self.hash_block_number(params[0]), bool(params[1:2] and params[1])
+            ),
+            "eth_getHeaderByNumber": lambda params: self.block(self.block_number(params[0]), False, header=True),
+            "eth_getHeaderByHash": lambda params: self.block(self.hash_block_number(params[0]), False, header=True),
+            "eth_getBlockTransactionCountByNumber": lambda params: self.tx_count(self.block_number(params[0])),
+            "eth_getBlockTransactionCountByHash": lambda params: self.tx_count(self.hash_block_number(params[0])),
+            "eth_getUncleCountByBlockNumber": lambda _: "0x0",
+            "eth_getUncleCountByBlockHash": lambda _: "0x0",
+            "eth_getTransactionByHash": lambda params: self.tx_by_hash(params[0]),
+            "eth_getTransactionByBlockNumberAndIndex": lambda params: self.tx(
+                self.block_number(params[0]), parse_int(params[1])
+            ),
+            "eth_getTransactionByBlockHashAndIndex": lambda params: self.tx(
+                self.hash_block_number(params[0]), parse_int(params[1])
+            ),
+            "eth_getTransactionReceipt": lambda params: self.receipt_by_hash(params[0]),
+            "eth_getBlockReceipts": self.block_receipts,
+            "eth_getLogs": self.logs,
+        }
+
+    def handle(self, method: str, params: list[t.Any]) -> t.Any:
+        handler = self.methods.get(method)
+        if handler is not None:
+            return handler(params)
+        if method.startswith("debug_trace"):
+            return {"gas": 21000, "failed": False, "returnValue": "", "structLogs": []}
+        if method.startswith("trace_"):
+            return []
+        return self.result
+
+    def block_number(self, value: t.Any) -> int | None:
+        if value in ("latest", "pending", "safe", "finalized"):
+            return self.chain.head
+        if value == "earliest":
+            return 0
+        number = parse_int(value)
+        return number if self.chain.exists(number) else None
+
+    def block_hash(self, number: int) -> str:
+        return f"0x{number:016x}" + digest("block", number, size=24).hex()
+
+    def hash_block_number(self, block_hash: str) -> int | None:
+        try:
+            number = int(block_hash[2:18], 16)
+        except (TypeError, ValueError):
+            return None
+        return number if self.chain.exists(number) and self.block_hash(number) == block_hash.lower() else None
+
+    def tx_hash(self, number: int, index: int) -> str:
+        return f"0x{number:016x}{index:08x}" + digest("tx", number, index, size=20).hex()
+
+    def tx_location(self, tx_hash: str) -> tuple[int, int] | None:
+        try:
+            number, index = int(tx_hash[2:18], 16), int(tx_hash[18:26], 16)
+        except (TypeError, ValueError):
+            return None
+        if not self.chain.exists(number) or index >= self.txs_per_block or self.tx_hash(number, index) != tx_hash:
+            return None
+        return number, index
+
+    def tx_count(self, number: int | None) -> str | None:
+        return hex(self.txs_per_block) if number is not None else None
+
+    def tx(self, number: int | None, index: int) -> dict[str, t.Any] | None:
+        if number is None or index >= self.txs_per_block:
+            return None
+        return {
+            "blockHash": self.block_hash(number),
+            "blockNumber": hex(number),
+            "chainId": hex(self.chain_id),
+            "from": self.accounts[(number * 31 + index) % ACCOUNTS],
+            "to": self.accounts[(number * 17 + index * 7 + 1) % ACCOUNTS],
+            "gas": "0x5208",
+            "gasPrice": hex(20 * 10**9),
+            "maxFeePerGas": hex(30 * 10**9),
+            "maxPriorityFeePerGas": hex(10**9),
+            "hash": self.tx_hash(number, index),
+            "input": "0x",
+            "nonce": hex(number % 1000 + index),
+            "transactionIndex": hex(index),
+            "value": hex(10**15 * (index + 1)),
+            "type": "0x2",
+            "accessList": [],
+            "v": "0x1",
+            "r": hex_digest("r", number, index),
+            "s": hex_digest("s", number, index),
+        }
+
+    def tx_by_hash(self, tx_hash: str) -> dict[str, t.Any] | None:
+        location = self.tx_location(tx_hash)
+        return self.tx(*location) if location is not None else None
+
+    def block(self, number: int | None, full: bool, header: bool = False) -> dict[str, t.Any] | None:
+        if number is None:
+            return None
+        block: dict[str, t.Any] = {
+            "number": hex(number),
+            "hash": self.block_hash(number),
+            "parentHash": self.block_hash(number - 1),
+            "nonce": "0x0000000000000000",
+            "sha3Uncles": hex_digest("uncles"),
+            "logsBloom": "0x" + "00" * 256,
+            "transactionsRoot": hex_digest("transactions", number),
+            "stateRoot": hex_digest("state", number),
+            "receiptsRoot": hex_digest("receipts", number),
+            "miner": self.accounts[number % ACCOUNTS],
+            "difficulty": "0x0",
+            "extraData": "0x",
+            "size": hex(1000 + 150 * self.txs_per_block),
+            "gasLimit": hex(30_000_000),
+            "gasUsed": hex(21000 * self.txs_per_block),
+            "timestamp": hex(self.chain.timestamp(number)),
+            "baseFeePerGas": hex(10 * 10**9),
+            "mixHash": hex_digest("mix", number),
+        }
+        if header:
+            return block
+        block["uncles"] = []
+        block["withdrawals"] = []
+        if full:
+            block["transactions"] = [self.tx(number, index) for index in range(self.txs_per_block)]
+        else:
+            block["transactions"] = [self.tx_hash(number, index) for index in range(self.txs_per_block)]
+        return block
+
+    def log(self, number: int, index: int) -> dict[str, t.Any]:
+        tx = self.tx(number, index)
+        assert tx is not None
+        return {
+            "address": self.accounts[(number + index) % ACCOUNTS],
+            "topics": [TRANSFER_TOPIC, "0x" + tx["from"][2:].rjust(64, "0"), "0x" + tx["to"][2:].rjust(64, "0")],
+            "data": "0x" + digest("log", number, index).hex(),
+            "blockNumber": hex(number),
+            "blockHash": self.block_hash(number),
+            "transactionHash": tx["hash"],
+            "transactionIndex": hex(index),
+            "logIndex": hex(index),
+            "removed": False,
+        }
+
+    def receipt(self, number: int, index: int) -> dict[str, t.Any]:
+        tx = self.tx(number, index)
+        assert tx is not None
+        return {
+            "transactionHash": tx["hash"],
+            "transactionIndex": hex(index),
+            "blockHash": tx["blockHash"],
+            "blockNumber": tx["blockNumber"],
+            "from": tx["from"],
+            "to": tx["to"],
+            "cumulativeGasUsed": hex(21000 * (index + 1)),
+            "gasUsed": "0x5208",
+            "effectiveGasPrice": hex(11 * 10**9),
+            "contractAddress": None,
+            "logs": [self.log(number, index)],
+            "logsBloom": "0x" + "00" * 256,
+            "status": "0x1",
+            "type": "0x2",
+        }
+
+    def receipt_by_hash(self, tx_hash: str) -> dict[str, t.Any] | None:
+        location = self.tx_location(tx_hash)
+        return self.receipt(*location) if location is not None else None
+
+    def block_receipts(self, params: list[t.Any]) -> list[dict[str, t.Any]] | None:
+        number = self.block_number(params[0])
+        if number is None:
+            return None
+        return [self.receipt(number, index) for index in range(self.txs_per_block)]
+
+    def logs(self, params: list[t.Any]) -> list[dict[str, t.Any]]:
+        log_filter: dict[str, t.Any] = params[0] if params and isinstance(params[0], dict) else {}
+        if "blockHash" in log_filter:
+            number = self.hash_block_number(log_filter["blockHash"])
+            numbers = [number] if number is not None else []
+        else:
+            from_block = self.block_number(log_filter.get("fromBlock", "latest"))
+            to_block = self.block_number(log_filter.get("toBlock", "latest"))
+            if from_block is None or to_block is None:
+                return []
+            # large ranges are answered with logs of their first blocks only, to keep responses bounded
+            numbers = list(range(from_block, min(to_block, from_block + 99) + 1))
+        return [self.log(number, index) for number in numbers for index in range(min(self.txs_per_block, 5))]
+
+    def fee_history(self, params: list[t.Any]) -> dict[str, t.Any]:
+        count = min(parse_int(params[0]) if params else 1, 1024)
+        head = self.chain.head
+        return {
+            "oldestBlock": hex(head - count + 1),
+            "baseFeePerGas": [hex(10 * 10**9)] * (count + 1),
+            "gasUsedRatio": [0.5] * count,
+            "reward": [[hex(10**9)] * len(params[2])] * count if len(params) > 2 and params[2] else [],
+        }
+
+
+class SolanaChain:
+    """
+    Answers Solana JSON-RPC methods with synthetic but structurally valid results. Transaction signatures encode
+    the slot and index of the transaction, so any signature returned by the chain can be looked up again.
+    """
+
+    def __init__(self, txs_per_block: int = DEFAULT_TXS_PER_BLOCK, result_size: int = DEFAULT_RESULT_SIZE):
+        self.txs_per_block = txs_per_block
+        self.data_size = result_size
+        self.data = base64.b64encode(digest("account data", size=result_size)).decode()
+        self.chain = SyntheticChain(initial_head=300_000_000, block_time=0.4)
+        self.chain.first_block = self.chain.initial_head - 1_000_000
+        self.accounts = [base58.b58encode(digest("account", i)).decode() for i in range(ACCOUNTS)]
+        self.genesis_hash = base58.b58encode(digest("genesis")).decode()
+        self.methods: dict[str, t.Callable[[list[t.Any]], t.Any]] = {
+            "getGenesisHash": lambda _: self.genesis_hash,
+            "getHealth": lambda _: "ok",
+            "getVersion": lambda _: {"solana-core": "2.0.0", "feature-set": 0},
+            "getIdentity": lambda _: {"identity": self.accounts[0]},
+            "getSlot": lambda _: self.chain.head,
+            "getBlockHeight": lambda _: self.block_height(self.chain.head),
+            "getFirstAvailableBlock": lambda _: self.chain.first_block,
+            "minimumLedgerSlot": lambda _: self.chain.first_block,
+            "getLatestBlockhash": lambda _: self.with_context(
+                {"blockhash": self.blockhash(self.chain.head), "lastValidBlockHeight": self.chain.head + 150}
+            ),
+            "isBlockhashValid": lambda _: self.with_context(True),
+            "getBlock": self.block,
+            "getBlockTime": lambda params: self.chain.timestamp(int(params[0])),
+            "getBlocks": lambda params: list(
+                range(int(params[0]), min(int(params[1]) if len(params) > 1 else self.chain.head, self.chain.head) + 1)
+            )[:500_000],
+            "getBlocksWithLimit": lambda params: list(range(int(params[0]), int(params[0]) + int(params[1]))),
+            "getTransaction": lambda params: self.transaction_by_signature(params[0]),
+            "getSignaturesForAddress": self.signatures_for_address,
+            "getSignatureStatuses": lambda params: self.with_context(
+                [
+                    {"slot": self.chain.head, "confirmations": None, "err": None, "confirmationStatus": "finalized"}
+                    for _ in params[0]
+                ]
+            ),
+            "getBalance": lambda params: self.with_context(self.lamports(params[0])),
+            "getAccountInfo": lambda params: self.with_context(self.account(params[0])),
+            "getMultipleAccounts": lambda params: self.with_context([self.account(key) for key in params[0]]),
+            "getProgramAccounts": lambda params: [
+                {"pubkey": self.accounts[i], "account": self.account(self.accounts[i])} for i in range(10)
+            ],
+            "getTokenAccountBalance": lambda params: self.with_context(self.token_amount(params[0])),
+            "getTokenSupply": lambda params: self.with_context(self.token_amount(params[0])),
+            "getEpochInfo": lambda _: {
+                "absoluteSlot": self.chain.head,
+                "blockHeight": self.block_height(self.chain.head),
+                "epoch": self.chain.head // 432_000,
+                "slotIndex": self.chain.head % 432_000,
+                "slotsInEpoch": 432_000,
+                "transactionCount": self.chain.head * self.txs_per_block,
+            },
+            "getTransactionCount": lambda _: self.chain.head * self.txs_per_block,
+            "getMinimumBalanceForRentExemption": lambda _: 890880,
+            "getFeeForMessage": lambda _: self.with_context(5000),
+        }
+
+    def handle(self, method: str, params: list[t.Any]) -> t.Any:
+        handler = self.methods.get(method)
+        if handler is not None:
+            return handler(params)
+        return self.with_context(None)
+
+    def with_context(self, value: t.Any) -> dict[str, t.Any]:
+        return {"context": {"slot": self.chain.head, "apiVersion": "2.0.0"}, "value": value}
+
+    def block_height(self, slot: int) -> int:
+        return slot - 20_000_000
+
+    def blockhash(self, slot: int) -> str:
+        return base58.b58encode(digest("block", slot)).decode()
+
+    def signature(self, slot: int, index: int) -> str:
+        return base58.b58encode(
+            digest("tx", slot, index, size=52) + slot.to_bytes(8, "big") + index.to_bytes(4, "big")
+        ).decode()
+
+    def signature_location(self, signature: str) -> tuple[int, int] | None:
+        try:
+            raw = base58.b58decode(signature)
+        except ValueError:
+            return None
+        if len(raw) != 64:
+            return None
+        slot, index = int.from_bytes(raw[52:60], "big"), int.from_bytes(raw[60:], "big")
+        if not self.chain.exists(slot) or index >= self.txs_per_block or self.signature(slot, index) != signature:
+            return None
+        return slot, index
+
+    def lamports(self, account: str) -> int:
+        return int.from_bytes(digest("lamports", account, size=5), "big")
+
+    def account(self, account: str) -> dict[str, t.Any]:
+        return {
+            "data": [self.data, "base64"],
+            "executable": False,
+            "lamports": self.lamports(account),
+            "owner": "11111111111111111111111111111111",
+            "rentEpoch": 18446744073709551615,
+            "space": self.data_size,
+        }
+
+    @staticmethod
+    def token_amount(account: str) -> dict[str, t.Any]:
+        amount = int.from_bytes(digest("token", account, size=6), "big")
+        return {"amount": str(amount), "decimals": 6, "uiAmount": amount / 10**6, "uiAmountString": str(amount / 10**6)}
+
+    def transaction(self, slot: int, index: int, details: str = "full") -> dict[str, t.Any]:
+        signer = self.accounts[(slot * 31 + index) % ACCOUNTS]
+        receiver = self.accounts[(slot * 17 + index * 7 + 1) % ACCOUNTS]
+        signature = self.signature(slot, index)
+        meta = {
+            "err": None,
+            "fee": 5000,
+            "preBalances": [self.lamports(signer), self.lamports(receiver)],
+            "postBalances": [self.lamports(signer) - 5000, self.lamports(receiver)],
+            "status": {"Ok": None},
+        }
+        if details == "accounts":
+            transaction: dict[str, t.Any] = {
+                "signatures": [signature],
+                "accountKeys": [
+                    {"pubkey": signer, "signer": True, "source": "transaction", "writable": True},
+                    {"pubkey": receiver, "signer": False, "source": "transaction", "writable": True},
+                ],
+            }
+        else:
+            transaction = {
+                "signatures": [signature],
+                "message": {
+                    "accountKeys": [signer, receiver, "11111111111111111111111111111111"],
+                    "header": {
+                        "numRequiredSignatures": 1,
+                        "numReadonlySignedAccounts": 0,
+                        "numReadonlyUnsignedAccounts": 1,
+                    },
+                    "instructions": [{"accounts": [0, 1], "data": "3Bxs4h24hBtQy9rw", "programIdIndex": 2}],
+                    "recentBlockhash": self.blockhash(slot - 1),
+                },
+            }
+        return {"transaction": transaction, "meta": meta, "version": 0}
+
+    def block(self, params: list[t.Any]) -> dict[str, t.Any]:
+        slot = int(params[0])
+        if not self.chain.exists(slot):
+            raise MockRpcError(-32004, f"Block not available for slot {slot}")
+        config: dict[str, t.Any] = params[1] if len(params) > 1 and isinstance(params[1], dict) else {}
+        details = config.get("transactionDetails", "full")
+        block: dict[str, t.Any] = {
+            "blockHeight": self.block_height(slot),
+            "blockTime": self.chain.timestamp(slot),
+            "blockhash": self.blockhash(slot),
+            "parentSlot": slot - 1,
+            "previousBlockhash": self.blockhash(slot - 1),
+        }
+        if details == "signatures":
+            block["signatures"] = [self.signature(slot, index) for index in range(self.txs_per_block)]
+        elif details != "none":
+            block["transactions"] = [self.transaction(slot, index, details) for index in range(self.txs_per_block)]
+        return block
+
+    def transaction_by_signature(self, signature: str) -> dict[str, t.Any] | None:
+        location = self.signature_location(signature)
+        if location is None:
+            return None
+        slot, index = location
+        return {"slot": slot, "blockTime": self.chain.timestamp(slot), **self.transaction(slot, index)}
+
+    def signatures_for_address(self, params: list[t.Any]) -> list[dict[str, t.Any]]:
+        config: dict[str, t.Any] = params[1] if len(params) > 1 and isinstance(params[1], dict) else {}
+        head = self.chain.head
+        return [
+            {
+                "signature": self.signature(head - i, i % self.txs_per_block),
+                "slot": head - i,
+                "err": None,
+                "memo": None,
+                "blockTime": self.chain.timestamp(head - i),
+                "confirmationStatus": "finalized",
+            }
+            for i in range(min(int(config.get("limit", 1000)), 1000))
+        ]
+
+
+class StarkNetChain:
+    """Answers StarkNet JSON-RPC methods with synthetic but structurally valid results."""
+
+    def __init__(self, txs_per_block: int = DEFAULT_TXS_PER_BLOCK):
+        self.txs_per_block = txs_per_block
+        self.chain = SyntheticChain(initial_head=1_000_000, block_time=30)
+        self.accounts = ["0x" + digest("account", i, size=31).hex() for i in range(ACCOUNTS)]
+        self.methods: dict[str, t.Callable[[list[t.Any]], t.Any]] = {
+            "starknet_chainId": lambda _: STARKNET_CHAIN_ID,
+            "starknet_specVersion": lambda _: "0.7.1",
+            "starknet_syncing": lambda _: False,
+            "starknet_blockNumber": lambda _: self.chain.head,
+            "starknet_blockHashAndNumber": lambda _: {
+                "block_hash": self.block_hash(self.chain.head),
+                "block_number": self.chain.head,
+            },
+            "starknet_getBlockWithTxs": lambda params: self.block(self.block_number(params[0]), True),
+            "starknet_getBlockWithTxHashes": lambda params: self.block(self.block_number(params[0]), False),
+            "starknet_getBlockTransactionCount": lambda params: self.block_number(params[0]) and self.txs_per_block,
+            "starknet_getTransactionByHash": lambda params: self.tx(*self.tx_location(params[0])),
+            "starknet_getTransactionByBlockIdAndIndex": lambda params: self.tx(
+                self.block_number(params[0]), int(params[1])
+            ),
+            "starknet_getTransactionReceipt": lambda params: self.receipt(*self.tx_location(params[0])),
+            "starknet_getTransactionStatus": lambda params: self.tx_location(params[0])
+            and {"finality_status": "ACCEPTED_ON_L2", "execution_status": "SUCCEEDED"},
+            "starknet_getNonce": lambda _: "0x1",
+            "starknet_getStorageAt": lambda params: hex_digest("storage", *params[:2], size=31),
+            "starknet_getClassHashAt": lambda params: hex_digest("class", params[-1], size=31),
+            "starknet_call": lambda _: [hex_digest("call", size=31)],
+            "starknet_getEvents": self.events,
+        }
+
+    def handle(self, method: str, params: list[t.Any] | dict[str, t.Any]) -> t.Any:
+        if isinstance(params, dict):
+            params = list(params.values())
+        handler = self.methods.get(method)
+        if handler is not None:
+            return handler(params)
+        return "0x0"
+
+    def block_number(self, block_id: t.Any) -> int:
+        if block_id in ("latest", "pending"):
+            return self.chain.head
+        if isinstance(block_id, dict) and "block_number" in block_id:
+            number = int(block_id["block_number"])
+        elif isinstance(block_id, dict) and "block_hash" in block_id:
+            number = int(block_id["block_hash"][3:19], 16)
+        else:
+            number = -1
+        if not self.chain.exists(number):
+            raise MockRpcError(24, "Block not found")
+        return number
+
+    def block_hash(self, number: int) -> str:
+        return f"0x0{number:016x}" + digest("block", number, size=23).hex()
+
+    def tx_hash(self, number: int, index: int) -> str:
+        return f"0x0{number:016x}{index:08x}" + digest("tx", number, index, size=19).hex()
+
+    def tx_location(self, tx_hash: str) -> tuple[int, int]:
+        try:
+            number, index = int(tx_hash[3:19], 16), int(tx_hash[19:27], 16)
+        except (TypeError, ValueError):
+            raise MockRpcError(29, "Transaction hash not found")
+        if not self.chain.exists(number) or index >= self.txs_per_block or self.tx_hash(number, index) != tx_hash:
+            raise MockRpcError(29, "Transaction hash not found")
+        return number, index
+
+    def tx(self, number: int, index: int) -> dict[str, t.Any]:
+        if index >= self.txs_per_block:
+            raise MockRpcError(27, "Invalid transaction index in a block")
+        return {
+            "transaction_hash": self.tx_hash(number, index),
+            "type": "INVOKE",
+            "version": "0x1",
+            "sender_address": self.accounts[(number * 31 + index) % ACCOUNTS],
+            "calldata": [hex(index), hex_digest("calldata", number, index, size=31)],
+            "max_fee": hex(10**15),
+            "signature": [hex_digest("r", number, index, size=31), hex_digest("s", number, index, size=31)],
+            "nonce": hex(number % 1000 + index),
+        }
+
+    def block(self, number: int, full: bool) -> dict[str, t.Any]:
+        return {
+            "status": "ACCEPTED_ON_L2",
+            "block_hash": self.block_hash(number),
+            "parent_hash": self.block_hash(number - 1),
+            "block_number": number,
+            "new_root": hex_digest("root", number, size=31),
+            "timestamp": self.chain.timestamp(number),
+            "sequencer_address": self.accounts[0],
+            "l1_gas_price": {"price_in_fri": hex(10**14), "price_in_wei": hex(10**10)},
+            "starknet_version": "0.13.2",
+            "transactions": [
+                self.tx(number, index) if full else self.tx_hash(number, index) for index in range(self.txs_per_block)
+            ],
+        }
+
+    def receipt(self, number: int, index: int) -> dict[str, t.Any]:
+        return {
+            "transaction_hash": self.tx_hash(number, index),
+            "type": "INVOKE",
+            "actual_fee": {"amount": hex(10**13), "unit": "WEI"},
+            "execution_status": "SUCCEEDED",
+            "finality_status": "ACCEPTED_ON_L2",
+            "block_hash": self.block_hash(number),
+            "block_number": number,
+            "messages_sent": [],
+            "events": [],
+            "execution_resources": {"steps": 1000},
+        }
+
+    def events(self, params: list[t.Any]) -> dict[str, t.Any]:
+        head = self.chain.head
+        return {
+            "events": [
+                {
+                    "from_address": self.accounts[i % ACCOUNTS],
+                    "keys": [hex_digest("key", i, size=31)],
+                    "data": [hex(i)],
+                    "block_hash": self.block_hash(head - i),
+                    "block_number": head - i,
+                    "transaction_hash": self.tx_hash(head - i, 0),
+                }
+                for i in range(10)
+            ],
+            "continuation_token": None,
+        }
+
+
+class BeaconChain:
+    """Answers Ethereum beacon API requests with synthetic but structurally valid responses."""
+
+    def __init__(self, validators_per_committee: int = VALIDATORS_PER_COMMITTEE):
+        self.validators_per_committee = validators_per_committee
+        self.chain = SyntheticChain(initial_head=9_000_000, block_time=12)
+        self.genesis_validators_root = hex_digest("genesis validators")
+
+    def handle(self, path: str, query: dict[str, str]) -> tuple[int, t.Any]:
+        """Return the HTTP status code and the body of the response to a GET request."""
+        parts = path.strip("/").split("/")
+        if parts[:3] == ["eth", "v1", "node"]:
+            return 200, {
+                "data": {"version": "chainbench-mock/v1.0.0", "is_syncing": False, "head_slot": str(self.chain.head)}
+            }
+        if parts[:3] == ["eth", "v1", "config"]:
+            return 200, {
+                "data": (
+                    {"chain_id": "1", "address": "0x00000000219ab540356cBB839Cbe05303d7705Fa"}
+                    if parts[3:] == ["deposit_contract"]
+                    else {}
+                )
+            }
+        if parts[:4] == ["eth", "v1", "beacon", "genesis"]:
+            return 200, {
+                "data": {
+                    "genesis_time": "1606824023",
+                    "genesis_validators_root": self.genesis_validators_root,
+                    "genesis_fork_version": "0x00000000",
+                }
+            }
+        if parts[:4] == ["eth", "v1", "beacon", "pool"]:
+            return 200, {"data": []}
+        if parts[:4] == ["eth", "v1", "beacon", "headers"]:
+            slot = self.slot(parts[4] if len(parts) > 4 else "head")
+            if slot is None:
+                return 404, {"code": 404, "message": "NOT_FOUND: beacon block"}
+            header = self.header(slot)
+            return 200, {"data": header if len(parts) > 4 else [header]}
+        if parts[:3] in (["eth", "v1", "beacon"], ["eth", "v2", "beacon"]) and parts[3:4] in (["blocks"], ["states"]):
+            slot = self.slot(parts[4] if len(parts) > 4 else "head")
+            if slot is None:
+                return 404, {"code": 404, "message": "NOT_FOUND: beacon block"}
+            return 200, self.state_or_block(slot, parts[3], parts[5] if len(parts) > 5 else "", query)
+        if parts[:4] == ["eth", "v1", "validator", "duties"]:
+            return 200, {
+                "data": [
+                    {
+                        "pubkey": hex_digest("pubkey", i, size=48),
+                        "validator_index": str(i),
+                        "slot": str(self.chain.head + i),
+                    }
+                    for i in range(32)
+                ]
+            }
+        return 404, {"code": 404, "message": "NOT_FOUND"}
+
+    def slot(self, block_id: str) -> int | None:
+        if block_id in ("head", "finalized", "justified"):
+            return self.chain.head - (64 if block_id != "head" else 0)
+        if block_id == "genesis":
+            return 0
+        try:
+            slot = int(block_id)
+        except ValueError:
+            return None
+        return slot if self.chain.exists(slot) else None
+
+    def header(self, slot: int) -> dict[str, t.Any]:
+        return {
+            "root": hex_digest("block", slot),
+            "canonical": True,
+            "header": {
+                "message": {
+                    "slot": str(slot),
+                    "proposer_index": str(slot % 100_000),
+                    "parent_root": hex_digest("block", slot - 1),
+                    "state_root": hex_digest("state", slot),
+                    "body_root": hex_digest("body", slot),
+                },
+                "signature": hex_digest("signature", slot, size=96),
+            },
+        }
+
+    def state_or_block(self, slot: int, kind: str, resource: str, query: dict[str, str]) -> dict[str, t.Any]:
+        if resource == "committees":
+            slot = int(query.get("slot", slot))
+            return {
+                "execution_optimistic": False,
+                "finalized": True,
+                "data": [
+                    {
+                        "index": str(index),
+                        "slot": str(slot),
+                        "validators": [
+                            str((slot * BEACON_COMMITTEES + index) * self.validators_per_committee + i)
+                            for i in range(self.validators_per_committee)
+                        ],
+                    }
+                    for index in range(BEACON_COMMITTEES)
+                ],
+            }
+        if resource in ("validators", "validator_balances"):
+            return {
+                "data": [
+                    {"index": str(i), "balance": "32000000000", "status": "active_ongoing"}
+                    for i in range(self.validators_per_committee)
+                ]
+            }
+        if resource == "fork":
+            return {
+                "data": {"previous_version": "0x03000000", "current_version": "0x04000000", "epoch": str(slot // 32)}
+            }
+        if resource == "root":
+            return {"data": {"root": hex_digest(kind, slot)}}
+        if resource == "sync_committees":
+            return {
+                "data": {
+                    "validators": [str(i) for i in range(self.validators_per_committee)],
+                    "validator_aggregates": [],
+                }
+            }
+        if resource == "attestations":
+            return {"data": []}
+        return {
+            "version": "deneb",
+            "execution_optimistic": False,
+            "finalized": True,
+            "data": {
+                "message": {**self.header(slot)["header"]["message"], "body": {}},
+                "signature": hex_digest("signature", slot, size=96),
+            },
+        }
@@ -0,0 +1,192 @@
+import math
+import os
+import random
+import socket
+import typing as t
+from dataclasses import dataclass
+from http import HTTPStatus
+from urllib.parse import parse_qsl
+
+import gevent
+import orjson as json
+from gevent.pywsgi import WSGIServer
+
+from chainbench.tools.mock.chains import (
+    DEFAULT_RESULT_SIZE,
+    DEFAULT_TXS_PER_BLOCK,
+    EVM_CHAIN_ID,
+    BeaconChain,
+    EvmChain,
+    MockRpcError,
+    SolanaChain,
+    StarkNetChain,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8545
+LATENCY_DISTRIBUTIONS = ["constant", "uniform", "exponential", "lognormal"]
+DEFAULT_LATENCY_SIGMA = 0.5
+LISTEN_BACKLOG = 2048
+
+StartResponse = t.Callable[[str, list[tuple[str, str]]], t.Any]
+
+
+@dataclass
+class LatencyModel:
+    """
+    Draws the latency of responses in milliseconds. The mean of every distribution is the given latency: uniform
+    draws between 0 and twice the latency, and lognormal has a tail set by sigma.
+    """
+
+    latency: float = 0.0
+    distribution: str = "constant"
+    sigma: float = DEFAULT_LATENCY_SIGMA
+
+    def __post_init__(self):
+        if self.distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {self.distribution}")
+        if self.latency < 0:
+            raise ValueError(f"Latency must not be negative, got {self.latency}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.latency == 0:
+            return 0.0
+        if self.distribution == "uniform":
+            return rng.uniform(0, 2 * self.latency)
+        if self.distribution == "exponential":
+            return rng.expovariate(1 / self.latency)
+        if self.distribution == "lognormal":
+            return rng.lognormvariate(math.log(self.latency) - self.sigma**2 / 2, self.sigma)
+        return self.latency
+
+
+class MockNode:
+    """
+    WSGI application answering JSON-RPC requests of EVM, Solana and StarkNet, and GET requests of the Ethereum
+    beacon API, with synthetic responses. The chain of a JSON-RPC request is picked by its method, so a single
+    mock node serves all profiles. Every HTTP request waits for a latency drawn from the latency model, and fails
+    with HTTP 503 or with JSON-RPC errors at the given rates.
+    """
+
+    def __init__(
+        self,
+        latency: LatencyModel | None = None,
+        error_rate: float = 0.0,
+        http_error_rate: float = 0.0,
+        chain_id: int = EVM_CHAIN_ID,
+        txs_per_block: int = DEFAULT_TXS_PER_BLOCK,
+        result_size: int = DEFAULT_RESULT_SIZE,
+        seed: int | None = None,
+    ):
+        for name, rate in (("Error rate", error_rate), ("HTTP error rate", http_error_rate)):
+            if not 0 <= rate <= 1:
+                raise ValueError(f"{name} must be between 0 and 1, got {rate}")
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.http_error_rate = http_error_rate
+        self.rng = random.Random(seed)
+        self.evm = EvmChain(chain_id, txs_per_block, result_size)
+        self.solana = SolanaChain(txs_per_block, result_size)
+        self.starknet = StarkNetChain(txs_per_block)
+        self.beacon = BeaconChain()
+
+    def __call__(self, environ: dict[str, t.Any], start_response: StartResponse) -> list[bytes]:
+        delay = self.latency.sample(self.rng)
+        if delay > 0:
+            gevent.sleep(delay / 1000)
+        if self.http_error_rate and self.rng.random() < self.http_error_rate:
+            return self.respond(start_response, 503, b'{"error":"Service Unavailable"}')
+        if environ["REQUEST_METHOD"] == "GET":
+            try:
+                status, body = self.beacon.handle(
+                    environ["PATH_INFO"], dict(parse_qsl(environ.get("QUERY_STRING", "")))
+                )
+            except ValueError as e:
+                # ids and query values that aren't numbers are rejected like beacon nodes do
+                status, body = 400, {"code": 400, "message": f"BAD_REQUEST: {e}"}
+            return self.respond(start_response, status, json.dumps(body))
+        if environ["REQUEST_METHOD"] != "POST":
+            return self.respond(start_response, 405, b'{"error":"Method Not Allowed"}')
+        try:
+            request = json.loads(environ["wsgi.input"].read())
+        except json.JSONDecodeError:
+            return self.respond(start_response, 200, json.dumps(self.error(None, -32700, "Parse error")))
+        if isinstance(request, list):
+            response: t.Any = [self.handle(item) for item in request]
+        else:
+            response = self.handle(request)
+        return self.respond(start_response, 200, json.dumps(response))
+
+    @staticmethod
+    def respond(start_response: StartResponse, status: int, body: bytes) -> list[bytes]:
+        start_response(
+            f"{status} {HTTPStatus(status).phrase}",
+            [("Content-Type", "application/json"), ("Content-Length", str(len(body)))],
+        )
+        return [body]
+
+    @staticmethod
+    def error(request_id: t.Any, code: int, message: str) -> dict[str, t.Any]:
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+    def chain(self, method: str) -> EvmChain | SolanaChain | StarkNetChain:
+        if method.startswith("starknet_"):
+            return self.starknet
+        # EVM methods are namespaced, e.g. eth_call, while Solana methods are in camel case, e.g. getBlock
+        if "_" not in method:
+            return self.solana
+        return self.evm
+
+    def handle(self, request: t.Any) -> dict[str, t.Any]:
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return self.error(None, -32600, "Invalid request")
+        request_id = request.get("id")
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return self.error(request_id, -32603, "Internal error")
+        method: str = request["method"]
+        params = request.get("params") or []
+        try:
+            result = self.chain(method).handle(method, params)
+        except MockRpcError as e:
+            return self.error(request_id, e.code, e.message)
+        except (IndexError, KeyError, TypeError, ValueError) as e:
+            return self.error(request_id, -32602, f"Invalid params: {e}")
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def listen(host: str, port: int) -> socket.socket:
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(LISTEN_BACKLOG)
+    listener.setblocking(False)
+    return listener
+
+
+def serve(node: MockNode, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, processes: int = 1) -> None:
+    """
+    Serve the mock node until interrupted. With more than one process, the listening socket is shared by forked
+    processes, so the mock node isn't limited by a single core and stays faster than the load generator under test.
+    """
+    listener = listen(host, port)
+    children: list[int] = []
+    for index in range(1, processes):
+        pid = gevent.fork()
+        if pid == 0:
+            # every process draws its own latencies and errors
+            node.rng.seed(node.rng.random() + index)
+            children = []
+            break
+        children.append(pid)
+    server = WSGIServer(listener, node, log=None)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop(timeout=1)
+        for pid in children:
+            try:
+                os.kill(pid, 15)
+            except ProcessLookupError:
+                pass
@@ -4,6 +4,7 @@ from chainbench.util.event import setup_event_listeners
 from .common import get_subclass_tasks
 from .http import HttpUser
 from .jsonrpc import JrpcHttpUser
+from .replay import ReplayUser
 from .wss import WssJrpcUser
 
 # importing plugins here as all profiles depend on it
@@ -16,6 +17,7 @@ __all__ = [
     "EvmUser",
     "HttpUser",
     "JrpcHttpUser",
+    "ReplayUser",
     "SolanaUser",
     "StarkNetUser",
     "WssJrpcUser",
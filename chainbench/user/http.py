@@ -1,11 +1,16 @@
+import itertools
 import logging
 import typing as t
 
 from locust import FastHttpUser, TaskSet
 from locust.contrib.fasthttp import ResponseContextManager
+from locust.exception import RescheduleTask
 
 from chainbench.test_data import TestData
+from chainbench.util.arrival import CorrectedRequestEvent, Ticket, arrival_scheduler
 from chainbench.util.jsonrpc import expand_to_list
+from chainbench.util.log import error_log_limiter
+from chainbench.util.rng import RNGManager, rng_manager
 
 
 class HttpUser(FastHttpUser):
@@ -13,17 +18,53 @@ class HttpUser(FastHttpUser):
 
     abstract = True
     test_data: TestData = TestData()
+    # users that don't use test data neither wait for it nor have it initialized by the master
+    requires_test_data = True
     logger = logging.getLogger(__name__)
 
     connection_timeout = 120
     network_timeout = 360
 
+    _user_indexes = itertools.count()
+
+    def __init__(self, environment: t.Any):
+        super().__init__(environment)
+        # every user draws params from its own streams, derived from the run seed, worker index and user index
+        self.user_index = next(HttpUser._user_indexes)
+        self.rng: RNGManager = rng_manager.derive("user", self.user_index)
+        self.open_loop: bool = getattr(environment.parsed_options, "target_rps", 0) > 0
+        self.arrival_ticket: Ticket | None = None
+        if self.open_loop:
+            # tasks are started by tickets of the arrival scheduler instead of the wait time of the load profile,
+            # and response times are measured from when the task should have started
+            self.wait_time = self.wait_for_arrival  # type: ignore[method-assign]
+            self.request_event = CorrectedRequestEvent(self.client.request_event)
+            self.client.request_event = self.request_event
+
     def on_start(self) -> None:
-        self.test_data.wait()
+        if self.requires_test_data:
+            self.test_data.wait()
+        self.on_test_data_ready()
+        if self.open_loop:
+            self.wait_for_arrival()
 
     def on_stop(self) -> None:
+        if self.arrival_ticket is not None:
+            arrival_scheduler.release()
+            self.arrival_ticket = None
         self.test_data.close()
 
+    def on_test_data_ready(self) -> None:
+        """Called once test data is ready, before the user runs its first task."""
+
+    def wait_for_arrival(self) -> float:
+        """Wait time of users in open loop mode, which completes the current ticket and waits for the next one."""
+        if self.arrival_ticket is not None:
+            arrival_scheduler.release()
+            self.arrival_ticket = None
+        self.arrival_ticket, self.request_event.delay = arrival_scheduler.acquire()
+        return 0
+
     @staticmethod
     def task_to_method(task_name: str) -> str:
         raise NotImplementedError
@@ -48,26 +89,35 @@ class HttpUser(FastHttpUser):
         return tasks
 
     def check_fatal(self, response: ResponseContextManager) -> None:
+        key = f"{response.request_meta['name']}: fatal HTTP {response.status_code}"
         if response.status_code == 401:
-            self.logger.critical(f"Unauthorized request to {response.url}")
+            error_log_limiter.log(self.logger, logging.CRITICAL, key, "Unauthorized request to %s", response.url)
         elif response.status_code == 404:
-            self.logger.critical(f"Not found: {response.url}")
+            error_log_limiter.log(self.logger, logging.CRITICAL, key, "Not found: %s", response.url)
         elif 500 <= response.status_code <= 599:
-            self.logger.critical(f"Got internal server error when requesting {response.url}")
+            error_log_limiter.log(
+                self.logger, logging.CRITICAL, key, "Got internal server error when requesting %s", response.url
+            )
         elif 300 <= response.status_code <= 399:
-            self.logger.critical(f"Redirect error: {response.url}")
+            error_log_limiter.log(self.logger, logging.CRITICAL, key, "Redirect error: %s", response.url)
 
     def check_http_error(self, response: ResponseContextManager) -> None:
         """Check the response for errors."""
         if response.status_code != 200:
-            self.logger.error(f"Request failed with {response.status_code} code")
-            self.logger.error(f"Request body of failed request: {response.request.body if response.request else ''}")
+            error_log_limiter.error(
+                self.logger,
+                f"{response.request_meta['name']}: HTTP {response.status_code}",
+                "Request failed with %s code, request body: %s",
+                response.status_code,
+                response.request.body if response.request else "",
+            )
             self.logger.debug(
-                f"Request to {response.url} failed with HTTP Error {response.status_code} code: {response.text}"
+                "Request to %s failed with HTTP Error %s code: %s", response.url, response.status_code, response.text
             )
             self.check_fatal(response)
             response.failure(f"Request failed with {response.status_code} code")
-            response.raise_for_status()
+            # the failure is reported by the response, the task is aborted without locust logging a traceback
+            raise RescheduleTask()
 
     def post(
         self, name: str, data: t.Optional[dict] = None, params: t.Optional[dict] = None, path: str = ""
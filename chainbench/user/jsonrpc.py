@@ -1,16 +1,25 @@
 import logging
-import random
 import typing as t
 
+import orjson as json
 from locust import tag, task
 from locust.contrib.fasthttp import ResponseContextManager
 
 from chainbench.user.http import HttpUser
+from chainbench.util.cache_mode import cache_mode
+from chainbench.util.depth import BlockParam, depth_buckets
 from chainbench.util.jsonrpc import (
+    ENVELOPE_SCAN_SIZE,
     RpcCall,
-    expand_rpc_calls,
+    RpcCallPool,
     generate_batch_request_body,
+    scan_response_envelope,
 )
+from chainbench.util.log import error_log_limiter, request_log_sampler
+from chainbench.util.replay import request_recorder
+from chainbench.util.rng import RNGManager, WeightedSampler
+
+JSON_HEADERS = {"Content-Type": "application/json", "accept": "application/json"}
 
 
 class JrpcHttpUser(HttpUser):
@@ -21,11 +30,76 @@ class JrpcHttpUser(HttpUser):
     rpc_error_code_exclusions: list[int] = []
     rpc_calls: dict[t.Callable, int] = {}  # To be populated in the subclass load profile
     calls_per_batch = 10  # default requests to include in a batch request
+    # functions reading the block referenced by calls of a method from their params, for depth buckets
+    block_params: dict[str, BlockParam] = {}
 
     def __init__(self, environment: t.Any):
         self.calls_per_batch = environment.parsed_options.batch_size
+        self.rpc_response_check: str = getattr(environment.parsed_options, "rpc_response_check", "full")
         super().__init__(environment)
 
+    def on_test_data_ready(self) -> None:
+        pool_size: int = getattr(self.environment.parsed_options, "param_pool_size", 0)
+        if cache_mode.enabled:
+            # calls to the RPC call methods of this user are served by the sources of the cache mode from now on
+            for method_name, source in self.get_cache_mode_sources().items():
+                setattr(self, method_name, source)
+        elif pool_size > 0:
+            # calls to the RPC call methods of this user are served from the pools from now on
+            for method_name, pool in self.get_rpc_call_pools(pool_size).items():
+                setattr(self, method_name, pool.next)
+
+    def get_rpc_call_method_names(self) -> list[str]:
+        """Return the names of the RPC call methods used by the user class."""
+        method_names = {method.__name__ for method in self.rpc_calls}
+        # the method tested on its own by rpc_call_task, if the user class has it
+        try:
+            method_name = self.method_to_function_name(self.environment.parsed_options.method)
+        except (NotImplementedError, AttributeError, IndexError):
+            method_name = ""
+        if hasattr(type(self), method_name) and not method_name.endswith("task"):
+            method_names.add(method_name)
+        return sorted(method_names)
+
+    def get_rpc_call_pools(self, pool_size: int) -> dict[str, RpcCallPool]:
+        """
+        Return pools of pre-generated calls for the RPC call methods used by the user class.
+
+        Pools are generated by the first user of the class to start on a worker, once test data is ready,
+        and shared by all users of the class on the worker.
+        """
+        cls = type(self)
+        if "rpc_call_pools" not in cls.__dict__:
+            pools = {
+                method_name: RpcCallPool.generate(getattr(self, method_name), pool_size)
+                for method_name in self.get_rpc_call_method_names()
+            }
+            setattr(cls, "rpc_call_pools", pools)
+            self.logger.info(f"Generated pools of {pool_size} calls for {', '.join(pools)}")
+        return cls.__dict__["rpc_call_pools"]
+
+    def get_cache_mode_sources(self) -> dict[str, t.Callable[[], RpcCall]]:
+        """
+        Return the sources of calls of the cache mode for the RPC call methods used by the user class.
+
+        Sources are created by the first user of the class to start on a worker and shared by all users of the
+        class on the worker, so cold calls don't repeat between users. Hot sets are drawn from streams derived
+        from the run seed alone, which makes them the same on every worker.
+        """
+        cls = type(self)
+        if "cache_mode_sources" not in cls.__dict__:
+            rng, self.rng = self.rng, RNGManager(cache_mode.seed).derive("hot_set", cls.__name__)
+            try:
+                sources = {
+                    method_name: cache_mode.source(getattr(self, method_name))
+                    for method_name in self.get_rpc_call_method_names()
+                }
+            finally:
+                self.rng = rng
+            setattr(cls, "cache_mode_sources", sources)
+            self.logger.info(f"Cache mode {cache_mode.mode} for {', '.join(sources)}")
+        return cls.__dict__["cache_mode_sources"]
+
     @tag("single")
     @task
     def rpc_call_task(self) -> None:
@@ -34,11 +108,20 @@ class JrpcHttpUser(HttpUser):
     @tag("batch")
     @task
     def batch_rpc_call_task(self) -> None:
-        rpc_calls = {getattr(self, method.__name__): weight for method, weight in self.rpc_calls.items()}
-        self.make_random_batch_rpc_call(
-            rpc_calls,
-            calls_per_batch=self.calls_per_batch,
-        )
+        # only the sampled methods generate params, looked up on the user so pooled calls are used if enabled
+        method_names = self.get_rpc_call_sampler().sample_k(self.calls_per_batch, self.rng.get_rng("batch").random)
+        self.make_batch_rpc_call([getattr(self, method_name)() for method_name in method_names])
+
+    @classmethod
+    def get_rpc_call_sampler(cls) -> WeightedSampler[str]:
+        """Return a sampler of the RPC call method names in rpc_calls by weight, built once per user class."""
+        if "rpc_call_sampler" not in cls.__dict__:
+            setattr(
+                cls,
+                "rpc_call_sampler",
+                WeightedSampler([(method.__name__, weight) for method, weight in cls.rpc_calls.items()]),
+            )
+        return cls.__dict__["rpc_call_sampler"]
 
     @tag("batch_single")
     @task
@@ -55,14 +138,19 @@ class JrpcHttpUser(HttpUser):
         return getattr(cls, method_name)
 
     def check_json_rpc_response(self, response: ResponseContextManager, name: str) -> None:
+        if self.rpc_response_check == "envelope":
+            self.check_json_rpc_envelope(response, name)
+            return
         CHUNK_SIZE = 1024
         if response.text is None:
-            self.logger.error(f"Response for {name} is empty")
+            error_log_limiter.error(self.logger, f"{name}: empty response", "Response for %s is empty", name)
             response.failure(f"Response for {name} is empty")
             return
         data = response.text[:CHUNK_SIZE]
         if "jsonrpc" not in data:
-            self.logger.error(f"Response for {name} is not a JSON-RPC: {response.text}")
+            error_log_limiter.error(
+                self.logger, f"{name}: not a JSON-RPC", "Response for %s is not a JSON-RPC: %s", name, response.text
+            )
             response.failure(f"Response for {name} is not a JSON-RPC")
             return
 
@@ -74,7 +162,13 @@ class JrpcHttpUser(HttpUser):
                 for response_js_item in response_js:
                     if "error" in response_js_item:
                         if "code" in response_js_item["error"]:
-                            self.logger.error(f"Response for {name} has a JSON-RPC error: {response.text}")
+                            error_log_limiter.error(
+                                self.logger,
+                                f"{name}: JSON-RPC error {response_js_item['error']['code']}",
+                                "Response for %s has a JSON-RPC error: %s",
+                                name,
+                                response.text,
+                            )
                             if response_js_item["error"]["code"] not in self.rpc_error_code_exclusions:
                                 response.failure(
                                     f"Response for {name} has a JSON-RPC error {response_js_item['error']['code']} - "
@@ -82,13 +176,83 @@ class JrpcHttpUser(HttpUser):
                                 )
                                 return
                         response.failure("Unspecified JSON-RPC error")
-                        self.logger.error(f"Unspecified JSON-RPC error: {response.text}")
+                        error_log_limiter.error(
+                            self.logger,
+                            f"{name}: unspecified JSON-RPC error",
+                            "Unspecified JSON-RPC error: %s",
+                            response.text,
+                        )
                         return
             # TODO: handle multiple errors in batch response properly
 
         if "result" not in data:
             response.failure(f"Response for {name} call has no result")
-            self.logger.error(f"Response for {name} call has no result: {response.text}")
+            error_log_limiter.error(
+                self.logger, f"{name}: no result", "Response for %s call has no result: %s", name, response.text
+            )
+
+    def check_json_rpc_envelope(self, response: ResponseContextManager, name: str) -> None:
+        """
+        Check the JSON-RPC envelope of a response on its raw body.
+
+        Single responses are recognized from the start of the body, and only parsed in full when they hold an error
+        or their envelope can't be recognized. Batch responses are parsed and every item in them is checked.
+        """
+        content: bytes | None = response.content
+        if not content:
+            error_log_limiter.error(self.logger, f"{name}: empty response", "Response for %s is empty", name)
+            response.failure(f"Response for {name} is empty")
+            return
+        if scan_response_envelope(content) == "result":
+            return
+        try:
+            body = json.loads(content)
+        except json.JSONDecodeError:
+            body = None
+        items = body if isinstance(body, list) else [body]
+        if not items or not all(isinstance(item, dict) and "jsonrpc" in item for item in items):
+            error_log_limiter.error(
+                self.logger,
+                f"{name}: not a JSON-RPC",
+                "Response for %s is not a JSON-RPC: %r",
+                name,
+                content[:ENVELOPE_SCAN_SIZE],
+            )
+            response.failure(f"Response for {name} is not a JSON-RPC")
+            return
+        errors = [item["error"] for item in items if "error" in item]
+        failed = [
+            error
+            for error in errors
+            if not isinstance(error, dict) or error.get("code") not in self.rpc_error_code_exclusions
+        ]
+        if failed:
+            error = failed[0]
+            error_log_limiter.error(
+                self.logger,
+                f"{name}: JSON-RPC error {error.get('code') if isinstance(error, dict) else None}",
+                "Response for %s has %d JSON-RPC errors: %r",
+                name,
+                len(failed),
+                content,
+            )
+            if isinstance(error, dict) and "code" in error:
+                message = f"Response for {name} has a JSON-RPC error {error['code']} - {error.get('message')}"
+            else:
+                message = "Unspecified JSON-RPC error"
+            if len(failed) > 1:
+                message += f" and {len(failed) - 1} more"
+            response.failure(message)
+            return
+        if any("result" not in item and "error" not in item for item in items):
+            response.failure(f"Response for {name} call has no result")
+            error_log_limiter.error(
+                self.logger,
+                f"{name}: no result",
+                "Response for %s call has no result: %r",
+                name,
+                content[:ENVELOPE_SCAN_SIZE],
+            )
 
     def make_rpc_call(
         self,
@@ -105,17 +269,32 @@ class JrpcHttpUser(HttpUser):
             else:
                 rpc_call = RpcCall(method, params)
         if name is None:
-            name = rpc_call.method
+            name = rpc_call.name or rpc_call.method
+            if depth_buckets.enabled and rpc_call.method in self.block_params:
+                name = depth_buckets.tag(
+                    name, self.block_params[rpc_call.method](rpc_call.params), self.test_data.data.chain_head
+                )
+        if request_recorder.enabled:
+            request_recorder.record(self.user_index, rpc_call.method, rpc_call.params)
 
+        # locust annotates data as str, but bytes are passed to geventhttpclient as they are
         with self.client.request(
-            "POST", self.rpc_path + path, json=rpc_call.request_body(), name=name, catch_response=True
+            "POST",
+            self.rpc_path + path,
+            data=rpc_call.encoded_body(),  # type: ignore[arg-type]
+            name=name,
+            catch_response=True,
+            headers=JSON_HEADERS,
         ) as response:
             self.check_http_error(response)
             self.check_json_rpc_response(response, name=name)
-            if logging.getLogger("locust").level == logging.DEBUG:
-                self.logger.debug(f"jsonrpc: {rpc_call.method} - params: {rpc_call.params}, response: {response.text}")
-            else:
-                self.logger.info(f"jsonrpc: {rpc_call.method} - params: {rpc_call.params}")
+            if self.logger.isEnabledFor(logging.INFO) and request_log_sampler.sample(rpc_call.method):
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(
+                        "jsonrpc: %s - params: %s, response: %s", rpc_call.method, rpc_call.params, response.text
+                    )
+                else:
+                    self.logger.info("jsonrpc: %s - params: %s", rpc_call.method, rpc_call.params)
 
     def make_batch_rpc_call(self, rpc_calls: list[RpcCall], name: str = "", path: str = "") -> None:
         """Make a Batch JSON-RPC call."""
@@ -123,19 +302,31 @@ class JrpcHttpUser(HttpUser):
         if name == "":
             name = f"Batch RPC ({len(rpc_calls)})"
 
-        headers = {"Content-Type": "application/json", "accept": "application/json"}
-
         with self.client.request(
             "POST",
             self.rpc_path + path,
-            data=generate_batch_request_body(rpc_calls),
+            data=generate_batch_request_body(rpc_calls),  # type: ignore[arg-type]
             name=name,
             catch_response=True,
-            headers=headers,
+            headers=JSON_HEADERS,
         ) as response:
             self.check_http_error(response)
             self.check_json_rpc_response(response, name=name)
 
+    @classmethod
+    def get_random_batch_sampler(cls, weighted_rpc_calls: dict[t.Callable[[], RpcCall], int]) -> WeightedSampler[int]:
+        """
+        Return a sampler of positions in the weighted RPC call methods, built once per user class and set of weights.
+        Methods are bound to the user that passes them, so they are keyed by their functions and looked up by position.
+        """
+        if "random_batch_samplers" not in cls.__dict__:
+            setattr(cls, "random_batch_samplers", {})
+        samplers: dict[tuple, WeightedSampler[int]] = cls.__dict__["random_batch_samplers"]
+        key = tuple((getattr(method, "__func__", method), weight) for method, weight in weighted_rpc_calls.items())
+        if key not in samplers:
+            samplers[key] = WeightedSampler([(index, weight) for index, (_, weight) in enumerate(key)])
+        return samplers[key]
+
     def make_random_batch_rpc_call(
         self,
         weighted_rpc_calls: dict[t.Callable[[], RpcCall], int],
@@ -144,7 +335,10 @@ class JrpcHttpUser(HttpUser):
         path: str = "",
     ) -> None:
         """Make a Batch JSON-RPC call."""
-        rpc_calls: list[RpcCall] = expand_rpc_calls(weighted_rpc_calls)
-        random_rpc_calls: list[RpcCall] = random.choices(rpc_calls, k=calls_per_batch)
+        rpc_call_methods = list(weighted_rpc_calls)
+        indexes = self.get_random_batch_sampler(weighted_rpc_calls).sample_k(
+            calls_per_batch, self.rng.get_rng("batch").random
+        )
+        random_rpc_calls: list[RpcCall] = [rpc_call_methods[index]() for index in indexes]
 
         self.make_batch_rpc_call(random_rpc_calls, name=name, path=path)
@@ -6,7 +6,6 @@ from locust import tag, task
 from chainbench.test_data.ethereum import EthBeaconTestData
 from chainbench.user.http import HttpUser
 from chainbench.user.wss import WSSubscription
-from chainbench.util.rng import RNGManager
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +13,6 @@ logger = logging.getLogger(__name__)
 class EthBeaconBaseUser(HttpUser):
     abstract = True
     test_data = EthBeaconTestData()
-    rng = RNGManager()
 
     def eth_beacon_blocks_request(
         self,
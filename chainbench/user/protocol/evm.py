@@ -10,17 +10,44 @@ from chainbench.test_data import (
 )
 from chainbench.user.jsonrpc import JrpcHttpUser
 from chainbench.user.tag import tag
+from chainbench.util.depth import param_at
 from chainbench.util.jsonrpc import RpcCall
-from chainbench.util.rng import RNG, RNGManager
+from chainbench.util.rng import RNG
 
 
 class EvmBaseUser(JrpcHttpUser):
     abstract = True
     test_data: EvmTestData = EvmTestData()
-    rng = RNGManager()
 
     _default_trace_timeout = "120s"
 
+    block_params = {
+        "eth_call": param_at(1),
+        "eth_estimateGas": param_at(1),
+        "eth_feeHistory": param_at(1),
+        "eth_getBalance": param_at(1),
+        "eth_getBlockByNumber": param_at(0),
+        "eth_getBlockReceipts": param_at(0),
+        "eth_getBlockTransactionCountByNumber": param_at(0),
+        "eth_getCode": param_at(1),
+        "eth_getHeaderByNumber": param_at(0),
+        "eth_getLogs": param_at(0, "fromBlock"),
+        "eth_getStorageAt": param_at(2),
+        "eth_getTransactionByBlockNumberAndIndex": param_at(0),
+        "eth_getTransactionCount": param_at(1),
+        "eth_getUncleCountByBlockNumber": param_at(0),
+        "debug_getRawBlock": param_at(0),
+        "debug_getRawHeader": param_at(0),
+        "debug_getRawReceipts": param_at(0),
+        "debug_traceBlockByNumber": param_at(0),
+        "debug_traceCall": param_at(1),
+        "trace_block": param_at(0),
+        "trace_call": param_at(2),
+        "trace_callMany": param_at(1),
+        "trace_filter": param_at(0, "fromBlock"),
+        "trace_replayBlockTransactions": param_at(0),
+    }
+
     def _get_logs_params_factory(self, rng: RNG) -> list[dict]:
         block_range = self.test_data.get_random_block_range(20, rng)
         return [
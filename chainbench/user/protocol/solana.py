@@ -5,16 +5,24 @@ from solders.message import Message
 
 from chainbench.test_data import Account, BlockNumber, SolanaTestData, TxHash
 from chainbench.user.jsonrpc import JrpcHttpUser
+from chainbench.util.depth import param_at
 from chainbench.util.jsonrpc import RpcCall
-from chainbench.util.rng import RNG, RNGManager
+from chainbench.util.rng import RNG
 
 
 class SolanaBaseUser(JrpcHttpUser):
     abstract = True
     test_data = SolanaTestData()
-    rng = RNGManager()
     rpc_error_code_exclusions = [-32007]
 
+    block_params = {
+        "getBlock": param_at(0),
+        "getBlockCommitment": param_at(0),
+        "getBlockTime": param_at(0),
+        "getBlocks": param_at(0),
+        "getBlocksWithLimit": param_at(0),
+    }
+
     def _create_random_transaction_message(self, rng: RNG) -> Message:
         import base58
         from solders.hash import Hash
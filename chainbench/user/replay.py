@@ -0,0 +1,57 @@
+import time
+import typing as t
+
+from locust import task
+
+from chainbench.user.jsonrpc import JrpcHttpUser
+from chainbench.util.jsonrpc import RpcCall
+from chainbench.util.replay import ReplayRecord, replay_lag_recorder, replay_source
+
+
+class ReplayUser(JrpcHttpUser):
+    """
+    Extension of JrpcHttpUser that re-issues the JSON-RPC requests of a capture file or a directory of recordings
+    set with --replay-file, at the time they were originally sent scaled by --replay-speed. Requests carry the params
+    they were captured with, so no test data is needed. Requests recorded by the same user are sent one after another
+    in their recorded order. The lag between the scheduled and the actual send time of every request is recorded,
+    and grows when there are not enough users to keep up with the captured traffic.
+    """
+
+    abstract = True
+    requires_test_data = False
+
+    def __init__(self, environment: t.Any):
+        super().__init__(environment)
+        self.replay_record: tuple[ReplayRecord, float] | None = None
+        # the next task is started by the next record of the capture instead of the wait time of the profile
+        self.wait_time = self.wait_for_record  # type: ignore[method-assign]
+
+    def on_start(self) -> None:
+        super().on_start()
+        self.wait_for_record()
+
+    def on_stop(self) -> None:
+        if self.replay_record is not None:
+            replay_source.done(self.replay_record[0])
+            self.replay_record = None
+        super().on_stop()
+
+    def on_test_data_ready(self) -> None:
+        """Replayed requests carry their own params, so no param pools are generated."""
+
+    def wait_for_record(self) -> float:
+        """Wait time of replay users, which completes the current record and waits for the next one."""
+        if self.replay_record is not None:
+            replay_source.done(self.replay_record[0])
+            self.replay_record = None
+        self.replay_record = replay_source.next()
+        return 0
+
+    @task
+    def replay_task(self) -> None:
+        if self.replay_record is None:
+            return
+        record, scheduled_time = self.replay_record
+        replay_lag_recorder.record("POST", record.method, max(0.0, time.perf_counter() - scheduled_time) * 1000)
+        # captured params are sent as they were captured, including by-name params
+        self.make_rpc_call(RpcCall.raw(record.method, record.params))
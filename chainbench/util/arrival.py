@@ -0,0 +1,141 @@
+import logging
+import time
+import typing as t
+from random import Random
+
+import gevent
+from gevent.queue import Queue
+
+logger = logging.getLogger(__name__)
+
+ARRIVAL_DISTRIBUTIONS = ["poisson", "uniform"]
+DEFAULT_MAX_IN_FLIGHT = 1000
+# tasks starting later than this after their intended start are counted as late, event loop jitter is well below it
+LATE_THRESHOLD = 0.005
+
+
+class Ticket(t.NamedTuple):
+    intended_time: float
+
+
+class ArrivalCounts(t.NamedTuple):
+    scheduled: int = 0
+    dropped: int = 0
+    late: int = 0
+    max_delay: float = 0.0
+
+    def merge(self, other: "ArrivalCounts") -> "ArrivalCounts":
+        return ArrivalCounts(
+            self.scheduled + other.scheduled,
+            self.dropped + other.dropped,
+            self.late + other.late,
+            max(self.max_delay, other.max_delay),
+        )
+
+
+class ArrivalScheduler:
+    """
+    Issues tickets for tasks at a fixed arrival rate, independent of how long earlier tasks take to complete.
+
+    Users take a ticket before every task and run it as soon as they get one, so tasks are started at the rate
+    of the scheduler as long as enough users are free. Each ticket holds the time its task should have started at,
+    which lets response times be measured from the intended start instead of the actual one. Tickets that would
+    exceed max_in_flight tickets waiting for a user or being run are dropped, and tickets that start their task
+    more than LATE_THRESHOLD seconds after their intended time are counted as late.
+    """
+
+    def __init__(
+        self,
+        rate: float = 0.0,
+        distribution: str = "poisson",
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ):
+        self.rate = rate
+        self.distribution = distribution
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._tickets: Queue = Queue()
+        self._greenlet: gevent.Greenlet | None = None
+        self._counts = ArrivalCounts()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def configure(self, rate: float, distribution: str, max_in_flight: int) -> None:
+        if distribution not in ARRIVAL_DISTRIBUTIONS:
+            raise ValueError(f"Unknown arrival distribution {distribution}, expected one of {ARRIVAL_DISTRIBUTIONS}")
+        self.rate = rate
+        self.distribution = distribution
+        self.max_in_flight = max(1, max_in_flight)
+
+    def interval(self, random: Random) -> float:
+        """Return the time between two arrivals."""
+        if self.distribution == "poisson":
+            return random.expovariate(self.rate)
+        return 1 / self.rate
+
+    def start(self, random: Random) -> None:
+        if self.enabled and self._greenlet is None:
+            logger.info(f"Scheduling tasks at {self.rate:.2f} per second with {self.distribution} arrivals")
+            self._greenlet = gevent.spawn(self._run, random)
+
+    def stop(self) -> None:
+        if self._greenlet is not None:
+            self._greenlet.kill(block=False)
+            self._greenlet = None
+
+    def _run(self, random: Random) -> None:
+        next_time = time.perf_counter()
+        while True:
+            next_time += self.interval(random)
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                gevent.sleep(delay)
+            # arrivals missed while the event loop was busy are issued at once with their intended times
+            self._counts = self._counts._replace(scheduled=self._counts.scheduled + 1)
+            if self.in_flight >= self.max_in_flight:
+                self._counts = self._counts._replace(dropped=self._counts.dropped + 1)
+                continue
+            self.in_flight += 1
+            self._tickets.put(Ticket(next_time))
+
+    def acquire(self) -> tuple[Ticket, float]:
+        """Wait for the next ticket, return it with the delay between its intended time and now in seconds."""
+        ticket: Ticket = self._tickets.get()
+        delay = max(0.0, time.perf_counter() - ticket.intended_time)
+        if delay > LATE_THRESHOLD:
+            self._counts = self._counts._replace(
+                late=self._counts.late + 1, max_delay=max(self._counts.max_delay, delay)
+            )
+        return ticket, delay
+
+    def release(self) -> None:
+        """Mark the task of a ticket as completed."""
+        self.in_flight -= 1
+
+    def take_counts(self) -> ArrivalCounts:
+        """Return the counts since the previous call and reset them."""
+        counts, self._counts = self._counts, ArrivalCounts()
+        return counts
+
+
+class CorrectedRequestEvent:
+    """
+    Stands in for the request event of a user's client and adds the delay between the intended and the actual start
+    of the current task to the response time of its first request, correcting it for coordinated omission. The delay
+    is charged once per intended arrival, as later requests of the task start after the first one completes.
+    """
+
+    def __init__(self, request_event: t.Any):
+        self.request_event = request_event
+        self.delay = 0.0
+
+    def fire(self, **kwargs: t.Any) -> None:
+        if self.delay and kwargs.get("response_time") is not None:
+            kwargs["response_time"] += self.delay * 1000
+            self.delay = 0.0
+        self.request_event.fire(**kwargs)
+
+
+arrival_scheduler = ArrivalScheduler()
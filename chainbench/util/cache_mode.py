@@ -0,0 +1,194 @@
+import itertools
+import logging
+import typing as t
+from hashlib import blake2b
+from pathlib import Path
+
+from locust.stats import RequestStats
+
+from chainbench.util.jsonrpc import RpcCall, RpcCallPool
+from chainbench.util.report import write_csv
+
+logger = logging.getLogger(__name__)
+
+CACHE_MODES = ("random", "cold", "warm", "paired")
+DEFAULT_HOT_SET_SIZE = 10
+# a call is drawn this many times per worker before the test data of a method is considered exhausted, so the
+# chance of giving up while unique calls are left in the partition of the worker is about e^-COLD_ATTEMPTS
+COLD_ATTEMPTS = 20
+COLD_SUFFIX = " [cold]"
+WARM_SUFFIX = " [warm]"
+
+
+def call_key(rpc_call: RpcCall) -> int:
+    """Key of the method and params of a call, stable across processes unlike hash()."""
+    return int.from_bytes(blake2b(rpc_call.encode_body_prefix(), digest_size=8).digest(), "big")
+
+
+class ColdCallSource:
+    """
+    Calls generated by an RPC call method that never repeat during the test, across all workers.
+
+    The space of calls is partitioned between workers by the key of their method and params, and every worker
+    only sends the calls of its partition it hasn't sent before, drawing calls again until it gets one. Once no
+    new call is drawn in COLD_ATTEMPTS tries per worker, the test data of the method is exhausted and calls
+    repeat from then on, e.g. for methods without params.
+    """
+
+    def __init__(self, rpc_call_method: t.Callable[[], RpcCall], partition: int = 0, partitions: int = 1):
+        self.rpc_call_method = rpc_call_method
+        self.partition = partition
+        self.partitions = max(partitions, 1)
+        self.attempts = COLD_ATTEMPTS * self.partitions
+        self.seen: set[int] = set()
+        self.exhausted = False
+
+    def next(self) -> RpcCall:
+        if not self.exhausted:
+            for _ in range(self.attempts):
+                rpc_call = self.rpc_call_method()
+                key = call_key(rpc_call)
+                if key % self.partitions == self.partition and key not in self.seen:
+                    self.seen.add(key)
+                    return rpc_call
+            self.exhausted = True
+            logger.warning(
+                f"Test data for {rpc_call.method} exhausted after {len(self.seen)} unique calls on this worker, calls "
+                "repeat from now on, use a larger test data size for a longer cold test"
+            )
+        return self.rpc_call_method()
+
+
+class PairedCallSource:
+    """Alternates between cold calls and calls from the hot set, which are named after their cache state."""
+
+    def __init__(self, cold: ColdCallSource, warm: RpcCallPool):
+        self.cold = cold
+        self.warm = warm
+        for rpc_call in warm.rpc_calls:
+            rpc_call.name = rpc_call.method + WARM_SUFFIX
+            # calls of the hot set are cached by the node, so they are never sent as cold calls
+            cold.seen.add(call_key(rpc_call))
+        self._sources = itertools.cycle((self._next_cold, warm.next))
+
+    def _next_cold(self) -> RpcCall:
+        rpc_call = self.cold.next()
+        rpc_call.name = rpc_call.method + COLD_SUFFIX
+        return rpc_call
+
+    def next(self) -> RpcCall:
+        return next(self._sources)()
+
+
+class CacheMode:
+    """
+    How params of JSON-RPC calls relate to the cache of the node. Params are drawn at random from test data in the
+    random mode, never repeat in the cold mode, are drawn from a small hot set in the warm mode and alternate
+    between both in the paired mode, which measures how much faster cached calls are for every method.
+    """
+
+    def __init__(self) -> None:
+        self.mode = "random"
+        self.hot_set_size = DEFAULT_HOT_SET_SIZE
+        self.seed = 0
+        self.partition = 0
+        self.partitions = 1
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "random"
+
+    def configure(self, mode: str, hot_set_size: int, seed: int) -> None:
+        self.mode = mode
+        self.hot_set_size = max(hot_set_size, 1)
+        self.seed = seed
+
+    def assign_partition(self, partition: int, partitions: int) -> None:
+        self.partition = partition
+        self.partitions = partitions
+
+    def source(self, rpc_call_method: t.Callable[[], RpcCall]) -> t.Callable[[], RpcCall]:
+        """
+        Return the function replacing an RPC call method in the mode. The hot set is generated right away, so the
+        caller makes the method draw from streams shared by all workers while the source is created.
+        """
+        if self.mode == "cold":
+            return ColdCallSource(rpc_call_method, self.partition, self.partitions).next
+        hot_set = RpcCallPool.generate(rpc_call_method, self.hot_set_size)
+        if self.mode == "warm":
+            return hot_set.next
+        return PairedCallSource(ColdCallSource(rpc_call_method, self.partition, self.partitions), hot_set).next
+
+
+class CacheRatio(t.NamedTuple):
+    name: str
+    cold_requests: int
+    warm_requests: int
+    cold_p50: float
+    warm_p50: float
+    cold_p95: float
+    warm_p95: float
+
+    @property
+    def ratio_p50(self) -> float:
+        return self.cold_p50 / self.warm_p50 if self.warm_p50 else 0.0
+
+    @property
+    def ratio_p95(self) -> float:
+        return self.cold_p95 / self.warm_p95 if self.warm_p95 else 0.0
+
+
+def cache_ratios(stats: RequestStats) -> list[CacheRatio]:
+    """Pair the stats of cold and warm requests of every method, which are further split by depth bucket if enabled."""
+    entries = {entry.name: entry for entry in stats.entries.values()}
+    result = []
+    for name, cold in sorted(entries.items()):
+        warm = entries.get(name.replace(COLD_SUFFIX, WARM_SUFFIX)) if COLD_SUFFIX in name else None
+        if warm is None or not cold.num_requests or not warm.num_requests:
+            continue
+        result.append(
+            CacheRatio(
+                name.replace(COLD_SUFFIX, ""),
+                cold.num_requests,
+                warm.num_requests,
+                cold.get_response_time_percentile(0.5),
+                warm.get_response_time_percentile(0.5),
+                cold.get_response_time_percentile(0.95),
+                warm.get_response_time_percentile(0.95),
+            )
+        )
+    return result
+
+
+def write_cache_ratios(ratios: t.Iterable[CacheRatio], results_dir: Path) -> Path:
+    return write_csv(
+        results_dir / "cache_ratio.csv",
+        [
+            "Name",
+            "Cold Requests",
+            "Warm Requests",
+            "Cold p50 (ms)",
+            "Warm p50 (ms)",
+            "Cold p95 (ms)",
+            "Warm p95 (ms)",
+            "Cold/Warm p50",
+            "Cold/Warm p95",
+        ],
+        [
+            [
+                ratio.name,
+                ratio.cold_requests,
+                ratio.warm_requests,
+                ratio.cold_p50,
+                ratio.warm_p50,
+                ratio.cold_p95,
+                ratio.warm_p95,
+                round(ratio.ratio_p50, 2),
+                round(ratio.ratio_p95, 2),
+            ]
+            for ratio in ratios
+        ],
+    )
+
+
+cache_mode = CacheMode()
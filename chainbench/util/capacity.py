@@ -0,0 +1,401 @@
+import html
+import json
+import logging
+import time
+import typing as t
+from argparse import Namespace
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from locust.runners import WORKER_REPORT_INTERVAL, Runner
+from locust.stats import (
+    RequestStats,
+    StatsEntry,
+    calculate_response_time_percentile,
+    diff_response_time_dicts,
+)
+
+from chainbench.util.report import get_results_dir, write_csv
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLO_ERROR_RATE = 1.0
+DEFAULT_STEP_TIME = 60
+# share of every step after its users are spawned that lets the load settle before it is measured
+SETTLE_FRACTION = 1 / 3
+# bisection stops once the gap between the passing and failing number of users is within this share of the former
+RESOLUTION = 0.05
+
+
+@dataclass(frozen=True)
+class Slo:
+    """Thresholds a load has to meet, latencies in milliseconds and the error rate in percent, 0 disables latencies."""
+
+    p95: float = 0.0
+    p99: float = 0.0
+    error_rate: float = DEFAULT_SLO_ERROR_RATE
+
+    @classmethod
+    def from_options(cls, parsed_options: Namespace) -> "Slo":
+        return cls(
+            p95=getattr(parsed_options, "slo_p95", 0.0),
+            p99=getattr(parsed_options, "slo_p99", 0.0),
+            error_rate=getattr(parsed_options, "slo_error_rate", DEFAULT_SLO_ERROR_RATE),
+        )
+
+    def violations(self, requests: int, p95: float, p99: float, error_rate: float) -> list[str]:
+        if requests == 0:
+            return ["no requests completed"]
+        violations = []
+        if self.p95 and p95 > self.p95:
+            violations.append(f"p95 {p95:g} ms > {self.p95:g} ms")
+        if self.p99 and p99 > self.p99:
+            violations.append(f"p99 {p99:g} ms > {self.p99:g} ms")
+        if error_rate > self.error_rate:
+            violations.append(f"error rate {error_rate:.2f}% > {self.error_rate:g}%")
+        return violations
+
+
+class StatsSnapshot(t.NamedTuple):
+    time: float
+    num_requests: int
+    num_failures: int
+    response_times: dict[int, int]
+
+    @classmethod
+    def take(cls, entry: StatsEntry) -> "StatsSnapshot":
+        return cls(time.time(), entry.num_requests, entry.num_failures, dict(entry.response_times))
+
+
+@dataclass(frozen=True)
+class StepResult:
+    """Throughput, latencies and error rate measured while running a number of users."""
+
+    users: int
+    duration: float
+    requests: int
+    failures: int
+    rps: float
+    p50: float
+    p95: float
+    p99: float
+    error_rate: float
+    violations: list[str] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return not self.violations
+
+    @classmethod
+    def measure(cls, users: int, start: StatsSnapshot, end: StatsSnapshot, slo: Slo | None = None) -> "StepResult":
+        """Measure a step from snapshots of stats taken at its start and end, and check it against an SLO if given."""
+        requests = end.num_requests - start.num_requests
+        failures = end.num_failures - start.num_failures
+        response_times = diff_response_time_dicts(end.response_times, start.response_times)
+        count = sum(response_times.values())
+        p50, p95, p99 = (
+            calculate_response_time_percentile(response_times, count, percent) if count else 0
+            for percent in (0.5, 0.95, 0.99)
+        )
+        duration = end.time - start.time
+        error_rate = 100 * failures / requests if requests else 0.0
+        return cls(
+            users=users,
+            duration=round(duration, 3),
+            requests=requests,
+            failures=failures,
+            rps=round(requests / duration, 2) if duration > 0 else 0.0,
+            p50=p50,
+            p95=p95,
+            p99=p99,
+            error_rate=round(error_rate, 3),
+            violations=slo.violations(requests, p95, p99, error_rate) if slo is not None else [],
+        )
+
+
+class SaturationSearch:
+    """
+    Searches for the highest number of users whose load meets an SLO.
+
+    The number of users is doubled from initial_users until a step misses the SLO or max_users is reached,
+    then bisected between the highest passing and the lowest failing number of users until they are within
+    RESOLUTION of each other.
+    """
+
+    def __init__(self, initial_users: int, max_users: int, slo: Slo):
+        self.max_users = max(1, max_users)
+        self.users = min(max(1, initial_users), self.max_users)
+        self.slo = slo
+        self.low = 0
+        self.high: int | None = None
+        self.steps: list[StepResult] = []
+        self.done = False
+
+    def record(self, step: StepResult) -> None:
+        """Record the result of a step at the current number of users and move on to the next number."""
+        self.steps.append(step)
+        if step.passed:
+            self.low = max(self.low, step.users)
+        else:
+            self.high = step.users if self.high is None else min(self.high, step.users)
+        if self.high is None:
+            if self.users >= self.max_users:
+                self.done = True
+                return
+            next_users = min(self.users * 2, self.max_users)
+        else:
+            next_users = (self.low + self.high) // 2
+            if next_users <= self.low or self.high - self.low <= max(1, self.low * RESOLUTION):
+                self.done = True
+                return
+        self.users = next_users
+
+    @property
+    def knee(self) -> StepResult | None:
+        """The last step at the highest number of users that met the SLO."""
+        passed = [step for step in self.steps if step.passed and step.users == self.low]
+        return passed[-1] if passed else None
+
+    @property
+    def errors_began(self) -> StepResult | None:
+        """The step at the lowest number of users that had failed requests."""
+        failed = [step for step in self.steps if step.error_rate > 0]
+        return min(failed, key=lambda step: step.users) if failed else None
+
+    def report(self) -> dict[str, t.Any]:
+        knee = self.knee
+        errors_began = self.errors_began
+        return {
+            "slo": asdict(self.slo),
+            "saturated": self.high is not None,
+            "complete": self.done,
+            "knee": (
+                {"users": knee.users, "rps": knee.rps, "p50": knee.p50, "p95": knee.p95, "p99": knee.p99}
+                if knee is not None
+                else None
+            ),
+            "errors_began": (
+                {"users": errors_began.users, "rps": errors_began.rps, "error_rate": errors_began.error_rate}
+                if errors_began is not None
+                else None
+            ),
+            "steps": [asdict(step) for step in self.steps],
+        }
+
+    def summary(self) -> str:
+        knee = self.knee
+        if not self.steps:
+            return "Capacity: no step completed, use a longer test time or a shorter step time"
+        if knee is None:
+            return f"Capacity: no load met the SLO, lowest load tried was {min(s.users for s in self.steps)} users"
+        summary = f"Capacity: knee at {knee.rps} RPS with {knee.users} users, p95 {knee.p95} ms, p99 {knee.p99} ms"
+        if self.high is None:
+            summary += ", SLO still met at the maximum number of users"
+        errors_began = self.errors_began
+        if errors_began is not None:
+            summary += f", errors began at {errors_began.rps} RPS with {errors_began.users} users"
+        return summary
+
+    def write_report(self, path: Path) -> Path:
+        path.write_text(json.dumps(self.report(), indent=2))
+        return path
+
+
+AGGREGATED = ("", "Aggregated")
+CHART_COLORS = ["#1f77b4", "#ff7f0e", "#d62728", "#2ca02c"]
+
+
+class CurvePoint(t.NamedTuple):
+    step: int
+    request_type: str
+    name: str
+    result: StepResult
+
+
+class CapacityCurve:
+    """
+    Throughput, latencies and errors per request name at every step of a load shape.
+
+    Shapes call track on every tick with their current step and its number of users. A step is measured from a worker
+    report interval after its users are spawned until the next step starts, by diffing snapshots of the live stats
+    of the runner taken at these points, so steps are aggregated as the test runs.
+    """
+
+    def __init__(self) -> None:
+        self.points: list[CurvePoint] = []
+        self.step: int | None = None
+        self.users = 0
+        self.start: dict[tuple[str, str], StatsSnapshot] | None = None
+        self.spawned_time: float | None = None
+        self.finished = False
+
+    @staticmethod
+    def snapshot(stats: RequestStats) -> dict[tuple[str, str], StatsSnapshot]:
+        snapshot = {(entry.method or "", entry.name): StatsSnapshot.take(entry) for entry in stats.entries.values()}
+        snapshot[AGGREGATED] = StatsSnapshot.take(stats.total)
+        return snapshot
+
+    def track(self, runner: Runner, step: int, users: float) -> None:
+        users = round(users)
+        if step != self.step:
+            self.end_step(runner)
+            self.step, self.users, self.start = step, users, None
+            self.spawned_time = None
+            logger.info(f"Step {step} started with {users} users")
+        if self.start is None and users > 0 and runner.user_count == users:
+            # stats of the previous step reach the master with worker reports up to an interval after it ends
+            if self.spawned_time is None:
+                self.spawned_time = time.time()
+            elif time.time() - self.spawned_time >= WORKER_REPORT_INTERVAL:
+                self.start = self.snapshot(runner.stats)
+
+    def end_step(self, runner: Runner) -> None:
+        if self.step is None or self.start is None:
+            return
+        end = self.snapshot(runner.stats)
+        start_time = self.start[AGGREGATED].time
+        for (request_type, name), end_snapshot in end.items():
+            result = StepResult.measure(
+                self.users, self.start.get((request_type, name), StatsSnapshot(start_time, 0, 0, {})), end_snapshot
+            )
+            if result.requests or (request_type, name) == AGGREGATED:
+                self.points.append(CurvePoint(self.step, request_type, name, result))
+        self.start = None
+        aggregated = self.points[-1].result
+        logger.info(
+            f"Step {self.step} with {self.users} users: {aggregated.rps} RPS, p50 {aggregated.p50} ms, "
+            f"p95 {aggregated.p95} ms, p99 {aggregated.p99} ms, {aggregated.failures} failures"
+        )
+
+    def finish(self, runner: Runner) -> None:
+        """End the last step and write the curve to the results directory."""
+        if self.finished:
+            return
+        self.finished = True
+        self.end_step(runner)
+        results_dir = get_results_dir(runner.environment.parsed_options)
+        if results_dir is not None and self.points:
+            paths = self.write(results_dir)
+            logger.info(f"Capacity curve saved to {', '.join(str(path) for path in paths)}")
+
+    def write(self, results_dir: Path) -> list[Path]:
+        csv_path = write_csv(
+            results_dir / "capacity_curve.csv",
+            [
+                "Step",
+                "Users",
+                "Type",
+                "Name",
+                "Duration (s)",
+                "Requests",
+                "Failures",
+                "RPS",
+                "p50 (ms)",
+                "p95 (ms)",
+                "p99 (ms)",
+                "Error Rate (%)",
+            ],
+            [
+                [
+                    point.step,
+                    point.result.users,
+                    point.request_type,
+                    point.name,
+                    point.result.duration,
+                    point.result.requests,
+                    point.result.failures,
+                    point.result.rps,
+                    point.result.p50,
+                    point.result.p95,
+                    point.result.p99,
+                    point.result.error_rate,
+                ]
+                for point in self.points
+            ],
+        )
+        html_path = results_dir / "capacity_curve.html"
+        html_path.write_text(self.render_html())
+        return [csv_path, html_path]
+
+    def render_html(self) -> str:
+        aggregated = [point for point in self.points if (point.request_type, point.name) == AGGREGATED]
+        labels = [f"{point.step} ({point.result.users})" for point in aggregated]
+        rows = "\n".join(
+            "<tr>"
+            + "".join(
+                f"<td>{html.escape(str(value))}</td>"
+                for value in (
+                    point.step,
+                    point.result.users,
+                    point.name,
+                    point.result.requests,
+                    point.result.failures,
+                    point.result.rps,
+                    point.result.p50,
+                    point.result.p95,
+                    point.result.p99,
+                    point.result.error_rate,
+                )
+            )
+            + "</tr>"
+            for point in self.points
+        )
+        return (
+            '<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Capacity curve</title><style>'
+            "body{font-family:sans-serif}table{border-collapse:collapse}td,th{border:1px solid #ccc;padding:2px 8px}"
+            "</style></head><body><h1>Capacity curve</h1>\n"
+            + _svg_line_chart("Throughput (RPS)", labels, {"RPS": [point.result.rps for point in aggregated]})
+            + "\n"
+            + _svg_line_chart(
+                "Response time (ms)",
+                labels,
+                {
+                    "p50": [point.result.p50 for point in aggregated],
+                    "p95": [point.result.p95 for point in aggregated],
+                    "p99": [point.result.p99 for point in aggregated],
+                },
+            )
+            + "\n"
+            + _svg_line_chart("Error rate (%)", labels, {"errors": [point.result.error_rate for point in aggregated]})
+            + "\n<table><tr><th>Step</th><th>Users</th><th>Name</th><th>Requests</th><th>Failures</th><th>RPS</th>"
+            "<th>p50 (ms)</th><th>p95 (ms)</th><th>p99 (ms)</th><th>Error rate (%)</th></tr>\n"
+            + rows
+            + "\n</table></body></html>\n"
+        )
+
+
+def _svg_line_chart(title: str, labels: list[str], series: dict[str, list[float]]) -> str:
+    """Render series of values at the labelled steps of a capacity curve as an SVG line chart."""
+    width, height, margin = 760, 300, 50
+    top = max((value for values in series.values() for value in values), default=0) or 1
+
+    def x(index: int) -> float:
+        return margin + (width - 2 * margin) * (index / (len(labels) - 1) if len(labels) > 1 else 0.5)
+
+    def y(value: float) -> float:
+        return height - margin - (height - 2 * margin) * value / top
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-size="11">',
+        f'<text x="{margin}" y="20" font-size="14">{html.escape(title)}</text>',
+        f'<line x1="{margin}" y1="{height - margin}" x2="{width - margin}" y2="{height - margin}" stroke="#444"/>',
+        f'<line x1="{margin}" y1="{margin}" x2="{margin}" y2="{height - margin}" stroke="#444"/>',
+        f'<text x="{margin - 5}" y="{margin + 4}" text-anchor="end">{top:g}</text>',
+        f'<text x="{margin - 5}" y="{height - margin + 4}" text-anchor="end">0</text>',
+        f'<text x="{width / 2}" y="{height - 10}" text-anchor="middle">step (users)</text>',
+    ]
+    for index, label in enumerate(labels):
+        parts.append(
+            f'<text x="{x(index):.1f}" y="{height - margin + 15}" text-anchor="middle">{html.escape(label)}</text>'
+        )
+    for number, (name, values) in enumerate(series.items()):
+        color = CHART_COLORS[number % len(CHART_COLORS)]
+        points = " ".join(f"{x(index):.1f},{y(value):.1f}" for index, value in enumerate(values))
+        parts.append(f'<polyline fill="none" stroke="{color}" stroke-width="2" points="{points}"/>')
+        parts.extend(
+            f'<circle cx="{x(index):.1f}" cy="{y(value):.1f}" r="3" fill="{color}"><title>{value:g}</title></circle>'
+            for index, value in enumerate(values)
+        )
+        parts.append(f'<text x="{width - margin + 5}" y="{margin + 14 * number}" fill="{color}">{name}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts)
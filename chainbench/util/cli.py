@@ -147,6 +147,35 @@ class LocustOptions:
     ref_url: str | None = None
     start_block: int | None = None
     end_block: int | None = None
+    bootstrap_concurrency: int = 10
+    bootstrap_rate_limit: float = 0.0
+    bootstrap_batch_size: int = 10
+    shared_test_data: bool = False
+    test_data_file: Path | None = None
+    test_data_cache: bool = False
+    test_data_cache_dir: Path | None = None
+    test_data_cache_ttl: float = 24.0
+    test_data_cache_max_size: int = 1024
+    seed: int = 42
+    target_rps: float = 0.0
+    arrival_distribution: str = "poisson"
+    max_in_flight: int = 1000
+    slo_p95: float = 0.0
+    slo_p99: float = 0.0
+    slo_error_rate: float = 1.0
+    saturation_step_time: int = 60
+    replay_file: Path | None = None
+    replay_speed: float = 1.0
+    record: bool = False
+    request_log_sample_rate: str = "0.01"
+    rpc_response_check: str = "full"
+    param_pool_size: int = 0
+    max_worker_cpu: float = 90.0
+    max_loop_lag: float = 50.0
+    warmup: int = 0
+    cache_mode: str = "random"
+    hot_set_size: int = 10
+    depth_buckets: str | None = None
 
     def get_master_command(self) -> str:
         """Generate master command."""
@@ -159,12 +188,38 @@ class LocustOptions:
             f"--html {self.results_path}/report.html --csv {self.results_path}/report.csv "
             f"--logfile {self.results_path}/report.log "
             f"--loglevel {self.log_level} --expect-workers {self.workers} "
-            f"--size {self.size}"
+            f"--size {self.size} "
+            f"--bootstrap-concurrency {self.bootstrap_concurrency} --bootstrap-rate-limit {self.bootstrap_rate_limit} "
+            f"--bootstrap-batch-size {self.bootstrap_batch_size} "
+            f"--max-worker-cpu {self.max_worker_cpu} --max-loop-lag {self.max_loop_lag}"
         )
 
         if self.enable_class_picker:
             command += " --class-picker"
 
+        if self.shape_path is not None:
+            command += (
+                f" --slo-p95 {self.slo_p95} --slo-p99 {self.slo_p99} --slo-error-rate {self.slo_error_rate}"
+                f" --saturation-step-time {self.saturation_step_time}"
+            )
+
+        if self.warmup > 0:
+            command += f" --warmup {self.warmup}"
+
+        if self.shared_test_data:
+            command += " --shared-test-data True"
+
+        if self.test_data_file is not None:
+            command += f" --test-data-file {self.test_data_file}"
+
+        if self.test_data_cache:
+            command += (
+                f" --test-data-cache True --test-data-cache-ttl {self.test_data_cache_ttl}"
+                f" --test-data-cache-max-size {self.test_data_cache_max_size}"
+            )
+            if self.test_data_cache_dir is not None:
+                command += f" --test-data-cache-dir {self.test_data_cache_dir}"
+
         return self.get_extra_options(command)
 
     def get_worker_command(self, worker_id: int = 0) -> str:
@@ -214,6 +269,35 @@ class LocustOptions:
 
         if self.ref_url is not None:
             command += f" --ref-url {self.ref_url}"
+
+        command += f" --seed {self.seed}"
+
+        if self.target_rps > 0:
+            command += (
+                f" --target-rps {self.target_rps} --arrival-distribution {self.arrival_distribution}"
+                f" --max-in-flight {self.max_in_flight}"
+            )
+
+        if self.replay_file is not None:
+            command += f" --replay-file {self.replay_file} --replay-speed {self.replay_speed}"
+
+        if self.record:
+            command += f" --record-dir {self.results_path}/requests"
+
+        if self.request_log_sample_rate != "0.01":
+            command += f" --request-log-sample-rate {self.request_log_sample_rate}"
+
+        if self.rpc_response_check != "full":
+            command += f" --rpc-response-check {self.rpc_response_check}"
+
+        if self.param_pool_size > 0:
+            command += f" --param-pool-size {self.param_pool_size}"
+
+        if self.cache_mode != "random":
+            command += f" --cache-mode {self.cache_mode} --hot-set-size {self.hot_set_size}"
+
+        if self.depth_buckets:
+            command += f" --depth-buckets {self.depth_buckets}"
         return command
 
 
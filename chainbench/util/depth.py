@@ -0,0 +1,97 @@
+import typing as t
+
+# block tags at or next to the head of the chain, their depth is counted as 0
+HEAD_BLOCK_TAGS = frozenset({"latest", "pending", "safe", "finalized"})
+
+# returns the block param of a call from its params, or None if the call doesn't reference a block
+BlockParam = t.Callable[[list[t.Any] | dict[str, t.Any]], t.Any]
+
+
+def param_at(index: int, key: str | None = None) -> BlockParam:
+    """Return a function reading the block param at index of the params, or the key of an object at index."""
+
+    def block_param(params: list[t.Any] | dict[str, t.Any]) -> t.Any:
+        if not isinstance(params, list) or len(params) <= index:
+            return None
+        value = params[index]
+        if key is not None:
+            return value.get(key) if isinstance(value, dict) else None
+        return value
+
+    return block_param
+
+
+def parse_depth_buckets(value: str) -> tuple[int, ...]:
+    """Parse comma separated upper bounds of depth buckets, e.g. 128,10000,1000000."""
+    try:
+        bounds = tuple(int(bound) for bound in value.split(",") if bound.strip())
+    except ValueError:
+        raise ValueError(f"Invalid depth buckets: '{value}', use comma separated numbers of blocks")
+    if not bounds or any(bound <= 0 for bound in bounds) or list(bounds) != sorted(set(bounds)):
+        raise ValueError(f"Invalid depth buckets: '{value}', use increasing positive numbers of blocks")
+    return bounds
+
+
+def format_blocks(blocks: int) -> str:
+    for divisor, suffix in ((1_000_000, "M"), (1_000, "k")):
+        if blocks >= divisor and blocks % divisor == 0:
+            return f"{blocks // divisor}{suffix}"
+    return str(blocks)
+
+
+def block_number_of(block_param: t.Any, chain_head: int) -> int | None:
+    """Block number of a block param, which is a number, a hex string, a block tag or an EIP-1898 object."""
+    if isinstance(block_param, bool):
+        return None
+    if isinstance(block_param, int):
+        return block_param
+    if isinstance(block_param, dict):
+        return block_number_of(block_param.get("blockNumber"), chain_head)
+    if isinstance(block_param, str):
+        if block_param in HEAD_BLOCK_TAGS:
+            return chain_head
+        if block_param == "earliest":
+            return 0
+        if block_param.startswith("0x") and len(block_param) <= 18:
+            try:
+                return int(block_param, 16)
+            except ValueError:
+                return None
+    return None
+
+
+class DepthBuckets:
+    """
+    Tags names of calls referencing a block with the bucket of the depth of the block below the head of the chain,
+    so requests to recent blocks and requests to archive data are reported apart, e.g. eth_getLogs [depth <10k].
+    """
+
+    def __init__(self) -> None:
+        self.bounds: tuple[int, ...] = ()
+        self.labels: list[str] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.bounds)
+
+    def configure(self, bounds: t.Sequence[int]) -> None:
+        self.bounds = tuple(bounds)
+        self.labels = [f" [depth <{format_blocks(bound)}]" for bound in self.bounds]
+        if self.bounds:
+            self.labels.append(f" [depth >={format_blocks(self.bounds[-1])}]")
+
+    def label(self, depth: int) -> str:
+        for bound, label in zip(self.bounds, self.labels):
+            if depth < bound:
+                return label
+        return self.labels[-1]
+
+    def tag(self, name: str, block_param: t.Any, chain_head: int) -> str:
+        """Append the depth bucket of the block param to the name, names of calls without a block are kept."""
+        block_number = block_number_of(block_param, chain_head)
+        if block_number is None:
+            return name
+        return name + self.label(max(chain_head - block_number, 0))
+
+
+depth_buckets = DepthBuckets()
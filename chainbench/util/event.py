@@ -1,7 +1,11 @@
 import logging
+import os
 import time
 import traceback
 import typing as t
+from argparse import Namespace
+from functools import partial
+from pathlib import Path
 
 import gevent
 from locust import User, events
@@ -9,15 +13,75 @@ from locust.argument_parser import LocustArgumentParser
 from locust.env import Environment
 from locust.rpc import Message
 from locust.runners import STATE_CLEANUP, MasterRunner, WorkerRunner
+from locust.stats import print_stats
 
 from chainbench.test_data import Block, EvmTestData, TestData
 from chainbench.test_data.blockchain import BlockNotFoundError, InvalidBlockError
+from chainbench.test_data.bootstrap import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CONCURRENCY,
+    TestDataBootstrap,
+)
+from chainbench.test_data.cache import (
+    DEFAULT_MAX_SIZE,
+    DEFAULT_TTL,
+    CacheKey,
+    TestDataCache,
+)
 from chainbench.test_data.evm import ChainId
+from chainbench.test_data.shared import get_shared_data_dir, write_shared_blocks
+from chainbench.test_data.snapshot import load_snapshot
 from chainbench.user.common import all_methods
+from chainbench.util.arrival import (
+    ARRIVAL_DISTRIBUTIONS,
+    DEFAULT_MAX_IN_FLIGHT,
+    ArrivalCounts,
+    arrival_scheduler,
+)
+from chainbench.util.cache_mode import (
+    CACHE_MODES,
+    DEFAULT_HOT_SET_SIZE,
+    cache_mode,
+    cache_ratios,
+    write_cache_ratios,
+)
+from chainbench.util.capacity import DEFAULT_SLO_ERROR_RATE, DEFAULT_STEP_TIME
+from chainbench.util.depth import depth_buckets, parse_depth_buckets
+from chainbench.util.hdr import hdr_recorder
+from chainbench.util.health import (
+    DEFAULT_MAX_CPU,
+    DEFAULT_MAX_LOOP_LAG,
+    health_monitor,
+    health_report,
+)
+from chainbench.util.log import (
+    DEFAULT_SAMPLE_RATE,
+    ERROR_LOG_INTERVAL,
+    ThreadedLogListener,
+    error_log_limiter,
+    request_log_sampler,
+)
+from chainbench.util.replay import (
+    DEFAULT_SPEED,
+    ReplayCounts,
+    replay_lag_recorder,
+    replay_source,
+    request_recorder,
+)
+from chainbench.util.report import get_results_dir, write_csv
+from chainbench.util.rng import DEFAULT_SEED, configure_rng, rng_manager
 from chainbench.util.timer import Timer
+from chainbench.util.warmup import warmup_window, write_warmup_stats
 
 logger = logging.getLogger(__name__)
 
+shared_test_data_files: list[Path] = []
+arrival_counts = ArrivalCounts()
+replay_counts = ReplayCounts()
+replay_shards: set[int] = set()
+# handlers of the root and locust loggers, which write worker log files, run in a thread of their own
+log_listener = ThreadedLogListener([None, "locust"])
+
 
 def cli_custom_arguments(parser: LocustArgumentParser):
     parser.add_argument(
@@ -71,6 +135,244 @@ def cli_custom_arguments(parser: LocustArgumentParser):
         help="Last block number to be used for fetching test data.",
         include_in_web_ui=False,
     )
+    parser.add_argument(
+        "--bootstrap-concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Number of concurrent requests used for fetching test data. Default is {DEFAULT_CONCURRENCY}.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--bootstrap-rate-limit",
+        type=float,
+        default=0,
+        help="Maximum requests per second sent to the reference node while fetching test data. "
+        "Default is 0 (unlimited).",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--bootstrap-batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Number of blocks fetched per JSON-RPC batch request while fetching test data, 1 disables batching. "
+        f"Default is {DEFAULT_BATCH_SIZE}.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--test-data-cache",
+        type=bool,
+        default=False,
+        help="Reuse test data cached on disk by previous runs and cache newly fetched test data. "
+        "Ignored when using latest blocks. Default is False.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--test-data-cache-dir",
+        type=str,
+        default=None,
+        help="Directory where test data is cached. Default is ~/.cache/chainbench.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--test-data-cache-ttl",
+        type=float,
+        default=DEFAULT_TTL,
+        help=f"Hours after which cached test data expires, 0 means never. Default is {DEFAULT_TTL}.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--test-data-cache-max-size",
+        type=int,
+        default=DEFAULT_MAX_SIZE,
+        help="Maximum size of the test data cache in megabytes, least recently used entries are evicted first. "
+        f"Default is {DEFAULT_MAX_SIZE}.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--shared-test-data",
+        type=bool,
+        default=False,
+        help="Share a single memory mapped copy of test data between all workers on the machine instead of "
+        "sending every block to each worker. Ignored when using latest blocks. Default is False.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--test-data-file",
+        type=str,
+        default=None,
+        help="Load test data from a snapshot file created with 'chainbench data export' instead of fetching it "
+        "from the reference node.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=DEFAULT_SEED,
+        help="Seed of the run that random params of every worker and user are derived from, so runs with the same "
+        f"seed generate the same params. Default is {DEFAULT_SEED}.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--target-rps",
+        type=float,
+        default=0,
+        help="Run in open loop mode, starting tasks at this rate per second across all workers regardless of response "
+        "times, which are then measured from when each task should have started. Users only run scheduled tasks, "
+        "so use enough users to keep up with the rate. Default is 0 (closed loop).",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--arrival-distribution",
+        type=str,
+        default="poisson",
+        choices=ARRIVAL_DISTRIBUTIONS,
+        help="Distribution of the times between task starts in open loop mode. Default is poisson.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=DEFAULT_MAX_IN_FLIGHT,
+        help="Maximum number of scheduled tasks waiting for a user or running across all workers in open loop mode, "
+        f"tasks scheduled beyond it are dropped. Default is {DEFAULT_MAX_IN_FLIGHT}.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--slo-p95",
+        type=float,
+        default=0,
+        help="Highest p95 response time in milliseconds a load has to meet in the saturation shape. "
+        "Default is 0 (not checked).",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--slo-p99",
+        type=float,
+        default=0,
+        help="Highest p99 response time in milliseconds a load has to meet in the saturation shape. "
+        "Default is 0 (not checked).",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--slo-error-rate",
+        type=float,
+        default=DEFAULT_SLO_ERROR_RATE,
+        help="Highest percentage of failed requests a load has to meet in the saturation shape. "
+        f"Default is {DEFAULT_SLO_ERROR_RATE}.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--saturation-step-time",
+        type=int,
+        default=DEFAULT_STEP_TIME,
+        help="Seconds every load is run for in the saturation shape once its users are spawned. "
+        f"Default is {DEFAULT_STEP_TIME}.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--replay-file",
+        type=str,
+        default=None,
+        help="Capture file of JSON-RPC requests replayed by the replay profile, one JSON object per line with "
+        "a timestamp, a method and params, optionally compressed with gzip, bzip2 or xz. A directory of requests "
+        "recorded with --record-dir is replayed as a single capture.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=DEFAULT_SPEED,
+        help="Speed the capture file is replayed at relative to the original timing, e.g. 2 sends requests twice "
+        f"as fast. Default is {DEFAULT_SPEED}.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--record-dir",
+        type=str,
+        default=None,
+        help="Directory the JSON-RPC requests sent by every worker are recorded to, so they can be replayed "
+        "against another target with --replay-file.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--request-log-sample-rate",
+        type=str,
+        default=str(DEFAULT_SAMPLE_RATE),
+        help="Share of requests of every method logged, optionally followed by shares of single methods, "
+        f"e.g. 0.01,eth_call=0.1. Errors are always logged, at most once per {ERROR_LOG_INTERVAL:g} seconds for "
+        f"the same kind of error. Default is {DEFAULT_SAMPLE_RATE}.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--rpc-response-check",
+        type=str,
+        default="full",
+        choices=["full", "envelope"],
+        help="How JSON-RPC responses are checked. 'full' decodes response text and parses it when an error is "
+        "suspected, 'envelope' checks the envelope on raw bytes and only parses responses holding errors, "
+        "which saves CPU on large responses. Default is full.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=0,
+        help="Seconds from the start of the test whose requests are reported as warm-up stats apart from the "
+        "steady state. Default is 0 (no warm-up).",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--max-worker-cpu",
+        type=float,
+        default=DEFAULT_MAX_CPU,
+        help="CPU usage of a worker in percent of a core above which the load generator is considered saturated. "
+        f"Default is {DEFAULT_MAX_CPU:g}.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--max-loop-lag",
+        type=float,
+        default=DEFAULT_MAX_LOOP_LAG,
+        help="Event loop lag of a worker in milliseconds above which the load generator is considered saturated. "
+        f"Default is {DEFAULT_MAX_LOOP_LAG:g}.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--param-pool-size",
+        type=int,
+        default=0,
+        help="Number of calls pre-generated per RPC method once test data is ready, requests then reuse calls from "
+        "these pools with their encoded request bodies instead of generating params each time. "
+        "Default is 0 (disabled).",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--cache-mode",
+        type=str,
+        default="random",
+        choices=CACHE_MODES,
+        help="How params of JSON-RPC calls relate to the cache of the node: random draws them from test data, "
+        "cold never repeats them across all workers, warm reuses a small hot set and paired alternates cold and "
+        "warm calls and reports the ratio of their response times. Default is random.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--depth-buckets",
+        type=str,
+        default="",
+        help="Comma separated upper bounds of buckets of the depth of blocks below the head of the chain, "
+        "e.g. 128,10000,1000000. Calls referencing a block are reported per method and depth bucket. "
+        "Default is disabled.",
+        include_in_web_ui=False,
+    )
+    parser.add_argument(
+        "--hot-set-size",
+        type=int,
+        default=DEFAULT_HOT_SET_SIZE,
+        help=f"Number of calls per RPC method in the hot set of the warm and paired cache modes. "
+        f"Default is {DEFAULT_HOT_SET_SIZE}.",
+        include_in_web_ui=False,
+    )
 
 
 def send_msg_to_workers(master_runner: MasterRunner, msg_type: str, data: dict[str, t.Any]):
@@ -79,6 +381,44 @@ def send_msg_to_workers(master_runner: MasterRunner, msg_type: str, data: dict[s
         logger.debug(f"{msg_type} sent to worker {i}")
 
 
+def send_block_to_workers(master_runner: MasterRunner, test_data_class_name: str, block: Block):
+    send_msg_to_workers(master_runner, "block_data", {test_data_class_name: block.to_json()})
+
+
+def get_test_data_cache(test_data: TestData, parsed_options: Namespace) -> tuple[TestDataCache, CacheKey] | None:
+    if not getattr(parsed_options, "test_data_cache", False) or parsed_options.use_latest_blocks:
+        return None
+    cache = TestDataCache(
+        parsed_options.test_data_cache_dir, parsed_options.test_data_cache_ttl, parsed_options.test_data_cache_max_size
+    )
+    key = CacheKey.from_options(
+        test_data.fetch_chain_key(), test_data.data.size.label, parsed_options.start_block, parsed_options.end_block
+    )
+    return cache, key
+
+
+def shared_test_data_enabled(parsed_options: Namespace | None) -> bool:
+    return bool(getattr(parsed_options, "shared_test_data", False)) and not getattr(
+        parsed_options, "use_latest_blocks", False
+    )
+
+
+def share_test_data(master_runner: MasterRunner, test_data: TestData) -> Path:
+    test_data_class_name = type(test_data).__name__
+    path = write_shared_blocks(
+        test_data.data.blocks, get_shared_data_dir() / f"chainbench-{os.getpid()}-{test_data_class_name}.bin"
+    )
+    shared_test_data_files.append(path)
+    send_msg_to_workers(master_runner, "shared_test_data", {test_data_class_name: str(path)})
+    return path
+
+
+def remove_shared_test_data(**_kwargs):
+    for path in shared_test_data_files:
+        path.unlink(missing_ok=True)
+    shared_test_data_files.clear()
+
+
 def setup_test_data(environment: Environment, msg: Message, **kwargs):
     # Fired when the worker receives a message of type 'test_data'
     test_data: dict[str, t.Any] = msg.data["data"][0]
@@ -86,6 +426,8 @@ def setup_test_data(environment: Environment, msg: Message, **kwargs):
 
     if isinstance(environment.runner, WorkerRunner):
         for user in environment.runner.user_classes:
+            if not getattr(user, "requires_test_data", True):
+                continue
             if hasattr(user, "test_data"):
                 test_data_class_name: str = type(user.test_data).__name__
                 user.test_data.init_data_from_json(test_data[test_data_class_name])
@@ -100,6 +442,275 @@ def setup_test_data(environment: Environment, msg: Message, **kwargs):
         logger.info("Initial test data received from master")
 
 
+def on_shared_test_data(environment: Environment, msg: Message, **kwargs):
+    # Fired when the worker receives a message of type 'shared_test_data'
+    paths: dict[str, str] = msg.data["data"][0]
+
+    if isinstance(environment.runner, WorkerRunner):
+        for user in environment.runner.user_classes:
+            if hasattr(user, "test_data"):
+                test_data_class_name: str = type(user.test_data).__name__
+                if test_data_class_name in paths:
+                    user.test_data.attach_shared_data(Path(paths[test_data_class_name]))
+        logger.info("Shared test data attached: %s", paths)
+
+
+def on_arrival_rate(environment: Environment, msg: Message, **kwargs):
+    # Fired when the worker receives a message of type 'arrival_rate'
+    options: dict[str, t.Any] = msg.data["data"][0]
+
+    if isinstance(environment.runner, WorkerRunner):
+        arrival_scheduler.configure(options["rate"], options["distribution"], options["max_in_flight"])
+        logger.info(f"Open loop mode, scheduling {options['rate']:.2f} tasks per second")
+
+
+def send_arrival_rate(master_runner: MasterRunner, parsed_options: Namespace):
+    # the target rate and in flight cap are split evenly between workers
+    workers = max(1, len(master_runner.clients))
+    send_msg_to_workers(
+        master_runner,
+        "arrival_rate",
+        {
+            "rate": parsed_options.target_rps / workers,
+            "distribution": parsed_options.arrival_distribution,
+            "max_in_flight": parsed_options.max_in_flight // workers,
+        },
+    )
+
+
+def on_replay(environment: Environment, msg: Message, **kwargs):
+    # Fired when the worker receives a message of type 'replay'
+    options: dict[str, t.Any] = msg.data["data"][0]
+    worker_index: int = msg.data["data"][1]
+
+    if isinstance(environment.runner, WorkerRunner) and environment.parsed_options:
+        # every worker replays the records of its own shard of the capture
+        replay_source.configure(
+            Path(environment.parsed_options.replay_file),
+            environment.parsed_options.replay_speed,
+            worker_index,
+            options["workers"],
+        )
+
+
+def on_cache_partition(environment: Environment, msg: Message, **kwargs):
+    # Fired when the worker receives a message of type 'cache_partition'
+    options: dict[str, t.Any] = msg.data["data"][0]
+    worker_index: int = msg.data["data"][1]
+
+    if isinstance(environment.runner, WorkerRunner):
+        # cold calls of every worker are drawn from its own partition of the space of calls
+        cache_mode.assign_partition(worker_index, options["workers"])
+
+
+def send_cache_partition(master_runner: MasterRunner):
+    send_msg_to_workers(master_runner, "cache_partition", {"workers": len(master_runner.clients)})
+
+
+def send_replay(master_runner: MasterRunner):
+    send_msg_to_workers(master_runner, "replay", {"workers": len(master_runner.clients)})
+
+
+def on_replay_done(environment: Environment, msg: Message, **kwargs):
+    # Fired when the master receives a message of type 'replay_done'
+    global replay_counts
+    data: dict[str, t.Any] = msg.data["data"]
+    replay_shards.add(data["shard"])
+    replay_counts = replay_counts.merge(ReplayCounts(*data["counts"]))
+    if isinstance(environment.runner, MasterRunner) and len(replay_shards) >= data["shards"]:
+        print("Capture replayed by all workers, stopping the test")
+        logger.info("Capture replayed by all workers, stopping the test")
+        gevent.spawn(environment.runner.quit)
+
+
+def finish_replay(environment: Environment, counts: ReplayCounts):
+    global replay_counts
+    if isinstance(environment.runner, WorkerRunner):
+        environment.runner.send_message(
+            "replay_done", {"data": {"shard": replay_source.shard, "shards": replay_source.shards, "counts": counts}}
+        )
+    elif environment.runner is not None:
+        replay_counts = replay_counts.merge(counts)
+        print("Capture replayed, stopping the test")
+        gevent.spawn(environment.runner.quit)
+
+
+def on_request(request_type: str, name: str, response_time: float | None, **_kwargs):
+    if response_time is not None:
+        hdr_recorder.record(request_type, name, response_time)
+
+
+def on_report_to_master(data: dict[str, t.Any], **_kwargs):
+    data["hdr"] = hdr_recorder.take_encoded()
+    if arrival_scheduler.enabled:
+        data["arrivals"] = tuple(arrival_scheduler.take_counts())
+    if replay_source.enabled:
+        data["replay_lag"] = replay_lag_recorder.take_encoded()
+    health_samples = health_monitor.take_samples()
+    if health_samples:
+        data["health"] = (health_monitor.worker_index, health_samples)
+
+
+def on_worker_report(data: dict[str, t.Any], **_kwargs):
+    global arrival_counts
+    if "hdr" in data:
+        hdr_recorder.merge_encoded(data["hdr"])
+    if "arrivals" in data:
+        arrival_counts = arrival_counts.merge(ArrivalCounts(*data["arrivals"]))
+    if "replay_lag" in data:
+        replay_lag_recorder.merge_encoded(data["replay_lag"])
+    if "health" in data:
+        health_report.add(*data["health"])
+
+
+def end_warmup(environment: Environment):
+    runner = environment.runner
+    if isinstance(runner, MasterRunner):
+        # workers send their stats of the warm-up before acknowledging, so they are all in before stats are reset
+        send_msg_to_workers(runner, "warmup_end", {})
+        if not warmup_window.wait_for_workers(list(runner.clients)):
+            logger.warning("Not all workers sent their warm-up stats in time, some of them count as steady state")
+    elif runner is not None:
+        hdr_recorder.merge_intervals()
+        replay_lag_recorder.merge_intervals()
+    if runner is None:
+        return
+    print(f"\nWarm-up stats ({warmup_window.duration:g} seconds):")
+    print_stats(runner.stats, current=False)
+    results_dir = get_results_dir(environment.parsed_options)
+    if results_dir is not None:
+        paths = write_warmup_stats(environment, results_dir)
+        if hdr_recorder.totals:
+            paths += hdr_recorder.write(results_dir, "warmup_latency")
+        logger.info(f"Warm-up stats saved to {', '.join(str(path) for path in paths)}")
+    environment.events.reset_stats.fire()
+    runner.stats.reset_all()
+    runner.exceptions = {}
+    summary = f"Warm-up finished after {warmup_window.duration:g} seconds, stats are reset for the steady state"
+    print(summary)
+    logger.info(summary)
+
+
+def on_warmup_end(environment: Environment, msg: Message, **kwargs):
+    # Fired when the worker receives a message of type 'warmup_end'
+    runner = environment.runner
+    if isinstance(runner, WorkerRunner):
+        # stats gathered since the last report are sent the way the worker reports them periodically
+        data: dict[str, t.Any] = {}
+        environment.events.report_to_master.fire(client_id=runner.client_id, data=data)
+        runner.send_message("stats", data)
+        runner.send_message("warmup_flushed")
+
+
+def on_warmup_flushed(environment: Environment, msg: Message, **kwargs):
+    # Fired when the master receives a message of type 'warmup_flushed'
+    warmup_window.acknowledge(msg.node_id)
+
+
+def write_latency_histograms(environment: Environment, **_kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    if not isinstance(environment.runner, MasterRunner):
+        hdr_recorder.merge_intervals()
+    results_dir = get_results_dir(environment.parsed_options)
+    if results_dir is not None and hdr_recorder.totals:
+        paths = hdr_recorder.write(results_dir)
+        logger.info(f"Latency histograms saved to {', '.join(str(path) for path in paths)}")
+
+
+def write_arrival_report(environment: Environment, **_kwargs):
+    global arrival_counts
+    target_rps: float = getattr(environment.parsed_options, "target_rps", 0)
+    if isinstance(environment.runner, WorkerRunner) or target_rps <= 0:
+        return
+    if not isinstance(environment.runner, MasterRunner):
+        arrival_counts = arrival_counts.merge(arrival_scheduler.take_counts())
+    summary = (
+        f"Open loop: {arrival_counts.scheduled} tasks scheduled at {target_rps} per second, "
+        f"{arrival_counts.dropped} dropped, {arrival_counts.late} started late "
+        f"(max delay {arrival_counts.max_delay * 1000:.1f} ms)"
+    )
+    print(summary)
+    logger.info(summary)
+    results_dir = get_results_dir(environment.parsed_options)
+    if results_dir is not None:
+        write_csv(
+            results_dir / "open_loop.csv",
+            ["Target RPS", "Scheduled", "Dropped", "Late", "Max Start Delay (ms)"],
+            [
+                [
+                    target_rps,
+                    arrival_counts.scheduled,
+                    arrival_counts.dropped,
+                    arrival_counts.late,
+                    round(arrival_counts.max_delay * 1000, 3),
+                ]
+            ],
+        )
+
+
+def write_replay_report(environment: Environment, **_kwargs):
+    if isinstance(environment.runner, WorkerRunner) or not getattr(environment.parsed_options, "replay_file", None):
+        return
+    if not isinstance(environment.runner, MasterRunner):
+        replay_lag_recorder.merge_intervals()
+    lag = replay_lag_recorder.aggregated()
+    summary = (
+        f"Replay: {replay_counts.replayed} requests replayed, {replay_counts.skipped} invalid records skipped, "
+        f"send lag p50 {lag.get_value_at_percentile(50) / 1000:.1f} ms, "
+        f"p99 {lag.get_value_at_percentile(99) / 1000:.1f} ms, "
+        f"max {lag.get_max_value() / 1000:.1f} ms"
+    )
+    print(summary)
+    logger.info(summary)
+    results_dir = get_results_dir(environment.parsed_options)
+    if results_dir is not None and replay_lag_recorder.totals:
+        paths = replay_lag_recorder.write(results_dir)
+        logger.info(f"Replay lag histograms saved to {', '.join(str(path) for path in paths)}")
+
+
+def write_health_report(environment: Environment, **_kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    if not isinstance(environment.runner, MasterRunner):
+        health_report.add(0, health_monitor.take_samples())
+    if not health_report.samples:
+        return
+    warnings = health_report.warnings()
+    for warning in warnings:
+        print(f"WARNING: {warning}")
+        logger.warning(warning)
+    summary = "Load generator health: " + ("COMPROMISED, discard this run" if warnings else "OK")
+    print(summary)
+    logger.info(summary)
+    results_dir = get_results_dir(environment.parsed_options)
+    if results_dir is not None:
+        paths = health_report.write(results_dir)
+        logger.info(f"Load generator health saved to {', '.join(str(path) for path in paths)}")
+
+
+def write_cache_report(environment: Environment, **_kwargs):
+    if isinstance(environment.runner, WorkerRunner) or environment.runner is None or cache_mode.mode != "paired":
+        return
+    ratios = cache_ratios(environment.runner.stats)
+    if not ratios:
+        return
+    print("\nCold/warm response time ratio:")
+    for ratio in ratios:
+        print(
+            f"  {ratio.name}: p50 {ratio.cold_p50:.0f}/{ratio.warm_p50:.0f} ms = {ratio.ratio_p50:.2f}x, "
+            f"p95 {ratio.cold_p95:.0f}/{ratio.warm_p95:.0f} ms = {ratio.ratio_p95:.2f}x"
+        )
+    results_dir = get_results_dir(environment.parsed_options)
+    if results_dir is not None:
+        path = write_cache_ratios(ratios, results_dir)
+        logger.info(f"Cold/warm response time ratios saved to {path}")
+
+
+def stop_log_listener(**_kwargs):
+    log_listener.stop()
+
+
 def on_acknowledge(msg: Message, **kwargs):
     # Fired when the master receives a message of type 'acknowledge_data'
     print(msg.data["data"])
@@ -124,7 +735,7 @@ def get_block_worker(master_runner: MasterRunner):
 
     while master_runner.state not in [STATE_CLEANUP]:
         blocks: dict[str, t.Any] = {}
-        invalid_blocks: list[int] = []
+        invalid_blocks: set[int] = set()
         for user in active_users:
             if hasattr(user, "test_data"):
                 test_data_class_name: str = type(user.test_data).__name__
@@ -141,7 +752,7 @@ def get_block_worker(master_runner: MasterRunner):
                     try:
                         block = user.test_data.fetch_block(latest_block_number)
                     except (InvalidBlockError, BlockNotFoundError):
-                        invalid_blocks.append(latest_block_number)
+                        invalid_blocks.add(latest_block_number)
                         continue
                     user.test_data.data.push_block(block)
                     blocks[test_data_class_name] = block.to_json()
@@ -157,7 +768,7 @@ def on_receive_block(environment: Environment, msg: Message, **kwargs):
 
     if isinstance(environment.runner, WorkerRunner):
         for user in environment.runner.user_classes:
-            if hasattr(user, "test_data"):
+            if hasattr(user, "test_data") and getattr(user, "requires_test_data", True):
                 test_data_class_name = type(user.test_data).__name__
                 block: Block = user.test_data.get_block_from_data(blocks[test_data_class_name])
                 if block.block_number not in user.test_data.data.block_numbers:
@@ -174,17 +785,57 @@ def on_init(environment: Environment, **_kwargs):
 
     host_under_test: str = environment.host or "Default host"
 
+    # workers derive their streams from their index, the master and local runs use index 0
+    configure_rng(
+        getattr(environment.parsed_options, "seed", DEFAULT_SEED),
+        environment.runner.worker_index if isinstance(environment.runner, WorkerRunner) else 0,
+    )
+
+    cache_mode.configure(
+        getattr(environment.parsed_options, "cache_mode", "random"),
+        getattr(environment.parsed_options, "hot_set_size", DEFAULT_HOT_SET_SIZE),
+        getattr(environment.parsed_options, "seed", DEFAULT_SEED),
+    )
+
+    depth_buckets_option: str = getattr(environment.parsed_options, "depth_buckets", "")
+    depth_buckets.configure(parse_depth_buckets(depth_buckets_option) if depth_buckets_option else ())
+
+    request_log_sampler.configure(
+        getattr(environment.parsed_options, "request_log_sample_rate", str(DEFAULT_SAMPLE_RATE))
+    )
+
+    record_dir: str | None = getattr(environment.parsed_options, "record_dir", None)
+    if record_dir and not isinstance(environment.runner, MasterRunner):
+        request_recorder.configure(
+            Path(record_dir), environment.runner.worker_index if isinstance(environment.runner, WorkerRunner) else 0
+        )
+
+    if isinstance(environment.runner, WorkerRunner):
+        health_monitor.worker_index = environment.runner.worker_index
+    if not isinstance(environment.runner, WorkerRunner) and environment.parsed_options:
+        health_report.max_cpu = getattr(environment.parsed_options, "max_worker_cpu", DEFAULT_MAX_CPU)
+        health_report.max_loop_lag = getattr(environment.parsed_options, "max_loop_lag", DEFAULT_MAX_LOOP_LAG)
+        warmup_window.configure(getattr(environment.parsed_options, "warmup", 0))
+
     if isinstance(environment.runner, WorkerRunner):
         # Print worker details to the log
         logger.info("I'm a worker. Running tests for %s", host_under_test)
+        log_listener.start()
         environment.runner.register_message("test_data", setup_test_data)
         environment.runner.register_message("block_data", on_receive_block)
+        environment.runner.register_message("shared_test_data", on_shared_test_data)
         environment.runner.register_message("release_lock", on_release)
+        environment.runner.register_message("arrival_rate", on_arrival_rate)
+        environment.runner.register_message("replay", on_replay)
+        environment.runner.register_message("warmup_end", on_warmup_end)
+        environment.runner.register_message("cache_partition", on_cache_partition)
 
     if isinstance(environment.runner, MasterRunner):
         # Print master details to the log
         logger.info("I'm a master. Running tests for %s", host_under_test)
         environment.runner.register_message("acknowledge_data", on_acknowledge)
+        environment.runner.register_message("replay_done", on_replay_done)
+        environment.runner.register_message("warmup_flushed", on_warmup_flushed)
 
         print("Waiting for workers to be ready...")
         start_time = time.time()
@@ -195,11 +846,20 @@ def on_init(environment: Environment, **_kwargs):
                 environment.runner.quit()
                 raise exit(1)
             time.sleep(1)
+        if environment.parsed_options and environment.parsed_options.target_rps > 0:
+            send_arrival_rate(environment.runner, environment.parsed_options)
+        if getattr(environment.parsed_options, "replay_file", None):
+            send_replay(environment.runner)
+        if cache_mode.enabled:
+            send_cache_partition(environment.runner)
+        shared = shared_test_data_enabled(environment.parsed_options)
         try:
             test_data: dict[str, t.Any] = {}
             for user in environment.runner.user_classes:
                 if not hasattr(user, "test_data"):
                     logger.warning(f"{user} class does not have 'test_data' attribute")
+                elif not getattr(user, "requires_test_data", True):
+                    logger.info(f"{user.__name__} does not use test data")
                 else:
                     user_test_data: TestData = getattr(user, "test_data")
                     test_data_class_name: str = type(user_test_data).__name__
@@ -207,14 +867,24 @@ def on_init(environment: Environment, **_kwargs):
                         continue
                     logger.info(f"Initializing test data for {test_data_class_name}")
                     print(f"Initializing test data for {test_data_class_name}")
-                    if environment.parsed_options:
+                    if environment.parsed_options and environment.parsed_options.test_data_file:
+                        snapshot = load_snapshot(user_test_data, Path(environment.parsed_options.test_data_file))
+                        if snapshot.chain_id is not None:
+                            test_data["chain_id"] = {test_data_class_name: snapshot.chain_id}
+                        print(f"Test data loaded from snapshot: {user_test_data.data.stats()}")
+                        logger.info(f"Test data loaded from snapshot: {user_test_data.data.stats()}")
+                        test_data[test_data_class_name] = user_test_data.data.to_json(include_blocks=not shared)
+                        send_msg_to_workers(environment.runner, "test_data", test_data)
+                    elif environment.parsed_options:
                         ref_node_url = (
                             environment.parsed_options.ref_url
                             if environment.parsed_options.ref_url is not None
                             else environment.host
                         )
                         if ref_node_url is not None:
-                            user_test_data.init_http_client(ref_node_url)
+                            user_test_data.init_http_client(
+                                ref_node_url, concurrency=environment.parsed_options.bootstrap_concurrency
+                            )
                         if isinstance(user_test_data, EvmTestData):
                             chain_id: ChainId = user_test_data.fetch_chain_id()
                             user_test_data.init_network(chain_id)
@@ -222,45 +892,45 @@ def on_init(environment: Environment, **_kwargs):
                             print(f"Target endpoint network is {user_test_data.network.name}")
                             test_data["chain_id"] = {test_data_class_name: chain_id}
                         user_test_data.init_data(environment.parsed_options)
-                        test_data[test_data_class_name] = user_test_data.data.to_json()
+                        test_data_cache = get_test_data_cache(user_test_data, environment.parsed_options)
+                        cached_data: str | None = None
+                        if test_data_cache is not None:
+                            cache, cache_key = test_data_cache
+                            cached_data = cache.load(cache_key)
+                        if cached_data is not None:
+                            user_test_data.init_data_from_json(cached_data)
+                            print(f"Test data loaded from cache: {user_test_data.data.stats()}")
+                            logger.info(f"Test data loaded from cache: {user_test_data.data.stats()}")
+                        test_data[test_data_class_name] = user_test_data.data.to_json(include_blocks=not shared)
                         send_msg_to_workers(environment.runner, "test_data", test_data)
-                        print("Fetching blocks...")
-                        if environment.parsed_options.use_latest_blocks:
-                            print(f"Using latest {user_test_data.data.size.blocks_len} blocks as test data")
-                            logger.info(f"Using latest {user_test_data.data.size.blocks_len} blocks as test data")
-                            for block_number in range(
-                                user_test_data.data.block_range.start, user_test_data.data.block_range.end + 1
-                            ):
-                                block = None
-                                try:
-                                    block = user_test_data.fetch_block(block_number)
-                                except (BlockNotFoundError, InvalidBlockError):
-                                    pass
-                                while block is None:
-                                    try:
-                                        block = user_test_data.fetch_latest_block()
-                                    except (BlockNotFoundError, InvalidBlockError):
-                                        pass
-                                user_test_data.data.push_block(block)
-                                block_data = {test_data_class_name: block.to_json()}
-                                send_msg_to_workers(environment.runner, "block_data", block_data)
-                                print(user_test_data.data.stats(), end="\r")
+                        if cached_data is None:
+                            print("Fetching blocks...")
+                            bootstrap = TestDataBootstrap(
+                                user_test_data,
+                                concurrency=environment.parsed_options.bootstrap_concurrency,
+                                rate_limit=environment.parsed_options.bootstrap_rate_limit,
+                                on_block=(
+                                    None
+                                    if shared
+                                    else partial(send_block_to_workers, environment.runner, test_data_class_name)
+                                ),
+                                batch_size=environment.parsed_options.bootstrap_batch_size,
+                            )
+                            if environment.parsed_options.use_latest_blocks:
+                                print(f"Using latest {user_test_data.data.size.blocks_len} blocks as test data")
+                                logger.info(f"Using latest {user_test_data.data.size.blocks_len} blocks as test data")
+                                bootstrap.fetch_latest_blocks()
                             else:
-                                print(user_test_data.data.stats(), end="\r")
-                                print("\n")  # new line after progress display upon exiting loop
-                        else:
-                            while user_test_data.data.size.blocks_len > len(user_test_data.data.blocks):
-                                try:
-                                    block = user_test_data.fetch_random_block(user_test_data.data.block_numbers)
-                                except (BlockNotFoundError, InvalidBlockError):
-                                    continue
-                                user_test_data.data.push_block(block)
-                                block_data = {test_data_class_name: block.to_json()}
-                                send_msg_to_workers(environment.runner, "block_data", block_data)
-                                print(user_test_data.data.stats(), end="\r")
-                            else:
-                                print(user_test_data.data.stats(), end="\r")
-                                print("\n")  # new line after progress display upon exiting loop
+                                bootstrap.fetch_random_blocks()
+                            if test_data_cache is not None:
+                                cache, cache_key = test_data_cache
+                                cache_path = cache.store(cache_key, user_test_data.data.to_json())
+                                print(f"Test data saved to cache: {cache_path}")
+                                logger.info(f"Test data saved to cache: {cache_path}")
+                    if shared:
+                        shared_path = share_test_data(environment.runner, user_test_data)
+                        print(f"Test data shared with workers through {shared_path}")
+                        logger.info(f"Test data shared with workers through {shared_path}")
                     logger.info("Test data is ready")
                     send_msg_to_workers(environment.runner, "release_lock", {})
                     user_test_data.release_lock()
@@ -277,6 +947,19 @@ def on_init(environment: Environment, **_kwargs):
             if getattr(environment.parsed_options, "use_latest_blocks", False):
                 gevent.spawn(get_block_worker, environment.runner)
 
+    if not isinstance(environment.runner, (MasterRunner, WorkerRunner)) and environment.parsed_options:
+        # local runs schedule the whole target rate themselves
+        if getattr(environment.parsed_options, "target_rps", 0) > 0:
+            arrival_scheduler.configure(
+                environment.parsed_options.target_rps,
+                environment.parsed_options.arrival_distribution,
+                environment.parsed_options.max_in_flight,
+            )
+        if getattr(environment.parsed_options, "replay_file", None):
+            replay_source.configure(
+                Path(environment.parsed_options.replay_file), environment.parsed_options.replay_speed
+            )
+
 
 def on_test_start(environment: Environment, **_kwargs):
     # Print master details to the log
@@ -292,10 +975,28 @@ def on_test_start(environment: Environment, **_kwargs):
         )
         Timer.set_timer(environment.runner.worker_index)
 
+    hdr_recorder.reset()
+    replay_lag_recorder.reset()
+    error_log_limiter.reset()
+    arrival_scheduler.start(rng_manager.get_rng("arrival").random)
+    replay_source.start(partial(finish_replay, environment))
+    request_recorder.start()
+    if not isinstance(environment.runner, MasterRunner):
+        health_monitor.start()
+    if not isinstance(environment.runner, WorkerRunner):
+        warmup_window.start(partial(end_warmup, environment))
+
 
 # Listener for the test stop event
 def on_test_stop(environment: Environment, **_kwargs):
     # It will be called for any runner (master, worker, local)
+    arrival_scheduler.stop()
+    replay_source.stop()
+    request_recorder.stop()
+    health_monitor.stop()
+    warmup_window.stop()
+    if error_log_limiter.counts:
+        logger.warning("Errors during the test: %s", error_log_limiter.summary())
     if isinstance(environment.runner, WorkerRunner):
         # Print worker details to the log
         logger.info(
@@ -312,3 +1013,15 @@ def setup_event_listeners():
     events.test_start.add_listener(on_test_start)
     events.test_stop.add_listener(on_test_stop)
     events.init.add_listener(on_init)
+    events.quitting.add_listener(remove_shared_test_data)
+    events.quitting.add_listener(write_arrival_report)
+    events.quitting.add_listener(write_latency_histograms)
+    events.quitting.add_listener(write_replay_report)
+    events.quitting.add_listener(write_health_report)
+    events.quitting.add_listener(write_cache_report)
+    events.quitting.add_listener(stop_log_listener)
+    events.request.add_listener(on_request)
+    events.reset_stats.add_listener(hdr_recorder.reset)
+    events.reset_stats.add_listener(replay_lag_recorder.reset)
+    events.report_to_master.add_listener(on_report_to_master)
+    events.worker_report.add_listener(on_worker_report)
@@ -0,0 +1,136 @@
+import time
+import typing as t
+from datetime import datetime
+from pathlib import Path
+
+from hdrh.histogram import HdrHistogram
+
+from chainbench.util.report import write_csv
+
+# response times are recorded in microseconds, from 1 microsecond up to an hour, with 3 significant digits
+LOWEST_DISCERNIBLE_VALUE = 1
+HIGHEST_TRACKABLE_VALUE = 3_600_000_000
+SIGNIFICANT_FIGURES = 3
+PERCENTILES = [50, 75, 90, 95, 99, 99.9, 99.99, 99.999]
+
+
+def _log_tag(name: str) -> str:
+    # tags of histogram logs can't hold commas, spaces or line breaks
+    return "".join("_" if c in ", \r\n" else c for c in name)
+
+
+def new_histogram() -> HdrHistogram:
+    return HdrHistogram(LOWEST_DISCERNIBLE_VALUE, HIGHEST_TRACKABLE_VALUE, SIGNIFICANT_FIGURES)
+
+
+class HdrRecorder:
+    """
+    Records response times of requests into a histogram per request type and name.
+
+    Workers record into interval histograms that are encoded and reset on every report to the master, which merges
+    them into the histograms of the whole test. Local runs record into the histograms of the whole test directly.
+    The name of the recorder prefixes the files it writes.
+    """
+
+    def __init__(self, name: str = "latency") -> None:
+        self.name = name
+        self.intervals: dict[tuple[str, str], HdrHistogram] = {}
+        self.totals: dict[tuple[str, str], HdrHistogram] = {}
+        self.start_time = time.time()
+
+    def record(self, request_type: str, name: str, response_time: float) -> None:
+        key = (request_type, name)
+        histogram = self.intervals.get(key)
+        if histogram is None:
+            histogram = self.intervals[key] = new_histogram()
+        # values out of the trackable range are clamped to it
+        histogram.record_value(min(max(int(response_time * 1000), 0), HIGHEST_TRACKABLE_VALUE))
+
+    def take_encoded(self) -> list[tuple[str, str, bytes]]:
+        """Encode the interval histograms holding values with the compressed V2 encoding and reset them."""
+        encoded = []
+        for (request_type, name), histogram in self.intervals.items():
+            if histogram.get_total_count():
+                encoded.append((request_type, name, histogram.encode()))
+                histogram.reset()
+        return encoded
+
+    def merge_encoded(self, encoded: t.Iterable[t.Sequence[t.Any]]) -> None:
+        for request_type, name, data in encoded:
+            self.merge((request_type, name), HdrHistogram.decode(data))
+
+    def merge(self, key: tuple[str, str], histogram: HdrHistogram) -> None:
+        total = self.totals.get(key)
+        if total is None:
+            self.totals[key] = histogram
+        else:
+            total.add(histogram)
+
+    def merge_intervals(self) -> None:
+        """Merge the interval histograms into the totals, as local runs do not report to a master."""
+        for key, histogram in self.intervals.items():
+            if histogram.get_total_count():
+                self.merge(key, histogram)
+        self.intervals = {}
+
+    def reset(self) -> None:
+        self.intervals = {}
+        self.totals = {}
+        self.start_time = time.time()
+
+    def aggregated(self) -> HdrHistogram:
+        aggregated = new_histogram()
+        for histogram in self.totals.values():
+            aggregated.add(histogram)
+        return aggregated
+
+    def write(self, results_dir: Path, prefix: str | None = None) -> list[Path]:
+        """
+        Write the histograms of the test as an HdrHistogram log and their percentiles as CSV, prefixed with the name
+        of the recorder unless another prefix is given.
+        """
+        prefix = prefix or self.name
+        end_time = time.time()
+        aggregated = self.aggregated()
+        histogram_log = results_dir / f"{prefix}.hdr"
+        with histogram_log.open("w") as f:
+            f.write("#[Histogram log format version 1.3]\n")
+            f.write(
+                f"#[StartTime: {self.start_time:.3f} (seconds since epoch), "
+                f"{datetime.fromtimestamp(self.start_time).isoformat()}]\n"
+            )
+            f.write('"StartTimestamp","Interval_Length","Interval_Max","Interval_Compressed_Histogram"\n')
+            # the aggregated histogram is untagged, histograms of requests are tagged with their name
+            for tag, histogram in [("", aggregated)] + [(name, h) for (_, name), h in sorted(self.totals.items())]:
+                f.write(
+                    (f"Tag={_log_tag(tag)}," if tag else "")
+                    + f"0.000,{end_time - self.start_time:.3f},{histogram.get_max_value() / 1000:.3f},"
+                    + histogram.encode().decode()
+                    + "\n"
+                )
+
+        rows = []
+        for (request_type, name), histogram in sorted(self.totals.items()) + [(("", "Aggregated"), aggregated)]:
+            values = histogram.get_percentile_to_value_dict(PERCENTILES)
+            rows.append(
+                [
+                    request_type,
+                    name,
+                    histogram.get_total_count(),
+                    histogram.get_min_value() / 1000,
+                    round(histogram.get_mean_value() / 1000, 3),
+                ]
+                + [values[percentile] / 1000 for percentile in PERCENTILES]
+                + [histogram.get_max_value() / 1000]
+            )
+        percentiles_csv = write_csv(
+            results_dir / f"{prefix}_percentiles.csv",
+            ["Type", "Name", "Request Count", "Min (ms)", "Average (ms)"]
+            + [f"p{percentile:g} (ms)" for percentile in PERCENTILES]
+            + ["Max (ms)"],
+            rows,
+        )
+        return [histogram_log, percentiles_csv]
+
+
+hdr_recorder = HdrRecorder()
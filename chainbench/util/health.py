@@ -0,0 +1,201 @@
+import time
+import typing as t
+from pathlib import Path
+
+import gevent
+import psutil
+
+from chainbench.util.report import write_csv
+
+HEALTH_SAMPLE_INTERVAL = 1.0
+# the event loop is probed with short sleeps, the lag is how much later than intended a probe wakes up
+LOOP_LAG_PROBE_INTERVAL = 0.05
+DEFAULT_MAX_CPU = 90.0
+DEFAULT_MAX_LOOP_LAG = 50.0
+# a worker is flagged when more than this share of its samples exceed a threshold, so single spikes are tolerated
+COMPROMISED_SHARE = 0.05
+# and at least this many of them, as a single spike is more than the share of samples of a short test
+MIN_EXCEEDED_SAMPLES = 3
+
+
+class HealthSample(t.NamedTuple):
+    timestamp: float
+    cpu_percent: float
+    rss_bytes: int
+    loop_lag_ms: float
+
+
+class HealthMonitor:
+    """
+    Samples the CPU usage and resident memory of the process and the lag of the gevent event loop. The loop lag of
+    a sample is the largest delay of a probe sleeping LOOP_LAG_PROBE_INTERVAL seconds since the previous sample,
+    which is how long greenlets waited for CPU-bound work of other greenlets. Both are measured during the test,
+    since a saturated load generator delays sending requests and reading responses and inflates response times.
+    """
+
+    def __init__(self, interval: float = HEALTH_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.worker_index = 0
+        self.process = psutil.Process()
+        self._samples: list[HealthSample] = []
+        self._max_lag = 0.0
+        self._greenlets: list[gevent.Greenlet] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._greenlets)
+
+    def start(self) -> None:
+        if not self.running:
+            self._samples = []
+            self._max_lag = 0.0
+            # the first call of cpu_percent starts the measurement
+            self.process.cpu_percent(None)
+            self._greenlets = [gevent.spawn(self._probe_loop), gevent.spawn(self._sample_loop)]
+
+    def stop(self) -> None:
+        if self.running:
+            # no sample is taken for the last partial interval, which holds the work of stopping users
+            gevent.killall(self._greenlets, block=False)
+            self._greenlets = []
+
+    def _probe_loop(self) -> None:
+        while True:
+            start = time.perf_counter()
+            gevent.sleep(LOOP_LAG_PROBE_INTERVAL)
+            lag = time.perf_counter() - start - LOOP_LAG_PROBE_INTERVAL
+            self._max_lag = max(self._max_lag, lag)
+
+    def _sample_loop(self) -> None:
+        while True:
+            gevent.sleep(self.interval)
+            self.sample()
+
+    def sample(self) -> None:
+        self._samples.append(
+            HealthSample(
+                time.time(),
+                self.process.cpu_percent(None),
+                self.process.memory_info().rss,
+                round(self._max_lag * 1000, 3),
+            )
+        )
+        self._max_lag = 0.0
+
+    def take_samples(self) -> list[HealthSample]:
+        """Return the samples since the previous call and clear them."""
+        samples, self._samples = self._samples, []
+        return samples
+
+
+class WorkerHealth(t.NamedTuple):
+    worker: int
+    samples: int
+    max_cpu_percent: float
+    mean_cpu_percent: float
+    max_rss_bytes: int
+    max_loop_lag_ms: float
+    p99_loop_lag_ms: float
+    cpu_exceeded: int
+    loop_lag_exceeded: int
+    compromised: bool
+
+
+class HealthReport:
+    """Collects the health samples of all workers on the master and writes them with a summary per worker."""
+
+    def __init__(self, max_cpu: float = DEFAULT_MAX_CPU, max_loop_lag: float = DEFAULT_MAX_LOOP_LAG):
+        self.max_cpu = max_cpu
+        self.max_loop_lag = max_loop_lag
+        self.samples: dict[int, list[HealthSample]] = {}
+
+    def add(self, worker: int, samples: t.Iterable[t.Sequence[t.Any]]) -> None:
+        self.samples.setdefault(worker, []).extend(HealthSample(*sample) for sample in samples)
+
+    def summary(self) -> list[WorkerHealth]:
+        result = []
+        for worker, samples in sorted(self.samples.items()):
+            if not samples:
+                continue
+            lags = sorted(sample.loop_lag_ms for sample in samples)
+            cpu_exceeded = sum(sample.cpu_percent > self.max_cpu for sample in samples)
+            loop_lag_exceeded = sum(sample.loop_lag_ms > self.max_loop_lag for sample in samples)
+            exceeded = max(cpu_exceeded, loop_lag_exceeded)
+            result.append(
+                WorkerHealth(
+                    worker=worker,
+                    samples=len(samples),
+                    max_cpu_percent=max(sample.cpu_percent for sample in samples),
+                    mean_cpu_percent=round(sum(sample.cpu_percent for sample in samples) / len(samples), 1),
+                    max_rss_bytes=max(sample.rss_bytes for sample in samples),
+                    max_loop_lag_ms=lags[-1],
+                    p99_loop_lag_ms=lags[min(len(lags) - 1, int(len(lags) * 0.99))],
+                    cpu_exceeded=cpu_exceeded,
+                    loop_lag_exceeded=loop_lag_exceeded,
+                    compromised=exceeded >= MIN_EXCEEDED_SAMPLES and exceeded > len(samples) * COMPROMISED_SHARE,
+                )
+            )
+        return result
+
+    def warnings(self) -> list[str]:
+        return [
+            f"Worker {health.worker} was saturated: CPU above {self.max_cpu:g}% in {health.cpu_exceeded} and "
+            f"event loop lag above {self.max_loop_lag:g} ms in {health.loop_lag_exceeded} of {health.samples} "
+            f"samples (max CPU {health.max_cpu_percent:.0f}%, max lag {health.max_loop_lag_ms:.1f} ms). "
+            f"Response times are inflated by the load generator, use more workers or fewer users."
+            for health in self.summary()
+            if health.compromised
+        ]
+
+    def write(self, results_dir: Path) -> list[Path]:
+        samples_path = write_csv(
+            results_dir / "generator_health.csv",
+            ["Timestamp", "Worker", "CPU (%)", "RSS (MB)", "Loop Lag (ms)", "Exceeded"],
+            [
+                [
+                    round(sample.timestamp, 3),
+                    worker,
+                    sample.cpu_percent,
+                    round(sample.rss_bytes / 2**20, 1),
+                    sample.loop_lag_ms,
+                    sample.cpu_percent > self.max_cpu or sample.loop_lag_ms > self.max_loop_lag,
+                ]
+                for worker, samples in sorted(self.samples.items())
+                for sample in samples
+            ],
+        )
+        summary_path = write_csv(
+            results_dir / "generator_health_summary.csv",
+            [
+                "Worker",
+                "Samples",
+                "Max CPU (%)",
+                "Mean CPU (%)",
+                "Max RSS (MB)",
+                "Max Loop Lag (ms)",
+                "p99 Loop Lag (ms)",
+                "CPU Exceeded",
+                "Loop Lag Exceeded",
+                "Compromised",
+            ],
+            [
+                [
+                    health.worker,
+                    health.samples,
+                    health.max_cpu_percent,
+                    health.mean_cpu_percent,
+                    round(health.max_rss_bytes / 2**20, 1),
+                    health.max_loop_lag_ms,
+                    health.p99_loop_lag_ms,
+                    health.cpu_exceeded,
+                    health.loop_lag_exceeded,
+                    health.compromised,
+                ]
+                for health in self.summary()
+            ],
+        )
+        return [samples_path, summary_path]
+
+
+health_monitor = HealthMonitor()
+health_report = HealthReport()
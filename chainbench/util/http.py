@@ -32,6 +32,15 @@ class JsonRpcError(Exception):
         super().__init__(f"JSON RPC Error: {code} - {message}")
 
 
+class BatchNotSupportedError(Exception):
+    # Raised when the endpoint does not accept JSON-RPC batch requests
+    pass
+
+
+# status codes of endpoints rejecting a batch request, while auth errors and rate limits are raised as they are
+BATCH_NOT_SUPPORTED_CODES = frozenset({400, 404, 405, 413, 415, 422})
+
+
 class Response(HTTPSocketPoolResponse):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -78,6 +87,7 @@ class HttpClient:
         rpc_version: str = "2.0",
         timeout: int = 360,
         error_level: HttpErrorLevel = HttpErrorLevel.ClientError,
+        concurrency: int = 1,
     ):
         self._rpc_version = rpc_version
         self._host = URL(host)
@@ -88,7 +98,9 @@ class HttpClient:
             password = username_password[1]
             self._general_headers["Authorization"] = f"{basic_auth(username, password)}"
 
-        self._client = HTTPClient.from_url(self._host, connection_timeout=120, network_timeout=timeout)
+        self._client = HTTPClient.from_url(
+            self._host, connection_timeout=120, network_timeout=timeout, concurrency=concurrency
+        )
         self.error_level = error_level
 
     @property
@@ -185,3 +197,36 @@ class HttpClient:
             raise ValueError(response.json)
 
         return response.json["result"]
+
+    def make_batch_rpc_call(self, calls: list[tuple[str, list[t.Any]]], path: str = "") -> list[t.Any]:
+        """
+        Make a JSON-RPC batch call. Results are returned in the order of the calls, with a JsonRpcError in place
+        of every item that failed or is missing from the response.
+        """
+        body = [
+            {"jsonrpc": self._rpc_version, "method": method, "params": params, "id": index}
+            for index, (method, params) in enumerate(calls)
+        ]
+        try:
+            response = self.post(path=path, data=json.dumps(body))
+        except HttpStatusError as e:
+            if e.code in BATCH_NOT_SUPPORTED_CODES:
+                raise BatchNotSupportedError(e.message) from e
+            raise
+
+        logger.debug(f"Making batch call to {self._host} with {len(calls)} requests")
+
+        response_json: t.Any = json.loads(response.content)
+        if not isinstance(response_json, list):
+            raise BatchNotSupportedError(f"Batch response is not a list: {response.content[:200]}")
+
+        results: list[t.Any] = [JsonRpcError(code=-32603, message="Missing response in batch") for _ in calls]
+        for item in response_json:
+            index = item.get("id")
+            if not isinstance(index, int) or not 0 <= index < len(calls):
+                continue
+            if "error" in item:
+                results[index] = JsonRpcError(code=item["error"]["code"], message=item["error"]["message"])
+            elif "result" in item:
+                results[index] = item["result"]
+        return results
@@ -1,29 +1,60 @@
-import random
+import itertools
+import re
 import typing as t
+from functools import lru_cache
 
 import orjson as json
 
+# request ids are unique within a worker
+_request_ids = itertools.count(1)
+
+ENVELOPE_SCAN_SIZE = 1024
+# start of a single response up to its result or error member, members before it can only be jsonrpc and id
+_ENVELOPE_PREFIX = re.compile(rb'\s*\{\s*(?:"(?:jsonrpc|id)"\s*:\s*(?:"[^"]*"|-?\d+|null)\s*,\s*)*"(result|error)"\s*:')
+
+
+def _encode_body_prefix(method: str, params: list[t.Any] | dict[str, t.Any]) -> bytes:
+    # the body is encoded without its id, which is spliced in by RpcCall.encoded_body
+    return json.dumps({"jsonrpc": "2.0", "method": method, "params": params})[:-1] + b',"id":'
+
+
+@lru_cache(maxsize=None)
+def _encode_static_body_prefix(method: str) -> bytes:
+    return _encode_body_prefix(method, [])
+
 
 class RpcCall:
     def __init__(self, method: str, params: list[t.Any] | dict | None = None, request_id: int | None = None) -> None:
         self._request_id = request_id
+        # an id given to the call is sent with its encoded body, other calls get a new id for every request
+        self._fixed_request_id = request_id
         self.method = method
-        self.params = params
+        if params is None:
+            params = []
+        elif type(params) is dict:
+            params = [params]
+        # by-name params are only kept as a dict by RpcCall.raw, calls made by profiles always have a list
+        self.params: list[t.Any] | dict[str, t.Any] = params
+        self.body_prefix: bytes | None = None
+        # name of the call in stats, the method unless the call is set apart, e.g. by its cache state
+        self.name: str | None = None
+
+    @classmethod
+    def raw(cls, method: str, params: list[t.Any] | dict[str, t.Any] | None = None) -> "RpcCall":
+        """Create a call sending its params as they are, while the constructor wraps by-name params into a list."""
+        rpc_call = cls(method)
+        if params is not None:
+            rpc_call.params = params
+        return rpc_call
 
     @property
     def request_id(self) -> int:
         if self._request_id is None:
-            self._request_id = random.Random().randint(1, 100000000)
+            self._request_id = next(_request_ids)
         return self._request_id
 
     def request_body(self, request_id: int | None = None) -> dict:
         """Generate a JSON-RPC request body."""
-        if self.params is None:
-            self.params = []
-
-        if type(self.params) is dict:
-            self.params = [self.params]
-
         if request_id:
             self._request_id = request_id
 
@@ -34,19 +65,67 @@ class RpcCall:
             "id": self.request_id,
         }
 
-
-def generate_batch_request_body(rpc_calls: list[RpcCall]) -> str:
+    def encode_body_prefix(self) -> bytes:
+        """Encode the request body up to the request id, so it can be reused by many requests."""
+        if self.body_prefix is None:
+            # bodies of calls without params only depend on the method and are encoded once per worker
+            self.body_prefix = (
+                _encode_body_prefix(self.method, self.params)
+                if self.params
+                else _encode_static_body_prefix(self.method)
+            )
+        return self.body_prefix
+
+    def encoded_body(self) -> bytes:
+        """Return the encoded request body with the request id given to the call, or a new one."""
+        request_id = self._fixed_request_id if self._fixed_request_id is not None else next(_request_ids)
+        return self.encode_body_prefix() + str(request_id).encode() + b"}"
+
+
+class RpcCallPool:
+    """
+    Pool of RpcCalls generated up front by calling an RPC call method of a user size times.
+
+    The request body of every call is encoded when the pool is generated, so sending a call drawn from the pool
+    only patches a new request id into the encoded body. Calls are drawn in round robin order.
+    """
+
+    def __init__(self, rpc_calls: list[RpcCall]):
+        self.rpc_calls = rpc_calls
+        for rpc_call in rpc_calls:
+            rpc_call.encode_body_prefix()
+        self._cursor = itertools.cycle(rpc_calls)
+
+    @classmethod
+    def generate(cls, rpc_call_method: t.Callable[[], RpcCall], size: int) -> "RpcCallPool":
+        return cls([rpc_call_method() for _ in range(size)])
+
+    def __len__(self) -> int:
+        return len(self.rpc_calls)
+
+    def next(self) -> RpcCall:
+        return next(self._cursor)
+
+
+def scan_response_envelope(content: bytes, scan_size: int = ENVELOPE_SCAN_SIZE) -> str | None:
+    """
+    Tell whether a single JSON-RPC response holds a result or an error from the first scan_size bytes of its body,
+    without decoding the rest of it. Returns None when the envelope can't be recognized from the scanned bytes,
+    such as for batch responses or members in an unusual order, and the body has to be parsed instead.
+    """
+    head = content[:scan_size]
+    match = _ENVELOPE_PREFIX.match(head)
+    if match is None:
+        return None
+    # jsonrpc either precedes the result or follows it at the end of the body
+    if b'"jsonrpc"' not in head[: match.start(1)] and b'"jsonrpc"' not in content[-scan_size:]:
+        return None
+    return match.group(1).decode()
+
+
+def generate_batch_request_body(rpc_calls: list[RpcCall]) -> bytes:
     """Generate a batch JSON-RPC request body."""
-    return json.dumps([rpc_calls[i].request_body(i) for i in range(1, len(rpc_calls))]).decode("utf-8")
-
-
-def expand_rpc_calls(rpc_calls_weighted: dict[t.Callable[[], RpcCall], int]) -> list[RpcCall]:
-    rpc_call_methods_weighted: dict[RpcCall, int] = {}
-    for rpc_call_method, weight in rpc_calls_weighted.items():
-        rpc_call_methods_weighted[rpc_call_method()] = weight
-
-    expanded_rpc_calls: list[RpcCall] = expand_to_list(rpc_call_methods_weighted)
-    return expanded_rpc_calls
+    return b"[" + b",".join(rpc_call.encoded_body() for rpc_call in rpc_calls) + b"]"
 
 
 def expand_to_list(items_weighted: dict[t.Any, int] | list[t.Any | tuple[t.Any, int]]) -> list[t.Any]:
@@ -0,0 +1,199 @@
+import logging
+import time
+import typing as t
+from collections import Counter
+from logging.handlers import QueueHandler
+
+from gevent import monkey
+
+DEFAULT_SAMPLE_RATE = 0.01
+# errors of the same kind are logged at most once per interval, occurrences in between are counted
+ERROR_LOG_INTERVAL = 10.0
+
+
+class RequestLogSampler:
+    """
+    Decides which requests are logged, so logging every request doesn't slow down the load generator.
+
+    Each method has a sampling rate between 0 and 1, and every 1/rate-th request of the method is logged.
+    Sampling is done with a counter per method rather than random draws, so it's cheap and leaves the random
+    streams of users untouched.
+    """
+
+    def __init__(self, default_rate: float = DEFAULT_SAMPLE_RATE, rates: dict[str, float] | None = None):
+        self.default_rate = default_rate
+        self.rates: dict[str, float] = rates or {}
+        self._intervals: dict[str, int] = {}
+        self._counts: Counter[str] = Counter()
+
+    def configure(self, value: str) -> None:
+        """Set the sampling rate, optionally followed by rates of single methods, e.g. 0.01,eth_call=0.1."""
+        default_rate = DEFAULT_SAMPLE_RATE
+        rates: dict[str, float] = {}
+        for item in value.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            method, _, rate = item.rpartition("=")
+            if not 0 <= float(rate) <= 1:
+                raise ValueError(f"Request log sample rate must be between 0 and 1, got {item}")
+            if method:
+                rates[method] = float(rate)
+            else:
+                default_rate = float(rate)
+        self.default_rate = default_rate
+        self.rates = rates
+        self._intervals = {}
+
+    def interval(self, method: str) -> int:
+        interval = self._intervals.get(method)
+        if interval is None:
+            rate = self.rates.get(method, self.default_rate)
+            interval = self._intervals[method] = round(1 / rate) if rate > 0 else 0
+        return interval
+
+    def sample(self, method: str) -> bool:
+        """Return whether the current request of the method is logged."""
+        interval = self.interval(method)
+        if interval == 0:
+            return False
+        self._counts[method] += 1
+        # the first request of every interval is logged
+        return (self._counts[method] - 1) % interval == 0
+
+
+class ErrorLogLimiter:
+    """
+    Logs errors of the same kind at most once per interval, so a storm of failing requests doesn't turn the load
+    generator into a log writer. Errors are grouped by a key, e.g. the request name and the kind of error, and
+    occurrences suppressed since the last logged one are added to the next message of the key. Counts of all
+    errors are kept for a summary at the end of the test.
+    """
+
+    def __init__(self, interval: float = ERROR_LOG_INTERVAL):
+        self.interval = interval
+        self.counts: Counter[str] = Counter()
+        self._suppressed: Counter[str] = Counter()
+        self._last_logged: dict[str, float] = {}
+
+    def log(self, logger: logging.Logger, level: int, key: str, msg: str, *args: t.Any) -> None:
+        self.counts[key] += 1
+        now = time.monotonic()
+        last_logged = self._last_logged.get(key)
+        if last_logged is not None and now - last_logged < self.interval:
+            self._suppressed[key] += 1
+            return
+        self._last_logged[key] = now
+        suppressed = self._suppressed.pop(key, 0)
+        if suppressed:
+            logger.log(level, msg + " [%d more since last logged]", *args, suppressed)
+        else:
+            logger.log(level, msg, *args)
+
+    def error(self, logger: logging.Logger, key: str, msg: str, *args: t.Any) -> None:
+        self.log(logger, logging.ERROR, key, msg, *args)
+
+    def summary(self) -> str:
+        return ", ".join(f"{key}: {count}" for key, count in self.counts.most_common())
+
+    def reset(self) -> None:
+        self.counts.clear()
+        self._suppressed.clear()
+        self._last_logged.clear()
+
+
+class _RecordQueueHandler(QueueHandler):
+    def __init__(self, queue: t.Any, logger_name: str | None):
+        super().__init__(queue)
+        self.logger_name = logger_name
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # records are formatted by the listener thread instead of the greenlet logging them
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait((self.logger_name, record))
+
+
+class ThreadedLogListener:
+    """
+    Handles log records with the handlers of some loggers in an OS thread, so greenlets only put records on a queue
+    instead of formatting them and waiting for writes to log files. The thread and its queue bypass gevent monkey
+    patching, as the thread has to run outside of the event loop of the greenlets.
+    """
+
+    def __init__(self, logger_names: t.Sequence[str | None]) -> None:
+        self.logger_names = logger_names
+        self.queue = monkey.get_original("queue", "SimpleQueue")()
+        self.handlers: dict[str | None, list[logging.Handler]] = {}
+        self._queue_handlers: dict[str | None, _RecordQueueHandler] = {}
+        self._done = monkey.get_original("_thread", "allocate_lock")()
+        self._started = False
+
+    def start(self) -> None:
+        if self._started:
+            return
+        for name in self.logger_names:
+            logger = logging.getLogger(name)
+            # file and console handlers are moved to the thread, in memory handlers read by locust are kept
+            handlers = self.handlers[name] = [
+                handler for handler in logger.handlers if isinstance(handler, logging.StreamHandler)
+            ]
+            for handler in handlers:
+                logger.removeHandler(handler)
+                # the thread can't use the gevent locks handlers are created with
+                handler.lock = monkey.get_original("_thread", "RLock")()
+            queue_handler = self._queue_handlers[name] = _RecordQueueHandler(self.queue, name)
+            logger.addHandler(queue_handler)
+        self._done.acquire()
+        monkey.get_original("_thread", "start_new_thread")(self._run, ())
+        self._started = True
+
+    def _run(self) -> None:
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                self._handle(item)
+        finally:
+            for handlers in self.handlers.values():
+                for handler in handlers:
+                    handler.flush()
+            self._done.release()
+
+    def _handle(self, item: tuple[str | None, logging.LogRecord]) -> None:
+        # records are handled by the handlers of the logger they were put on the queue by
+        logger_name, record = item
+        for handler in self.handlers[logger_name]:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Handle the records left on the queue and stop the thread."""
+        if not self._started:
+            return
+        self.queue.put(None)
+        if not self._done.acquire(timeout=timeout):
+            # the thread still writes to the handlers, so they are left to it until stop is called again
+            print(
+                f"Log records were still being written after {timeout:g} seconds, log handlers are left to the thread"
+            )
+            return
+        self._done.release()
+        # records put on the queue after the thread stopped, e.g. when stop timed out before
+        while not self.queue.empty():
+            item = self.queue.get_nowait()
+            if item is not None:
+                self._handle(item)
+        # records logged from now on are handled directly again
+        for name, handlers in self.handlers.items():
+            logger = logging.getLogger(name)
+            logger.removeHandler(self._queue_handlers[name])
+            for handler in handlers:
+                logger.addHandler(handler)
+        self._started = False
+
+
+request_log_sampler = RequestLogSampler()
+error_log_limiter = ErrorLogLimiter()
@@ -0,0 +1,311 @@
+import bz2
+import gzip
+import heapq
+import logging
+import lzma
+import math
+import time
+import typing as t
+import zlib
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import gevent
+import orjson as json
+from gevent.queue import JoinableQueue
+
+from chainbench.util.hdr import HdrRecorder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPEED = 1.0
+# records read ahead of their scheduled time are buffered up to this size, which bounds the memory used by the reader
+READ_AHEAD = 1000
+# records are written to recordings in chunks of this size
+RECORD_FLUSH_SIZE = 1000
+
+CAPTURE_OPENERS: dict[str, t.Callable[..., t.IO[str]]] = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+
+
+class CaptureError(Exception):
+    pass
+
+
+Lane = tuple[int, int]
+
+
+class ReplayRecord(t.NamedTuple):
+    offset: float
+    method: str
+    params: list[t.Any] | dict
+    # requests of the same lane, i.e. sent by the same worker and user of a recording, are replayed in order
+    lane: Lane | None = None
+
+
+class ReplayCounts(t.NamedTuple):
+    replayed: int = 0
+    skipped: int = 0
+
+    def merge(self, other: "ReplayCounts") -> "ReplayCounts":
+        return ReplayCounts(self.replayed + other.replayed, self.skipped + other.skipped)
+
+
+def open_capture(path: Path) -> t.IO[str]:
+    """Open a capture file as text, decompressing it on the fly if it has a .gz, .bz2 or .xz suffix."""
+    opener = CAPTURE_OPENERS.get(path.suffix, open)
+    return opener(path, "rt", encoding="utf-8")
+
+
+def parse_timestamp(value: t.Any) -> float:
+    """Parse a timestamp given as seconds since epoch or as an ISO 8601 string, return seconds since epoch."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            # fromisoformat of Python 3.10 does not accept the Z suffix
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    raise ValueError(f"Invalid timestamp {value!r}")
+
+
+def parse_record(line: str, start_time: float) -> ReplayRecord:
+    entry = json.loads(line)
+    method = entry["method"]
+    if not isinstance(method, str):
+        raise ValueError(f"Invalid method {method!r}")
+    params = entry.get("params", [])
+    if params is None:
+        params = []
+    lane = (int(entry["worker"]), int(entry["user"])) if "worker" in entry and "user" in entry else None
+    return ReplayRecord(parse_timestamp(entry["timestamp"]) - start_time, method, params, lane)
+
+
+def lane_shard(lane: Lane, shards: int) -> int:
+    return zlib.crc32(f"{lane[0]}:{lane[1]}".encode()) % shards
+
+
+def capture_files(path: Path) -> list[Path]:
+    """Return the capture file at the path, or the JSON lines files in it if it's a directory of recordings."""
+    if not path.is_dir():
+        return [path]
+    files = sorted(file for file in path.iterdir() if file.is_file() and ".jsonl" in file.suffixes)
+    if not files:
+        raise CaptureError(f"Directory {path} holds no JSON lines files")
+    return files
+
+
+def read_start_time(path: Path) -> float:
+    """Return the timestamp of the first record of a capture, which offsets of all records are relative to."""
+    with open_capture(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                return parse_timestamp(json.loads(line)["timestamp"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    raise CaptureError(f"Capture file {path} holds no records with a timestamp")
+
+
+def read_records(path: Path, start_time: float) -> t.Iterator[ReplayRecord | None]:
+    """Stream the records of a capture file, lines that can't be parsed are yielded as None so they can be counted."""
+    with open_capture(path) as f:
+        for index, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                yield parse_record(line, start_time)
+            except (ValueError, KeyError, TypeError) as e:
+                logger.debug(f"Skipping line {index + 1} of {path}: {e}")
+                yield None
+
+
+def read_capture(path: Path, shard: int = 0, shards: int = 1) -> t.Iterator[ReplayRecord | None]:
+    """
+    Stream the records of a shard of a capture file, one JSON object per line with a timestamp, a method and optional
+    params. A directory of recordings is streamed as a single capture, merging the records of its files by time.
+    Records of a lane all go to the same shard, other records are assigned to shards by their position.
+    """
+    files = capture_files(path)
+    start_time = min(read_start_time(file) for file in files)
+    records = heapq.merge(
+        *(read_records(file, start_time) for file in files),
+        key=lambda record: record.offset if record is not None else -math.inf,
+    )
+    for index, record in enumerate(records):
+        if record is not None and record.lane is not None:
+            if lane_shard(record.lane, shards) == shard:
+                yield record
+        elif index % shards == shard:
+            yield record
+
+
+class ReplaySource:
+    """
+    Streams the records of a capture file to users at the time they were originally sent, scaled by the speed.
+
+    A reader greenlet buffers up to READ_AHEAD records in a queue, putting each of them once its scheduled time is
+    reached, so the capture is never loaded into memory as a whole. Users take a record with its scheduled time,
+    send it and mark it done. A record of a lane with a request still being sent is held back until that request
+    is done, so requests of a lane are sent one after another in their recorded order. Once the shard of the worker
+    is read and all its records are done, on_done is called with the counts of the shard.
+    """
+
+    def __init__(self) -> None:
+        self.path: Path | None = None
+        self.speed = DEFAULT_SPEED
+        self.shard = 0
+        self.shards = 1
+        self._records: JoinableQueue = JoinableQueue()
+        self._lanes: dict[Lane, deque[tuple[ReplayRecord, float]]] = {}
+        self._held = 0
+        self._greenlet: gevent.Greenlet | None = None
+        self._counts = ReplayCounts()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def configure(self, path: Path, speed: float = DEFAULT_SPEED, shard: int = 0, shards: int = 1) -> None:
+        if speed <= 0:
+            raise ValueError(f"Replay speed must be greater than 0, got {speed}")
+        self.path = path
+        self.speed = speed
+        self.shard = shard
+        self.shards = max(1, shards)
+
+    def start(self, on_done: t.Callable[[ReplayCounts], None] | None = None) -> None:
+        if self.enabled and self._greenlet is None:
+            logger.info(f"Replaying shard {self.shard + 1} of {self.shards} of {self.path} at {self.speed}x speed")
+            self._records = JoinableQueue()
+            self._lanes = {}
+            self._held = 0
+            self._counts = ReplayCounts()
+            self._greenlet = gevent.spawn(self._run, on_done)
+
+    def stop(self) -> None:
+        if self._greenlet is not None:
+            self._greenlet.kill(block=False)
+            self._greenlet = None
+
+    def _run(self, on_done: t.Callable[[ReplayCounts], None] | None) -> None:
+        assert self.path is not None
+        start_time = time.perf_counter()
+        try:
+            for count, record in enumerate(read_capture(self.path, self.shard, self.shards), 1):
+                if record is None:
+                    self._counts = self._counts._replace(skipped=self._counts.skipped + 1)
+                    continue
+                scheduled_time = start_time + record.offset / self.speed
+                delay = scheduled_time - time.perf_counter()
+                if delay > 0:
+                    gevent.sleep(delay)
+                elif count % 100 == 0:
+                    # records behind schedule are put at once, let users run while catching up
+                    gevent.sleep(0)
+                while self._records.qsize() + self._held >= READ_AHEAD:
+                    gevent.sleep(0.01)
+                self._dispatch(record, scheduled_time)
+                self._counts = self._counts._replace(replayed=self._counts.replayed + 1)
+        except (OSError, EOFError, CaptureError) as e:
+            logger.error(f"Failed to read capture file {self.path}: {e.__class__.__name__}: {e}")
+        self._records.join()
+        logger.info(f"Capture replayed: {self._counts.replayed} records sent, {self._counts.skipped} skipped")
+        if on_done is not None:
+            on_done(self._counts)
+
+    def _dispatch(self, record: ReplayRecord, scheduled_time: float) -> None:
+        if record.lane is not None:
+            held = self._lanes.get(record.lane)
+            if held is not None:
+                held.append((record, scheduled_time))
+                self._held += 1
+                return
+            self._lanes[record.lane] = deque()
+        self._records.put((record, scheduled_time))
+
+    def next(self) -> tuple[ReplayRecord, float]:
+        """Wait for the next record, return it with its scheduled time on the perf_counter clock."""
+        return self._records.get()
+
+    def done(self, record: ReplayRecord) -> None:
+        """Mark a record taken with next as sent, which releases the next record of its lane."""
+        if record.lane is not None:
+            held = self._lanes.get(record.lane)
+            if held:
+                self._records.put(held.popleft())
+                self._held -= 1
+            elif held is not None:
+                del self._lanes[record.lane]
+        self._records.task_done()
+
+
+class RequestRecorder:
+    """
+    Records the JSON-RPC requests sent by users of a worker to a gzip compressed JSON lines file, in the capture
+    format replayed with --replay-file. Every record holds the time the request was sent at, its offset from the
+    start of the test, the worker and user that sent it, and its method and params. Records are buffered and
+    written in chunks, compressed with the fastest level to keep the overhead on workers low.
+    """
+
+    def __init__(self) -> None:
+        self.path: Path | None = None
+        self.worker_index = 0
+        self.start_time = time.perf_counter()
+        self._file: t.BinaryIO | None = None
+        self._buffer: list[bytes] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self._file is not None
+
+    def configure(self, record_dir: Path, worker_index: int = 0) -> None:
+        self.path = record_dir / f"requests_{worker_index:02d}.jsonl.gz"
+        self.worker_index = worker_index
+
+    def start(self) -> None:
+        if self.path is not None and self._file is None:
+            logger.info(f"Recording requests to {self.path}")
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = t.cast(t.BinaryIO, gzip.open(self.path, "wb", compresslevel=1))
+            self.start_time = time.perf_counter()
+
+    def record(self, user_index: int, method: str, params: t.Any) -> None:
+        self._buffer.append(
+            json.dumps(
+                {
+                    "timestamp": time.time(),
+                    "offset": round(time.perf_counter() - self.start_time, 6),
+                    "worker": self.worker_index,
+                    "user": user_index,
+                    "method": method,
+                    "params": params,
+                }
+            )
+            + b"\n"
+        )
+        if len(self._buffer) >= RECORD_FLUSH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._file is not None and self._buffer:
+            self._file.write(b"".join(self._buffer))
+        self._buffer = []
+
+    def stop(self) -> None:
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+            logger.info(f"Requests recorded to {self.path}")
+
+
+replay_source = ReplaySource()
+request_recorder = RequestRecorder()
+replay_lag_recorder = HdrRecorder("replay_lag")
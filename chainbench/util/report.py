@@ -0,0 +1,20 @@
+import csv
+import typing as t
+from argparse import Namespace
+from pathlib import Path
+
+
+def get_results_dir(parsed_options: Namespace | None) -> Path | None:
+    """Get the directory of the test results from the CSV prefix locust is started with, if any."""
+    csv_prefix: str | None = getattr(parsed_options, "csv_prefix", None)
+    if not csv_prefix:
+        return None
+    return Path(csv_prefix).parent
+
+
+def write_csv(path: Path, header: t.Sequence[str], rows: t.Iterable[t.Sequence[t.Any]]) -> Path:
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return path
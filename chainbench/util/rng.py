@@ -1,6 +1,16 @@
-from inspect import stack
+import typing as t
+from hashlib import blake2b
 from random import Random
 
+DEFAULT_SEED = 42
+
+T = t.TypeVar("T")
+
+
+def derive_seed(*parts: int | str) -> int:
+    """Derive a 64 bit seed from a sequence of parts, such as a run seed, a worker index and a stream name."""
+    return int.from_bytes(blake2b("/".join(str(part) for part in parts).encode(), digest_size=8).digest(), "big")
+
 
 class RNG:
     def __init__(self, name: str, seed: int):
@@ -10,22 +20,96 @@ class RNG:
 
 
 class RNGManager:
-    def __init__(self, seed: int = 42):
+    """
+    Named random number streams, each seeded from the seed of the manager and the name of the stream, so streams
+    are independent of each other and of the order they are created in.
+    """
+
+    DEFAULT_STREAM = "default"
+
+    def __init__(self, seed: int = DEFAULT_SEED):
         self._seed = seed
         self._rngs: dict[str, RNG] = {}
 
+    @property
+    def seed(self) -> int:
+        return self._seed
+
+    def reseed(self, seed: int) -> None:
+        """Change the seed of the manager, streams are recreated from the new seed on their next use."""
+        self._seed = seed
+        self._rngs.clear()
+
+    def derive(self, *parts: int | str) -> "RNGManager":
+        """Return a manager with streams independent from the streams of this one, e.g. for a single user."""
+        return RNGManager(derive_seed(self._seed, *parts))
+
     def get_rng(self, name: str | None = None, seed: int | None = None) -> RNG:
-        seed = seed if seed is not None else self._seed
-        if name is not None:
-            if name not in self._rngs.keys():
-                self._rngs[name] = RNG(name, seed)
-            return self._rngs[name]
-        else:
-            caller = stack()[1][3]
-            if caller not in self._rngs.keys():
-                self._rngs[caller] = RNG(caller, seed)
-            return self._rngs[caller]
+        if name is None:
+            name = self.DEFAULT_STREAM
+        rng = self._rngs.get(name)
+        if rng is None:
+            rng = self._rngs[name] = RNG(name, seed if seed is not None else derive_seed(self._seed, name))
+        return rng
+
+
+class WeightedSampler(t.Generic[T]):
+    """
+    Samples items with probability proportional to their weights using Vose's alias method.
+
+    The alias table is built once in O(n), after which drawing an item takes constant time regardless of the
+    number of items and their weights.
+    """
+
+    def __init__(self, weighted_items: t.Mapping[T, float] | t.Iterable[tuple[T, float]]):
+        pairs = list(weighted_items.items() if isinstance(weighted_items, t.Mapping) else weighted_items)
+        if not pairs:
+            raise ValueError("WeightedSampler needs at least one item")
+        if any(weight < 0 for _, weight in pairs):
+            raise ValueError("Weights must not be negative")
+        total = sum(weight for _, weight in pairs)
+        if total <= 0:
+            raise ValueError("Weights must not all be zero")
+        self.items = [item for item, _ in pairs]
+        count = len(pairs)
+        scaled = [weight * count / total for _, weight in pairs]
+        self._probabilities = [1.0] * count
+        self._aliases = list(range(count))
+        small = [i for i, probability in enumerate(scaled) if probability < 1.0]
+        large = [i for i, probability in enumerate(scaled) if probability >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._probabilities[less] = scaled[less]
+            self._aliases[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # entries left over only differ from 1 by rounding errors
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _pick(self, position: float) -> T:
+        # a single uniform draw picks the column with its integer part and the item with its fractional part
+        column = int(position)
+        if position - column < self._probabilities[column]:
+            return self.items[column]
+        return self.items[self._aliases[column]]
+
+    def sample(self, random: Random) -> T:
+        return self._pick(random.random() * len(self.items))
+
+    def sample_k(self, k: int, random: Random) -> list[T]:
+        draw, count = random.random, len(self.items)
+        return [self._pick(draw() * count) for _ in range(k)]
 
 
 rng_manager = RNGManager()
 get_rng = rng_manager.get_rng
+
+
+def configure_rng(seed: int, worker_index: int) -> None:
+    """
+    Seed the random number streams of the process from the run seed and the index of the worker process, so runs
+    are reproducible with the same seed while workers don't generate the same params in lockstep.
+    """
+    rng_manager.reseed(derive_seed(seed, worker_index))
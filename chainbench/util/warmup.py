@@ -0,0 +1,77 @@
+import csv
+import logging
+import typing as t
+from pathlib import Path
+
+import gevent
+from gevent.event import Event
+from locust.env import Environment
+from locust.stats import PERCENTILES_TO_REPORT, StatsCSV
+
+logger = logging.getLogger(__name__)
+
+# seconds the master waits for workers to flush their warm-up stats before resetting stats
+WARMUP_FLUSH_TIMEOUT = 10.0
+
+
+class WarmupWindow:
+    """
+    Ends the warm-up window of a test after its duration, by calling on_end once. On the master, the end of the
+    warm-up waits for every worker to acknowledge that it has sent its stats of the warm-up, so requests sent during
+    the warm-up all end up in the warm-up stats and none of them in the stats of the steady state.
+    """
+
+    def __init__(self) -> None:
+        self.duration = 0.0
+        self._greenlet: gevent.Greenlet | None = None
+        self._pending: set[str] = set()
+        self._flushed = Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.duration > 0
+
+    def configure(self, duration: float) -> None:
+        self.duration = duration
+
+    def start(self, on_end: t.Callable[[], None]) -> None:
+        if self.enabled and self._greenlet is None:
+            logger.info(f"Warm-up of {self.duration:g} seconds started")
+            self._greenlet = gevent.spawn_later(self.duration, self._end, on_end)
+
+    def stop(self) -> None:
+        if self._greenlet is not None:
+            self._greenlet.kill(block=False)
+            self._greenlet = None
+
+    def _end(self, on_end: t.Callable[[], None]) -> None:
+        on_end()
+        self._greenlet = None
+
+    def wait_for_workers(self, worker_ids: t.Iterable[str], timeout: float = WARMUP_FLUSH_TIMEOUT) -> bool:
+        """Wait until every worker acknowledged flushing its warm-up stats, return whether all of them did."""
+        self._pending = set(worker_ids)
+        self._flushed.clear()
+        if not self._pending:
+            return True
+        return self._flushed.wait(timeout)
+
+    def acknowledge(self, worker_id: str) -> None:
+        self._pending.discard(worker_id)
+        if not self._pending:
+            self._flushed.set()
+
+
+def write_warmup_stats(environment: Environment, results_dir: Path) -> list[Path]:
+    """Write the stats of the warm-up in the format of the request and failure stats locust writes at the end."""
+    stats_csv = StatsCSV(environment, PERCENTILES_TO_REPORT)
+    paths = []
+    for name, write in (("warmup_stats.csv", stats_csv.requests_csv), ("warmup_failures.csv", stats_csv.failures_csv)):
+        path = results_dir / name
+        with path.open("w", newline="") as f:
+            write(csv.writer(f))
+        paths.append(path)
+    return paths
+
+
+warmup_window = WarmupWindow()